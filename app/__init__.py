@@ -1,6 +1,10 @@
-"""
-ARG Surveillance Multi-Agent Framework
-"""
-
-__version__ = "0.1.0"
-
+"""
+ARG Surveillance Multi-Agent Framework
+"""
+
+from app.env import load_env
+
+__version__ = "0.1.0"
+
+# Before any submodule reads its ARG_* settings at import
+load_env()
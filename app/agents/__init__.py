@@ -1,2 +1,2 @@
-"""Agent modules for ARG surveillance workflow"""
-
+"""Agent modules for ARG surveillance workflow"""
+
@@ -1,114 +1,190 @@
-"""
-A1 Sampling Design Agent
-
-Generates sampling strategies for ARG surveillance studies.
-"""
-
-import json
-from typing import Dict, Any
-
-from app.prompts.a1_sampling_system_prompt import TEXT as SYSTEM_PROMPT
-from app.prompts.a1_sampling_user_prompt import TEXT as USER_PROMPT
-from app.llm import call_llm
-
-
-def run_sampling_agent(user_query: str) -> Dict[str, Any]:
-    """
-    Execute Sampling Design Agent.
-    
-    Args:
-        user_query: User's research question or study description
-        
-    Returns:
-        Dict containing:
-        - raw_output: Full LLM response
-        - structured_output: Parsed JSON (if available)
-        - agent: "A1_Sampling"
-    """
-    # Inject user query into prompt (using replace to avoid conflicts with JSON braces)
-    user_message = USER_PROMPT.replace("###USER_QUERY###", user_query)
-    
-    # Call LLM
-    response = call_llm(
-        system_prompt=SYSTEM_PROMPT,
-        user_prompt=user_message,
-        temperature=0.3,  # Lower temperature for structured output
-        max_tokens=4000
-    )
-    
-    # Try to extract JSON from response
-    structured = None
-    try:
-        # Look for JSON in response (may be wrapped in markdown code blocks)
-        text = response
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            json_str = text[start:end].strip()
-        elif "```" in text:
-            start = text.find("```") + 3
-            end = text.find("```", start)
-            json_str = text[start:end].strip()
-        else:
-            json_str = text.strip()
-        
-        structured = json.loads(json_str)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"Warning: Could not parse JSON from A1 output: {e}")
-        print(f"  First 200 chars of response: {response[:200]}")
-        print(f"  Attempted to parse: {json_str[:200] if len(json_str) > 200 else json_str}")
-        # Don't raise, just log and continue with structured=None
-    
-    return {
-        "agent": "A1_Sampling",
-        "raw_output": response,
-        "structured_output": structured,
-        "status": "success" if structured else "warning"
-    }
-
-
-def validate_sampling_output(output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Validate A1 output structure.
-    
-    Args:
-        output: Agent output dict
-        
-    Returns:
-        Validation result with warnings/errors
-    """
-    validation = {
-        "valid": True,
-        "warnings": [],
-        "errors": []
-    }
-    
-    structured = output.get("structured_output")
-    if not structured:
-        validation["valid"] = False
-        validation["errors"].append("No structured JSON output found")
-        return validation
-    
-    # Check required keys
-    required_keys = [
-        "hypotheses",
-        "sampling_design",
-        "metadata_requirements",
-        "qc_strategy",
-        "handoff_to_wetlab"
-    ]
-    
-    for key in required_keys:
-        if key not in structured:
-            validation["warnings"].append(f"Missing recommended key: {key}")
-    
-    # Check sampling_design structure
-    if "sampling_design" in structured:
-        design = structured["sampling_design"]
-        if not any(k in design for k in ["spatial_design", "temporal_design"]):
-            validation["warnings"].append(
-                "sampling_design should include spatial_design or temporal_design"
-            )
-    
-    return validation
-
+"""
+A1 Sampling Design Agent
+
+Generates sampling strategies for ARG surveillance studies.
+"""
+
+import json
+from typing import Dict, Any, Optional
+
+from app.prompts.a1_sampling_system_prompt import TEXT as SYSTEM_PROMPT
+from app.prompts.a1_sampling_user_prompt import TEXT as USER_PROMPT
+from app.llm import JSON_MODE, JSON_OBJECT_FORMAT, call_llm, call_llm_async
+
+
+# Generation settings
+TEMPERATURE = 0.3  # Lower temperature for structured output
+MAX_TOKENS = 4000
+# Bare JSON object output: generation ends with the object instead of
+# continuing into narrative after a fenced block (fenced JSON if JSON mode is off)
+RESPONSE_FORMAT = JSON_OBJECT_FORMAT if JSON_MODE else None
+
+
+def run_sampling_agent(user_query: str) -> Dict[str, Any]:
+    """
+    Execute Sampling Design Agent.
+    
+    Args:
+        user_query: User's research question or study description
+        
+    Returns:
+        Dict containing:
+        - raw_output: Full LLM response
+        - structured_output: Parsed JSON (if available)
+        - agent: "A1_Sampling"
+    """
+    # Call LLM
+    response = call_llm(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=_build_user_message(user_query),
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        response_format=RESPONSE_FORMAT
+    )
+    
+    return _build_output(response)
+
+
+async def run_sampling_agent_async(user_query: str) -> Dict[str, Any]:
+    """
+    Async version of run_sampling_agent.
+    
+    Args:
+        user_query: User's research question or study description
+        
+    Returns:
+        Same dict as run_sampling_agent
+    """
+    response = await call_llm_async(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=_build_user_message(user_query),
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        response_format=RESPONSE_FORMAT
+    )
+    
+    return _build_output(response)
+
+
+def _build_user_message(user_query: str) -> str:
+    """Inject the user query into the A1 user prompt."""
+    # Inject user query into prompt (using replace to avoid conflicts with JSON braces)
+    return USER_PROMPT.replace("###USER_QUERY###", user_query)
+
+
+def _build_output(response: str) -> Dict[str, Any]:
+    """Parse the A1 response into the agent output dict."""
+    # Try to extract JSON from response
+    structured = None
+    json_str = ""
+    try:
+        # Look for JSON in response (may be wrapped in markdown code blocks)
+        text = response
+        if text.lstrip().startswith("{"):
+            # JSON mode: the response is the object itself
+            json_str = text.strip()
+        elif "```json" in text:
+            start = text.find("```json") + 7
+            end = text.find("```", start)
+            json_str = text[start:end].strip()
+        elif "```" in text:
+            start = text.find("```") + 3
+            end = text.find("```", start)
+            json_str = text[start:end].strip()
+        else:
+            json_str = text.strip()
+        
+        structured = json.loads(json_str)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Warning: Could not parse JSON from A1 output: {e}")
+        print(f"  First 200 chars of response: {response[:200]}")
+        print(f"  Attempted to parse: {json_str[:200] if len(json_str) > 200 else json_str}")
+        # Don't raise, just log and continue with structured=None
+    
+    return {
+        "agent": "A1_Sampling",
+        "raw_output": response,
+        "structured_output": structured,
+        "status": "success" if structured else "warning"
+    }
+
+
+def partial_sampling_output(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a partial A1 response once its handoff_to_wetlab section has closed.
+    
+    Used to start A2 speculatively while A1 is still streaming.
+    
+    Args:
+        text: Response text generated so far
+        
+    Returns:
+        The top-level JSON fields up to and including handoff_to_wetlab, or
+        None while that section is still open (or not a top-level field)
+    """
+    key = text.find('"handoff_to_wetlab"')
+    if key == -1:
+        return None
+    fence = text.find("```json")
+    start = text.find("{", fence + 7 if fence != -1 else 0)
+    colon = text.find(":", key)
+    if start == -1 or start > key or colon == -1:
+        return None
+    value_start = colon + 1
+    while value_start < len(text) and text[value_start].isspace():
+        value_start += 1
+    try:
+        # Fails until the whole section value has been generated
+        _, end = json.JSONDecoder().raw_decode(text, value_start)
+        partial = json.loads(text[start:end] + "}")
+    except ValueError:
+        return None
+    return partial if isinstance(partial, dict) and "handoff_to_wetlab" in partial else None
+
+
+def validate_sampling_output(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate A1 output structure.
+    
+    Args:
+        output: Agent output dict
+        
+    Returns:
+        Validation result with warnings/errors
+    """
+    validation = {
+        "valid": True,
+        "warnings": [],
+        "errors": []
+    }
+    
+    structured = output.get("structured_output")
+    if not structured:
+        validation["valid"] = False
+        validation["errors"].append("No structured JSON output found")
+        return validation
+    
+    # Check required keys
+    required_keys = [
+        "hypothesis_framework",
+        "study_design",
+        "sampling_scheme",
+        "metadata_requirements",
+        "qc_strategy",
+        "handoff_to_wetlab"
+    ]
+    
+    for key in required_keys:
+        if key not in structured:
+            validation["warnings"].append(f"Missing recommended key: {key}")
+    
+    # Check study_design structure
+    if "study_design" in structured:
+        design = structured["study_design"]
+        if not any(k in design for k in ["spatial_design", "temporal_design"]):
+            validation["warnings"].append(
+                "study_design should include spatial_design or temporal_design"
+            )
+    
+    return validation
+
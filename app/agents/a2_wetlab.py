@@ -1,117 +1,164 @@
-"""
-A2 Wet-Lab Protocol Agent
-
-Generates wet-lab protocols based on sampling design.
-"""
-
-import json
-from typing import Dict, Any
-
-from app.prompts.a2_wetlab_system_prompt import TEXT as SYSTEM_PROMPT
-from app.prompts.a2_wetlab_user_prompt import TEXT as USER_PROMPT
-from app.llm import call_llm
-from app.guards import check_wetlab_guardrails
-
-
-def run_wetlab_agent(sampling_output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Execute Wet-Lab Protocol Agent.
-    
-    Args:
-        sampling_output: Output from A1 Sampling Agent
-        
-    Returns:
-        Dict containing:
-        - raw_output: Full LLM response
-        - structured_output: Parsed JSON (if available)
-        - guardrail_report: Validation of non-actionable output
-        - agent: "A2_WetLab"
-    """
-    # Format sampling output as JSON string for prompt
-    sampling_json = json.dumps(sampling_output.get("structured_output", {}), indent=2)
-    
-    # Inject sampling output into prompt (using replace to avoid conflicts with JSON braces)
-    user_message = USER_PROMPT.replace("###SAMPLING_OUTPUT###", sampling_json)
-    
-    # Call LLM
-    response = call_llm(
-        system_prompt=SYSTEM_PROMPT,
-        user_prompt=user_message,
-        temperature=0.3,
-        max_tokens=5000
-    )
-    
-    # Try to extract JSON from response
-    structured = None
-    try:
-        text = response
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            json_str = text[start:end].strip()
-        elif "```" in text:
-            start = text.find("```") + 3
-            end = text.find("```", start)
-            json_str = text[start:end].strip()
-        else:
-            json_str = text
-        
-        structured = json.loads(json_str)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"Warning: Could not parse JSON from A2 output: {e}")
-    
-    # Apply guardrails: enforce non-actionable output
-    guardrail_report = check_wetlab_guardrails(response)
-    
-    return {
-        "agent": "A2_WetLab",
-        "raw_output": response,
-        "structured_output": structured,
-        "guardrail_report": guardrail_report,
-        "status": "success" if not guardrail_report["violations"] else "warning"
-    }
-
-
-def validate_wetlab_output(output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Validate A2 output structure.
-    
-    Args:
-        output: Agent output dict
-        
-    Returns:
-        Validation result with warnings/errors
-    """
-    validation = {
-        "valid": True,
-        "warnings": [],
-        "errors": []
-    }
-    
-    structured = output.get("structured_output")
-    if not structured:
-        validation["valid"] = False
-        validation["errors"].append("No structured JSON output found")
-        return validation
-    
-    # Check required keys
-    required_keys = [
-        "sample_collection_preservation",
-        "extraction",
-        "library_prep",
-        "sequencing",
-        "handoff_to_bioinformatics"
-    ]
-    
-    for key in required_keys:
-        if key not in structured:
-            validation["warnings"].append(f"Missing recommended key: {key}")
-    
-    # Check guardrail violations
-    if output.get("guardrail_report", {}).get("violations"):
-        validation["warnings"].append(
-            f"Guardrail violations detected: {len(output['guardrail_report']['violations'])} issues"
-        )
-    
-    return validation
-
+"""
+A2 Wet-Lab Protocol Agent
+
+Generates wet-lab protocols based on sampling design.
+"""
+
+import json
+from typing import Dict, Any, Tuple
+
+from app.prompts.a2_wetlab_system_prompt import TEXT as SYSTEM_PROMPT
+from app.prompts.a2_wetlab_user_prompt import TEXT as USER_PROMPT
+from app.handoff import build_handoff
+from app.llm import JSON_MODE, JSON_OBJECT_FORMAT, call_llm, call_llm_async
+from app.guards import check_wetlab_guardrails
+
+
+# Generation settings
+TEMPERATURE = 0.3
+MAX_TOKENS = 5000
+# Bare JSON object output: generation ends with the object instead of
+# continuing into narrative after a fenced block (fenced JSON if JSON mode is off)
+RESPONSE_FORMAT = JSON_OBJECT_FORMAT if JSON_MODE else None
+
+
+def run_wetlab_agent(sampling_output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute Wet-Lab Protocol Agent.
+    
+    Args:
+        sampling_output: Output from A1 Sampling Agent
+        
+    Returns:
+        Dict containing:
+        - raw_output: Full LLM response
+        - structured_output: Parsed JSON (if available)
+        - guardrail_report: Validation of non-actionable output
+        - handoff: Upstream fields injected and token savings (app/handoff.py)
+        - agent: "A2_WetLab"
+    """
+    user_prompt, handoff = _build_user_message(sampling_output)
+    
+    # Call LLM
+    response = call_llm(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        response_format=RESPONSE_FORMAT
+    )
+    
+    return _build_output(response, handoff)
+
+
+async def run_wetlab_agent_async(sampling_output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of run_wetlab_agent.
+    
+    Args:
+        sampling_output: Output from A1 Sampling Agent
+        
+    Returns:
+        Same dict as run_wetlab_agent
+    """
+    user_prompt, handoff = _build_user_message(sampling_output)
+    response = await call_llm_async(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        response_format=RESPONSE_FORMAT
+    )
+    
+    return _build_output(response, handoff)
+
+
+def _build_user_message(sampling_output: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Inject the A1 handoff into the A2 user prompt; also returns the handoff report."""
+    # Keep the fields A2 uses, minified (see app/handoff.py)
+    sampling_json, handoff = build_handoff("a1_a2", sampling_output.get("structured_output"))
+    
+    # Inject sampling output into prompt (using replace to avoid conflicts with JSON braces)
+    return USER_PROMPT.replace("###SAMPLING_OUTPUT###", sampling_json), handoff
+
+
+def _build_output(response: str, handoff: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse the A2 response and apply guardrails."""
+    # Try to extract JSON from response
+    structured = None
+    try:
+        text = response
+        if text.lstrip().startswith("{"):
+            # JSON mode: the response is the object itself
+            json_str = text.strip()
+        elif "```json" in text:
+            start = text.find("```json") + 7
+            end = text.find("```", start)
+            json_str = text[start:end].strip()
+        elif "```" in text:
+            start = text.find("```") + 3
+            end = text.find("```", start)
+            json_str = text[start:end].strip()
+        else:
+            json_str = text
+        
+        structured = json.loads(json_str)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Warning: Could not parse JSON from A2 output: {e}")
+    
+    # Apply guardrails: enforce non-actionable output
+    guardrail_report = check_wetlab_guardrails(response)
+    
+    return {
+        "agent": "A2_WetLab",
+        "raw_output": response,
+        "structured_output": structured,
+        "guardrail_report": guardrail_report,
+        "status": "success" if not guardrail_report["violations"] else "warning",
+        "handoff": handoff
+    }
+
+
+def validate_wetlab_output(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate A2 output structure.
+    
+    Args:
+        output: Agent output dict
+        
+    Returns:
+        Validation result with warnings/errors
+    """
+    validation = {
+        "valid": True,
+        "warnings": [],
+        "errors": []
+    }
+    
+    structured = output.get("structured_output")
+    if not structured:
+        validation["valid"] = False
+        validation["errors"].append("No structured JSON output found")
+        return validation
+    
+    # Check required keys
+    required_keys = [
+        "sample_collection_preservation",
+        "extraction",
+        "library_prep",
+        "quality_control",
+        "handoff_to_bioinformatics"
+    ]
+    
+    for key in required_keys:
+        if key not in structured:
+            validation["warnings"].append(f"Missing recommended key: {key}")
+    
+    # Check guardrail violations
+    if output.get("guardrail_report", {}).get("violations"):
+        validation["warnings"].append(
+            f"Guardrail violations detected: {len(output['guardrail_report']['violations'])} issues"
+        )
+    
+    return validation
+
@@ -1,136 +1,281 @@
-"""
-A3 Bioinformatics Pipeline Agent
-
-Generates bioinformatics pipeline scripts (bash, YAML, setup).
-"""
-
-import json
-from typing import Dict, Any
-
-from app.prompts.a3_bioinfo_system_prompt import TEXT as SYSTEM_PROMPT
-from app.prompts.a3_bioinfo_user_prompt import TEXT as USER_PROMPT
-from app.llm import call_llm
-from app.guards import check_bioinfo_guardrails
-
-
-def run_bioinfo_agent(wetlab_output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Execute Bioinformatics Pipeline Agent.
-    
-    Args:
-        wetlab_output: Output from A2 Wet-Lab Agent
-        
-    Returns:
-        Dict containing:
-        - raw_output: Full LLM response
-        - structured_output: Parsed sections (pipeline, config, etc.)
-        - guardrail_report: Check for execution commands
-        - agent: "A3_Bioinformatics"
-    """
-    # Format wetlab output as JSON string
-    wetlab_json = json.dumps(wetlab_output.get("structured_output", {}), indent=2)
-    
-    # Inject wetlab output into prompt (using replace to avoid conflicts with JSON braces)
-    user_message = USER_PROMPT.replace("###WETLAB_OUTPUT###", wetlab_json)
-    
-    # Call LLM
-    response = call_llm(
-        system_prompt=SYSTEM_PROMPT,
-        user_prompt=user_message,
-        temperature=0.2,  # Lower temperature for code generation
-        max_tokens=6000
-    )
-    
-    # Apply guardrails: check for execution commands
-    guardrail_report = check_bioinfo_guardrails(response)
-    
-    # Try to extract structured sections (bash, YAML, etc.)
-    structured = extract_bioinfo_sections(response)
-    
-    return {
-        "agent": "A3_Bioinformatics",
-        "raw_output": response,
-        "structured_output": structured,
-        "guardrail_report": guardrail_report,
-        "status": "success" if not guardrail_report["violations"] else "warning"
-    }
-
-
-def extract_bioinfo_sections(response: str) -> Dict[str, str]:
-    """
-    Extract code sections from response (bash, YAML, etc.).
-    
-    Args:
-        response: Raw LLM response
-        
-    Returns:
-        Dict with keys: pipeline_script, config_yaml, setup_script, readme, handoff_yaml
-    """
-    sections = {}
-    
-    # Look for code blocks with labels
-    import re
-    
-    # Pattern: ```language\n# Filename or description\ncontent\n```
-    code_blocks = re.findall(r'```(\w+)\n(.*?)\n```', response, re.DOTALL)
-    
-    for lang, content in code_blocks:
-        # Try to infer section based on content or filename comments
-        lower_content = content.lower()[:200]  # Check first 200 chars
-        
-        if 'pipeline.sh' in lower_content or 'bash' in lang.lower():
-            sections['pipeline_script'] = content.strip()
-        elif 'config.yaml' in lower_content or 'yml' in lang.lower() or 'yaml' in lang.lower():
-            if 'data_handoff' in lower_content:
-                sections['handoff_yaml'] = content.strip()
-            else:
-                sections['config_yaml'] = content.strip()
-        elif 'setup' in lower_content and 'database' in lower_content:
-            sections['setup_script'] = content.strip()
-        elif 'readme' in lower_content or lang.lower() == 'markdown':
-            sections['readme'] = content.strip()
-    
-    return sections
-
-
-def validate_bioinfo_output(output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Validate A3 output structure.
-    
-    Args:
-        output: Agent output dict
-        
-    Returns:
-        Validation result with warnings/errors
-    """
-    validation = {
-        "valid": True,
-        "warnings": [],
-        "errors": []
-    }
-    
-    structured = output.get("structured_output", {})
-    
-    # Check expected sections
-    expected_sections = [
-        "pipeline_script",
-        "config_yaml",
-        "setup_script",
-        "readme",
-        "handoff_yaml"
-    ]
-    
-    for section in expected_sections:
-        if section not in structured or not structured[section]:
-            validation["warnings"].append(f"Missing or empty section: {section}")
-    
-    # Check guardrail violations
-    if output.get("guardrail_report", {}).get("violations"):
-        validation["warnings"].append(
-            f"Guardrail violations detected: {len(output['guardrail_report']['violations'])} issues"
-        )
-        for violation in output['guardrail_report']['violations'][:3]:  # Show first 3
-            validation["warnings"].append(f"  - {violation}")
-    
-    return validation
-
+"""
+A3 Bioinformatics Pipeline Agent
+
+Generates bioinformatics pipeline scripts (bash, YAML, setup).
+"""
+
+import os
+from typing import Dict, Any, Optional, Tuple
+
+from app.prompts.a3_bioinfo_system_prompt import TEXT as SYSTEM_PROMPT
+from app.prompts.a3_bioinfo_user_prompt import TEXT as USER_PROMPT
+from app.handoff import build_handoff
+from app.llm import call_llm, call_llm_async
+from app.guards import check_bioinfo_guardrails
+from app.sections import (
+    SectionRequest, code_blocks, generate_sections, generate_sections_async, outer_code_block
+)
+
+
+# Generation settings
+TEMPERATURE = 0.2  # Lower temperature for code generation
+MAX_TOKENS = 6000
+
+# Parallel mode: one concurrent sub-request per deliverable instead of one
+# long completion (ARG_A3_PARALLEL_SECTIONS=1 or parallel=True)
+PARALLEL_SECTIONS = os.getenv("ARG_A3_PARALLEL_SECTIONS", "0").lower() in ("1", "true", "yes", "on")
+
+# Section key -> (file name, code fence language, max_tokens)
+SECTION_FILES: Dict[str, Tuple[str, str, int]] = {
+    "pipeline_script": ("pipeline.sh", "bash", 2500),
+    "config_yaml": ("config.yaml", "yaml", 800),
+    "setup_script": ("setup_databases.sh", "bash", 1000),
+    "readme": ("README.md", "markdown", 1200),
+    "handoff_yaml": ("data_handoff.yaml", "yaml", 1000),
+}
+
+SECTION_INSTRUCTION = """
+
+Generate ONLY the {file} deliverable now (the other deliverables are generated separately).
+Return it as a single ```{language} code block whose first line is the comment `# {file}`."""
+
+SECTION_REQUESTS = {
+    key: SectionRequest(SECTION_INSTRUCTION.format(file=file, language=language), max_tokens)
+    for key, (file, language, max_tokens) in SECTION_FILES.items()
+}
+
+
+def run_bioinfo_agent(wetlab_output: Dict[str, Any], parallel: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Execute Bioinformatics Pipeline Agent.
+    
+    Args:
+        wetlab_output: Output from A2 Wet-Lab Agent
+        parallel: Generate the sections as concurrent sub-requests
+            (default: ARG_A3_PARALLEL_SECTIONS)
+        
+    Returns:
+        Dict containing:
+        - raw_output: Full LLM response
+        - structured_output: Parsed sections (pipeline, config, etc.)
+        - guardrail_report: Check for execution commands
+        - handoff: Upstream fields injected and token savings (app/handoff.py)
+        - section_timings: Seconds per section (parallel mode only)
+        - agent: "A3_Bioinformatics"
+    """
+    user_prompt, handoff = _build_user_message(wetlab_output)
+    
+    if PARALLEL_SECTIONS if parallel is None else parallel:
+        responses, timings = generate_sections(
+            SYSTEM_PROMPT, user_prompt, SECTION_REQUESTS, TEMPERATURE
+        )
+        return _build_section_output(responses, timings, handoff)
+    
+    # Call LLM
+    response = call_llm(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS
+    )
+    
+    return _build_output(response, handoff)
+
+
+async def run_bioinfo_agent_async(
+    wetlab_output: Dict[str, Any],
+    parallel: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Async version of run_bioinfo_agent.
+    
+    Args:
+        wetlab_output: Output from A2 Wet-Lab Agent
+        parallel: Generate the sections as concurrent sub-requests
+            (default: ARG_A3_PARALLEL_SECTIONS)
+        
+    Returns:
+        Same dict as run_bioinfo_agent
+    """
+    user_prompt, handoff = _build_user_message(wetlab_output)
+    
+    if PARALLEL_SECTIONS if parallel is None else parallel:
+        responses, timings = await generate_sections_async(
+            SYSTEM_PROMPT, user_prompt, SECTION_REQUESTS, TEMPERATURE
+        )
+        return _build_section_output(responses, timings, handoff)
+    
+    response = await call_llm_async(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS
+    )
+    
+    return _build_output(response, handoff)
+
+
+def _build_user_message(wetlab_output: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Inject the A2 handoff into the A3 user prompt; also returns the handoff report."""
+    # Keep the fields A3 uses, minified (see app/handoff.py)
+    wetlab_json, handoff = build_handoff("a2_a3", wetlab_output.get("structured_output"))
+    
+    # Inject wetlab output into prompt (using replace to avoid conflicts with JSON braces)
+    return USER_PROMPT.replace("###WETLAB_OUTPUT###", wetlab_json), handoff
+
+
+def _build_output(response: str, handoff: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply guardrails and split the A3 response into sections."""
+    # Apply guardrails: check for execution commands
+    guardrail_report = check_bioinfo_guardrails(response)
+    
+    # Try to extract structured sections (bash, YAML, etc.)
+    structured = extract_bioinfo_sections(response)
+    
+    return {
+        "agent": "A3_Bioinformatics",
+        "raw_output": response,
+        "structured_output": structured,
+        "guardrail_report": guardrail_report,
+        "status": "success" if not guardrail_report["violations"] else "warning",
+        "handoff": handoff
+    }
+
+
+def _build_section_output(
+    responses: Dict[str, str],
+    timings: Dict[str, float],
+    handoff: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge per-section responses (parallel mode) into the A3 output dict."""
+    merged, sections = merge_bioinfo_sections(responses)
+    output = _build_output(merged, handoff)
+    output["structured_output"] = sections
+    output["section_timings"] = timings
+    return output
+
+
+def merge_bioinfo_sections(responses: Dict[str, str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Merge per-section responses into one raw output and the section dict.
+    
+    Args:
+        responses: Section key -> response of its sub-request
+        
+    Returns:
+        (raw_output, sections) - raw_output holds one fenced block per
+        section, in SECTION_FILES order
+    """
+    blocks = []
+    sections = {}
+    for key, (_, language, _) in SECTION_FILES.items():
+        response = responses.get(key) or ""
+        # A response may hold more than the requested block; prefer the matching one
+        content = extract_bioinfo_sections(response).get(key) or outer_code_block(response)
+        if content:
+            sections[key] = content
+            blocks.append(f"```{language}\n{content}\n```")
+    return "\n\n".join(blocks), sections
+
+
+def extract_bioinfo_sections(response: str, include_open: bool = True) -> Dict[str, str]:
+    """
+    Extract code sections from response (bash, YAML, etc.).
+    
+    Blocks are matched by the file name on their first line (see
+    SECTION_FILES, e.g. `# setup_databases.sh`), else by content and
+    language; fences nested in a block (e.g. a bash example in the README)
+    stay inside it.
+    
+    Args:
+        response: Raw LLM response
+        include_open: Also use a block still open at the end of the response
+        
+    Returns:
+        Dict with keys: pipeline_script, config_yaml, setup_script, readme, handoff_yaml
+    """
+    sections = {}
+    
+    for lang, content in code_blocks(response, include_open=include_open):
+        lower_content = content.lower()[:200]  # Check first 200 chars
+        first_line = lower_content.strip().split("\n", 1)[0]
+        lang = lang.lower()
+        
+        named = [key for key, (file, _, _) in SECTION_FILES.items() if file.lower() in first_line]
+        if named:
+            key = named[0]
+        elif 'setup' in lower_content and 'database' in lower_content:
+            key = 'setup_script'
+        elif 'pipeline.sh' in lower_content or lang in ('bash', 'sh', 'shell'):
+            key = 'pipeline_script'
+        elif lang in ('yaml', 'yml'):
+            key = 'handoff_yaml' if 'data_handoff' in lower_content else 'config_yaml'
+        elif 'readme' in lower_content or lang in ('markdown', 'md'):
+            key = 'readme'
+        else:
+            continue
+        sections[key] = content.strip()
+    
+    return sections
+
+
+def partial_bioinfo_output(text: str) -> Optional[Dict[str, str]]:
+    """
+    Parse a partial A3 response once its data_handoff.yaml block has closed.
+    
+    Used to start A4 speculatively while A3 is still streaming.
+    
+    Args:
+        text: Response text generated so far
+        
+    Returns:
+        Sections completed so far (including handoff_yaml), or None while
+        the handoff block is still open
+    """
+    if "data_handoff" not in text:
+        return None
+    sections = extract_bioinfo_sections(text, include_open=False)
+    return sections if "handoff_yaml" in sections else None
+
+
+def validate_bioinfo_output(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate A3 output structure.
+    
+    Args:
+        output: Agent output dict
+        
+    Returns:
+        Validation result with warnings/errors
+    """
+    validation = {
+        "valid": True,
+        "warnings": [],
+        "errors": []
+    }
+    
+    structured = output.get("structured_output", {})
+    
+    # Check expected sections
+    expected_sections = [
+        "pipeline_script",
+        "config_yaml",
+        "setup_script",
+        "readme",
+        "handoff_yaml"
+    ]
+    
+    for section in expected_sections:
+        if section not in structured or not structured[section]:
+            validation["warnings"].append(f"Missing or empty section: {section}")
+    
+    # Check guardrail violations
+    if output.get("guardrail_report", {}).get("violations"):
+        validation["warnings"].append(
+            f"Guardrail violations detected: {len(output['guardrail_report']['violations'])} issues"
+        )
+        for violation in output['guardrail_report']['violations'][:3]:  # Show first 3
+            validation["warnings"].append(f"  - {violation}")
+    
+    return validation
+
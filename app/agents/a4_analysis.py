@@ -1,124 +1,330 @@
-"""
-A4 Statistical Analysis & Visualization Agent
-
-Generates R analysis workflows from bioinformatics pipelines.
-"""
-
-import json
-from typing import Dict, Any
-
-from app.prompts.a4_analysis_system_prompt import TEXT as SYSTEM_PROMPT
-from app.prompts.a4_analysis_user_prompt import TEXT as USER_PROMPT
-from app.llm import call_llm
-from app.guards import check_analysis_guardrails
-
-
-def run_analysis_agent(bioinfo_output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Execute Statistical Analysis Agent.
-    
-    Args:
-        bioinfo_output: Output from A3 Bioinformatics Agent
-        
-    Returns:
-        Dict containing:
-        - raw_output: Full LLM response
-        - structured_output: Parsed sections (R scripts, helpers, etc.)
-        - guardrail_report: Check for execution commands
-        - agent: "A4_Analysis"
-    """
-    # Format bioinfo output as JSON string
-    bioinfo_json = json.dumps(bioinfo_output.get("structured_output", {}), indent=2)
-    
-    # Inject bioinfo output into prompt (using replace to avoid conflicts with JSON braces)
-    user_message = USER_PROMPT.replace("###BIOINFO_OUTPUT###", bioinfo_json)
-    
-    # Call LLM
-    response = call_llm(
-        system_prompt=SYSTEM_PROMPT,
-        user_prompt=user_message,
-        temperature=0.2,  # Lower temperature for code generation
-        max_tokens=6000
-    )
-    
-    # Apply guardrails: check for execution commands
-    guardrail_report = check_analysis_guardrails(response)
-    
-    # Try to extract structured sections (R scripts, etc.)
-    structured = extract_analysis_sections(response)
-    
-    return {
-        "agent": "A4_Analysis",
-        "raw_output": response,
-        "structured_output": structured,
-        "guardrail_report": guardrail_report,
-        "status": "success" if not guardrail_report["violations"] else "warning"
-    }
-
-
-def extract_analysis_sections(response: str) -> Dict[str, str]:
-    """
-    Extract R code sections from response.
-    
-    Args:
-        response: Raw LLM response
-        
-    Returns:
-        Dict with keys: rmd_script, helper_functions, workflow_doc
-    """
-    sections = {}
-    
-    # Look for code blocks
-    import re
-    
-    code_blocks = re.findall(r'```(\w+)\n(.*?)\n```', response, re.DOTALL)
-    
-    for lang, content in code_blocks:
-        lower_content = content.lower()[:200]
-        
-        if 'analysis.rmd' in lower_content or 'rmarkdown' in lang.lower():
-            sections['rmd_script'] = content.strip()
-        elif 'helpers.r' in lower_content or lang.lower() == 'r':
-            if 'rmd_script' not in sections:  # First R block is RMD
-                sections['rmd_script'] = content.strip()
-            else:
-                sections['helper_functions'] = content.strip()
-        elif lang.lower() == 'markdown':
-            sections['workflow_doc'] = content.strip()
-    
-    return sections
-
-
-def validate_analysis_output(output: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Validate A4 output structure.
-    
-    Args:
-        output: Agent output dict
-        
-    Returns:
-        Validation result with warnings/errors
-    """
-    validation = {
-        "valid": True,
-        "warnings": [],
-        "errors": []
-    }
-    
-    structured = output.get("structured_output", {})
-    
-    # Check expected sections
-    expected_sections = ["rmd_script", "helper_functions", "workflow_doc"]
-    
-    for section in expected_sections:
-        if section not in structured or not structured[section]:
-            validation["warnings"].append(f"Missing or empty section: {section}")
-    
-    # Check guardrail violations
-    if output.get("guardrail_report", {}).get("violations"):
-        validation["warnings"].append(
-            f"Guardrail violations detected: {len(output['guardrail_report']['violations'])} issues"
-        )
-    
-    return validation
-
+"""
+A4 Statistical Analysis & Visualization Agent
+
+Generates R analysis workflows from bioinformatics pipelines.
+"""
+
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.prompts.a4_analysis_system_prompt import TEXT as SYSTEM_PROMPT
+from app.prompts.a4_analysis_user_prompt import TEXT as USER_PROMPT
+from app.handoff import build_handoff
+from app.llm import call_llm, call_llm_async
+from app.guards import check_analysis_guardrails
+from app.sections import (
+    SectionRequest, code_blocks, generate_sections, generate_sections_async, outer_code_block
+)
+
+
+# Generation settings
+TEMPERATURE = 0.2  # Lower temperature for code generation
+MAX_TOKENS = 6000
+
+# Parallel mode: one concurrent sub-request per deliverable instead of one
+# long completion (ARG_A4_PARALLEL_SECTIONS=1 or parallel=True)
+PARALLEL_SECTIONS = os.getenv("ARG_A4_PARALLEL_SECTIONS", "0").lower() in ("1", "true", "yes", "on")
+
+# Section key -> (file name, code fence language, max_tokens)
+SECTION_FILES: Dict[str, Tuple[str, str, int]] = {
+    "rmd_script": ("analysis.Rmd", "rmarkdown", 3500),
+    "helper_functions": ("helpers.R", "r", 1500),
+    "workflow_doc": ("workflow.md", "markdown", 1000),
+}
+
+# Shared by every sub-request: the sections are written without seeing each
+# other, so they agree on how the Rmd and helpers.R connect up front
+SECTION_CONTEXT = """
+
+The deliverables are generated separately and combined afterwards:
+- analysis.Rmd loads helpers.R with source("helpers.R") and lists every helpers.R function it calls in a comment line `# helpers: name1, name2, ...`
+- helpers.R defines one function per analysis step (load_*, normalize_*, test_*, plot_*) as `name <- function(...)`
+- workflow.md documents the steps in the order analysis.Rmd runs them"""
+
+SECTION_INSTRUCTION = """
+
+Generate ONLY the {file} deliverable now.
+Return it as a single ```{language} code block whose first line is the comment `# {file}`."""
+
+SECTION_REQUESTS = {
+    key: SectionRequest(SECTION_CONTEXT + SECTION_INSTRUCTION.format(file=file, language=language), max_tokens)
+    for key, (file, language, max_tokens) in SECTION_FILES.items()
+}
+
+# Helper contract checked when merging (see check_helper_references)
+HELPERS_MANIFEST_PATTERN = re.compile(r"^\s*#\s*helpers:\s*(.+)$", re.MULTILINE | re.IGNORECASE)
+R_FUNCTION_PATTERN = re.compile(r"^\s*([A-Za-z.][\w.]*)\s*(?:<-|=)\s*function\s*\(", re.MULTILINE)
+# Calls qualified with a package (pkg::fn) are excluded: they are not helpers
+R_CALL_PATTERN = re.compile(r"(?<![\w.:])([A-Za-z.][\w.]*)\s*\(")
+
+# Name prefixes of the helpers.R contract (SECTION_CONTEXT, parallel mode only);
+# calls with these prefixes are expected to be helpers.R functions
+HELPER_PREFIXES = ("load_", "normalize_", "test_", "plot_")
+
+# Common package functions sharing those prefixes (phyloseq, cowplot, plotly, ...)
+PACKAGE_FUNCTIONS = frozenset({
+    "load_all", "plot_bar", "plot_grid", "plot_heatmap", "plot_layout", "plot_ly",
+    "plot_net", "plot_ordination", "plot_richness", "plot_tree", "test_that",
+})
+
+
+def run_analysis_agent(bioinfo_output: Dict[str, Any], parallel: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Execute Statistical Analysis Agent.
+    
+    Args:
+        bioinfo_output: Output from A3 Bioinformatics Agent
+        parallel: Generate the sections as concurrent sub-requests
+            (default: ARG_A4_PARALLEL_SECTIONS)
+        
+    Returns:
+        Dict containing:
+        - raw_output: Full LLM response
+        - structured_output: Parsed sections (R scripts, helpers, etc.)
+        - guardrail_report: Check for execution commands
+        - handoff: Upstream fields injected and token savings (app/handoff.py)
+        - helper_check: Helpers referenced by the Rmd vs defined in helpers.R
+        - section_timings: Seconds per section (parallel mode only)
+        - agent: "A4_Analysis"
+    """
+    user_prompt, handoff = _build_user_message(bioinfo_output)
+    
+    if PARALLEL_SECTIONS if parallel is None else parallel:
+        responses, timings = generate_sections(
+            SYSTEM_PROMPT, user_prompt, SECTION_REQUESTS, TEMPERATURE
+        )
+        return _build_section_output(responses, timings, handoff)
+    
+    # Call LLM
+    response = call_llm(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS
+    )
+    
+    return _build_output(response, handoff)
+
+
+async def run_analysis_agent_async(
+    bioinfo_output: Dict[str, Any],
+    parallel: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Async version of run_analysis_agent.
+    
+    Args:
+        bioinfo_output: Output from A3 Bioinformatics Agent
+        parallel: Generate the sections as concurrent sub-requests
+            (default: ARG_A4_PARALLEL_SECTIONS)
+        
+    Returns:
+        Same dict as run_analysis_agent
+    """
+    user_prompt, handoff = _build_user_message(bioinfo_output)
+    
+    if PARALLEL_SECTIONS if parallel is None else parallel:
+        responses, timings = await generate_sections_async(
+            SYSTEM_PROMPT, user_prompt, SECTION_REQUESTS, TEMPERATURE
+        )
+        return _build_section_output(responses, timings, handoff)
+    
+    response = await call_llm_async(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS
+    )
+    
+    return _build_output(response, handoff)
+
+
+def _build_user_message(bioinfo_output: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Inject the A3 handoff into the A4 user prompt; also returns the handoff report."""
+    # Keep the fields A4 uses, minified (see app/handoff.py)
+    bioinfo_json, handoff = build_handoff("a3_a4", bioinfo_output.get("structured_output"))
+    
+    # Inject bioinfo output into prompt (using replace to avoid conflicts with JSON braces)
+    return USER_PROMPT.replace("###BIOINFO_OUTPUT###", bioinfo_json), handoff
+
+
+def _build_output(
+    response: str,
+    handoff: Dict[str, Any],
+    sections: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Apply guardrails and split the A4 response into sections (unless given).
+    
+    Sections are given by the parallel path, whose sub-requests follow the
+    SECTION_CONTEXT helper contract; a single completion is only held to the
+    helpers it names or defines.
+    """
+    # Apply guardrails: check for execution commands
+    guardrail_report = check_analysis_guardrails(response)
+    
+    # Try to extract structured sections (R scripts, etc.)
+    structured = extract_analysis_sections(response) if sections is None else sections
+    
+    helper_check = check_helper_references(
+        structured.get("rmd_script", ""),
+        structured.get("helper_functions", ""),
+        prefixes=HELPER_PREFIXES if sections is not None else ()
+    )
+    if helper_check["missing"]:
+        print(f"⚠️  analysis.Rmd calls helpers not defined in helpers.R: {', '.join(helper_check['missing'])}")
+    
+    return {
+        "agent": "A4_Analysis",
+        "raw_output": response,
+        "structured_output": structured,
+        "guardrail_report": guardrail_report,
+        "status": "success" if not guardrail_report["violations"] else "warning",
+        "handoff": handoff,
+        "helper_check": helper_check
+    }
+
+
+def _build_section_output(
+    responses: Dict[str, str],
+    timings: Dict[str, float],
+    handoff: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge per-section responses (parallel mode) into the A4 output dict."""
+    merged, sections = merge_analysis_sections(responses)
+    output = _build_output(merged, handoff, sections)
+    output["section_timings"] = timings
+    return output
+
+
+def merge_analysis_sections(responses: Dict[str, str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Merge per-section responses into one raw output and the section dict.
+    
+    Args:
+        responses: Section key -> response of its sub-request
+        
+    Returns:
+        (raw_output, sections) - raw_output holds one fenced block per
+        section, in SECTION_FILES order
+    """
+    blocks = []
+    sections = {}
+    for key, (_, language, _) in SECTION_FILES.items():
+        response = responses.get(key) or ""
+        content = outer_code_block(response)
+        if content:
+            sections[key] = content
+            blocks.append(f"```{language}\n{content}\n```")
+    return "\n\n".join(blocks), sections
+
+
+def check_helper_references(
+    rmd_script: str,
+    helper_functions: str,
+    prefixes: Tuple[str, ...] = HELPER_PREFIXES
+) -> Dict[str, List[str]]:
+    """
+    Check that the helpers the Rmd relies on are defined in helpers.R.
+    
+    Referenced helpers are the names in the Rmd's `# helpers:` manifest, the
+    helpers.R functions it calls, and any call named like a helper
+    (prefixes, except PACKAGE_FUNCTIONS); functions the Rmd defines itself
+    count as defined.
+    
+    Args:
+        rmd_script: analysis.Rmd content
+        helper_functions: helpers.R content
+        prefixes: Helper name prefixes (empty: no naming contract)
+        
+    Returns:
+        Dict with sorted name lists: defined, referenced, missing, unused
+    """
+    defined = set(R_FUNCTION_PATTERN.findall(helper_functions))
+    local = set(R_FUNCTION_PATTERN.findall(rmd_script))
+    
+    referenced = {
+        name for name in R_CALL_PATTERN.findall(rmd_script)
+        if name in defined or (prefixes and name.startswith(prefixes) and name not in PACKAGE_FUNCTIONS)
+    }
+    for manifest in HELPERS_MANIFEST_PATTERN.findall(rmd_script):
+        referenced.update(name.strip("`() ") for name in re.split(r"[,\s]+", manifest) if name.strip("`() "))
+    
+    return {
+        "defined": sorted(defined),
+        "referenced": sorted(referenced),
+        "missing": sorted(referenced - defined - local),
+        "unused": sorted(defined - referenced)
+    }
+
+
+def extract_analysis_sections(response: str) -> Dict[str, str]:
+    """
+    Extract R code sections from response.
+    
+    Args:
+        response: Raw LLM response
+        
+    Returns:
+        Dict with keys: rmd_script, helper_functions, workflow_doc
+    """
+    sections = {}
+    
+    # Look for code blocks (Rmd chunk fences stay inside the Rmd block)
+    for lang, content in code_blocks(response):
+        lower_content = content.lower()[:200]
+        
+        if 'analysis.rmd' in lower_content or 'rmarkdown' in lang.lower():
+            sections['rmd_script'] = content.strip()
+        elif 'helpers.r' in lower_content or lang.lower() == 'r':
+            if 'rmd_script' not in sections:  # First R block is RMD
+                sections['rmd_script'] = content.strip()
+            else:
+                sections['helper_functions'] = content.strip()
+        elif lang.lower() == 'markdown':
+            sections['workflow_doc'] = content.strip()
+    
+    return sections
+
+
+def validate_analysis_output(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate A4 output structure.
+    
+    Args:
+        output: Agent output dict
+        
+    Returns:
+        Validation result with warnings/errors
+    """
+    validation = {
+        "valid": True,
+        "warnings": [],
+        "errors": []
+    }
+    
+    structured = output.get("structured_output", {})
+    
+    # Check expected sections
+    expected_sections = ["rmd_script", "helper_functions", "workflow_doc"]
+    
+    for section in expected_sections:
+        if section not in structured or not structured[section]:
+            validation["warnings"].append(f"Missing or empty section: {section}")
+    
+    # Check the Rmd only relies on helpers that exist
+    missing_helpers = output.get("helper_check", {}).get("missing")
+    if missing_helpers:
+        validation["warnings"].append(
+            f"Helpers referenced in analysis.Rmd but not defined in helpers.R: {', '.join(missing_helpers)}"
+        )
+    
+    # Check guardrail violations
+    if output.get("guardrail_report", {}).get("violations"):
+        validation["warnings"].append(
+            f"Guardrail violations detected: {len(output['guardrail_report']['violations'])} issues"
+        )
+    
+    return validation
+
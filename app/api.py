@@ -1,308 +1,682 @@
-"""
-FastAPI Entry Point
-
-REST API for running the ARG surveillance workflow.
-"""
-
-import os
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, Any, Optional
-
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel, Field
-import uvicorn
-
-from app.graph import run_workflow
-from app.cli import save_results
-
-
-# Create FastAPI app
-app = FastAPI(
-    title="ARG Surveillance Multi-Agent API",
-    description="REST API for orchestrating ARG surveillance research workflows",
-    version="0.1.0"
-)
-
-
-# Request/Response models
-class WorkflowRequest(BaseModel):
-    """Request schema for workflow execution."""
-    query: str = Field(
-        ...,
-        description="Research question or study description",
-        example="Design a sampling strategy to monitor ARG dynamics in hospital wastewater over 6 months"
-    )
-    save_results: bool = Field(
-        default=True,
-        description="Whether to save results to disk"
-    )
-    output_dir: Optional[str] = Field(
-        default="./runs",
-        description="Output directory for results"
-    )
-
-
-class WorkflowResponse(BaseModel):
-    """Response schema for workflow execution."""
-    status: str = Field(
-        description="Workflow status: 'complete', 'warning', 'error', or 'running'"
-    )
-    error: Optional[str] = Field(
-        default=None,
-        description="Error message if workflow failed"
-    )
-    run_id: str = Field(
-        description="Timestamp-based run identifier"
-    )
-    output_path: Optional[str] = Field(
-        default=None,
-        description="Path to saved results (if save_results=True)"
-    )
-    a1_status: Optional[str] = None
-    a2_status: Optional[str] = None
-    a3_status: Optional[str] = None
-    a4_status: Optional[str] = None
-
-
-class AgentOutputResponse(BaseModel):
-    """Response schema for individual agent output."""
-    agent: str
-    status: str
-    raw_output: str
-    structured_output: Optional[Dict[str, Any]] = None
-    guardrail_report: Optional[Dict[str, Any]] = None
-    validation: Optional[Dict[str, Any]] = None
-
-
-# In-memory storage for async runs (in production, use a database)
-workflow_runs: Dict[str, Dict[str, Any]] = {}
-
-
-# API endpoints
-@app.get("/")
-def root():
-    """Root endpoint with API information."""
-    return {
-        "name": "ARG Surveillance Multi-Agent API",
-        "version": "0.1.0",
-        "endpoints": {
-            "POST /workflow/run": "Execute the full workflow synchronously",
-            "POST /workflow/run-async": "Execute the full workflow asynchronously",
-            "GET /workflow/status/{run_id}": "Get status of an async workflow run",
-            "GET /workflow/output/{run_id}": "Get full output of a completed workflow",
-            "GET /agent/{run_id}/{agent}": "Get specific agent output"
-        }
-    }
-
-
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "openai_key_set": bool(os.getenv("OPENAI_API_KEY"))
-    }
-
-
-@app.post("/workflow/run", response_model=WorkflowResponse)
-def run_workflow_sync(request: WorkflowRequest):
-    """
-    Execute the full workflow synchronously.
-    
-    This will run A1 → A2 → A3 → A4 and return results when complete.
-    """
-    # Check for API key
-    if not os.getenv("OPENAI_API_KEY"):
-        raise HTTPException(
-            status_code=500,
-            detail="OPENAI_API_KEY environment variable not set"
-        )
-    
-    # Generate run ID
-    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    try:
-        # Run workflow
-        final_state = run_workflow(request.query)
-        
-        # Save results if requested
-        output_path = None
-        if request.save_results:
-            output_dir = Path(request.output_dir)
-            run_dir = save_results(final_state, output_dir)
-            output_path = str(run_dir.absolute())
-        
-        # Store in memory
-        workflow_runs[run_id] = final_state
-        
-        # Build response
-        response = WorkflowResponse(
-            status=final_state.get("status", "unknown"),
-            error=final_state.get("error"),
-            run_id=run_id,
-            output_path=output_path,
-            a1_status=final_state.get("a1_output", {}).get("status"),
-            a2_status=final_state.get("a2_output", {}).get("status"),
-            a3_status=final_state.get("a3_output", {}).get("status"),
-            a4_status=final_state.get("a4_output", {}).get("status")
-        )
-        
-        return response
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.post("/workflow/run-async", response_model=Dict[str, str])
-def run_workflow_async(request: WorkflowRequest, background_tasks: BackgroundTasks):
-    """
-    Execute the full workflow asynchronously.
-    
-    Returns immediately with a run_id. Use /workflow/status/{run_id} to check progress.
-    """
-    # Check for API key
-    if not os.getenv("OPENAI_API_KEY"):
-        raise HTTPException(
-            status_code=500,
-            detail="OPENAI_API_KEY environment variable not set"
-        )
-    
-    # Generate run ID
-    run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    
-    # Initialize status
-    workflow_runs[run_id] = {
-        "status": "running",
-        "query": request.query,
-        "started_at": datetime.now().isoformat()
-    }
-    
-    # Add background task
-    def run_in_background():
-        try:
-            final_state = run_workflow(request.query)
-            
-            if request.save_results:
-                output_dir = Path(request.output_dir)
-                run_dir = save_results(final_state, output_dir)
-                final_state["output_path"] = str(run_dir.absolute())
-            
-            workflow_runs[run_id] = final_state
-            workflow_runs[run_id]["completed_at"] = datetime.now().isoformat()
-        
-        except Exception as e:
-            workflow_runs[run_id] = {
-                "status": "error",
-                "error": str(e),
-                "completed_at": datetime.now().isoformat()
-            }
-    
-    background_tasks.add_task(run_in_background)
-    
-    return {
-        "run_id": run_id,
-        "status": "running",
-        "message": f"Workflow started. Check status at /workflow/status/{run_id}"
-    }
-
-
-@app.get("/workflow/status/{run_id}")
-def get_workflow_status(run_id: str):
-    """Get the current status of a workflow run."""
-    if run_id not in workflow_runs:
-        raise HTTPException(status_code=404, detail=f"Run ID {run_id} not found")
-    
-    state = workflow_runs[run_id]
-    
-    return {
-        "run_id": run_id,
-        "status": state.get("status", "unknown"),
-        "error": state.get("error"),
-        "a1_complete": "a1_output" in state,
-        "a2_complete": "a2_output" in state,
-        "a3_complete": "a3_output" in state,
-        "a4_complete": "a4_output" in state
-    }
-
-
-@app.get("/workflow/output/{run_id}")
-def get_workflow_output(run_id: str):
-    """Get the full output of a completed workflow."""
-    if run_id not in workflow_runs:
-        raise HTTPException(status_code=404, detail=f"Run ID {run_id} not found")
-    
-    state = workflow_runs[run_id]
-    
-    if state.get("status") == "running":
-        raise HTTPException(
-            status_code=202,
-            detail="Workflow still running. Check /workflow/status/{run_id}"
-        )
-    
-    # Return compact version (without raw outputs)
-    compact_state = {k: v for k, v in state.items() if k not in ["user_query"]}
-    for agent_key in ["a1_output", "a2_output", "a3_output", "a4_output"]:
-        if agent_key in compact_state:
-            # Include only metadata, not full raw text
-            compact_state[agent_key] = {
-                "agent": compact_state[agent_key].get("agent"),
-                "status": compact_state[agent_key].get("status"),
-                "has_structured_output": bool(compact_state[agent_key].get("structured_output")),
-                "guardrail_violations": len(
-                    compact_state[agent_key].get("guardrail_report", {}).get("violations", [])
-                )
-            }
-    
-    return {
-        "run_id": run_id,
-        "state": compact_state
-    }
-
-
-@app.get("/agent/{run_id}/{agent}", response_model=AgentOutputResponse)
-def get_agent_output(run_id: str, agent: str):
-    """
-    Get the output of a specific agent.
-    
-    Args:
-        run_id: Workflow run ID
-        agent: Agent name (a1, a2, a3, or a4)
-    """
-    if run_id not in workflow_runs:
-        raise HTTPException(status_code=404, detail=f"Run ID {run_id} not found")
-    
-    if agent not in ["a1", "a2", "a3", "a4"]:
-        raise HTTPException(status_code=400, detail="Agent must be a1, a2, a3, or a4")
-    
-    state = workflow_runs[run_id]
-    agent_key = f"{agent}_output"
-    
-    if agent_key not in state:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Agent {agent} output not found (workflow may not have reached this agent)"
-        )
-    
-    agent_output = state[agent_key]
-    validation_reports = state.get("validation_reports", {})
-    
-    return AgentOutputResponse(
-        agent=agent_output.get("agent", agent),
-        status=agent_output.get("status", "unknown"),
-        raw_output=agent_output.get("raw_output", ""),
-        structured_output=agent_output.get("structured_output"),
-        guardrail_report=agent_output.get("guardrail_report"),
-        validation=validation_reports.get(agent)
-    )
-
-
-# Run server
-def start_server(host: str = "0.0.0.0", port: int = 8000):
-    """Start the FastAPI server."""
-    uvicorn.run(app, host=host, port=port)
-
-
-if __name__ == "__main__":
-    start_server()
-
+"""
+FastAPI Entry Point
+
+REST API for running the ARG surveillance workflow.
+"""
+
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Optional, Callable
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+import uvicorn
+
+from app.graph import (
+    run_workflow_async as run_graph_async, resume_workflow_async, stage_memo_stats, warm_graph_cache
+)
+from app.cli import save_results
+from app.cache import get_cache
+from app.ratelimit import get_rate_limiter
+from app.http_pool import pool_stats
+from app.cassette import get_cassette
+from app.events import broker, initial_stage_statuses, apply_stage_event
+from app.run_store import ACTIVE_STATUSES, get_run_store
+from app.jobs import JobQueue, QueueFullError, QueueClosedError
+from app.llm import coalesce_stats, llm_backend, missing_api_key, to_thread, total_usage
+
+
+# Bounded worker pool for workflow runs (ARG_JOB_WORKERS / ARG_JOB_QUEUE_MAX)
+job_queue = JobQueue()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compile graphs and start the job queue workers; stop workers on shutdown."""
+    warm_graph_cache()
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    # Flush run-store writes queued by the last runs
+    await _store_write(lambda: None)
+
+
+# Create FastAPI app
+app = FastAPI(
+    title="ARG Surveillance Multi-Agent API",
+    description="REST API for orchestrating ARG surveillance research workflows",
+    version="0.1.0",
+    lifespan=lifespan
+)
+
+
+# Request/Response models
+class WorkflowRequest(BaseModel):
+    """Request schema for workflow execution."""
+    query: str = Field(
+        ...,
+        description="Research question or study description",
+        example="Design a sampling strategy to monitor ARG dynamics in hospital wastewater over 6 months"
+    )
+    save_results: bool = Field(
+        default=True,
+        description="Whether to save results to disk"
+    )
+    output_dir: Optional[str] = Field(
+        default="./runs",
+        description="Output directory for results"
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Serve identical LLM requests from the response cache"
+    )
+    dedupe: bool = Field(
+        default=True,
+        description="Attach to a queued/running run of the identical query instead of "
+                    "starting a new one (its save_results/output_dir settings apply)"
+    )
+
+
+class ResumeRequest(BaseModel):
+    """Request schema for resuming a checkpointed run."""
+    save_results: bool = Field(
+        default=True,
+        description="Whether to save results to disk"
+    )
+    output_dir: Optional[str] = Field(
+        default="./runs",
+        description="Output directory for results"
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Serve identical LLM requests from the response cache"
+    )
+    force: bool = Field(
+        default=False,
+        description="Resume even if the run is still marked queued/running "
+                    "(e.g. the server was restarted mid-run)"
+    )
+
+
+class WorkflowResponse(BaseModel):
+    """Response schema for workflow execution."""
+    status: str = Field(
+        description="Workflow status: 'complete', 'warning', 'error', or 'running'"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error message if workflow failed"
+    )
+    run_id: str = Field(
+        description="Timestamp-based run identifier"
+    )
+    output_path: Optional[str] = Field(
+        default=None,
+        description="Path to saved results (if save_results=True)"
+    )
+    a1_status: Optional[str] = None
+    a2_status: Optional[str] = None
+    a3_status: Optional[str] = None
+    a4_status: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Token usage and API latency totals for the run"
+    )
+
+
+class AgentOutputResponse(BaseModel):
+    """Response schema for individual agent output."""
+    agent: str
+    status: str
+    raw_output: str
+    structured_output: Optional[Dict[str, Any]] = None
+    guardrail_report: Optional[Dict[str, Any]] = None
+    validation: Optional[Dict[str, Any]] = None
+    usage: Optional[Dict[str, Any]] = None
+
+
+# Durable run storage (SQLite, shared by all workers - see app/run_store.py)
+run_store = get_run_store()
+
+# Interval between SSE keep-alive comments
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# Duplicate queries attach to active runs updated within this window (older
+# queued/running runs are assumed to be orphaned by a restart)
+DEDUPE_WINDOW_SECONDS = float(os.getenv("ARG_RUN_DEDUPE_WINDOW_S", "900"))
+
+# Run-store writes from handlers and event callbacks run on one background
+# thread: SQLite commits stay off the event loop and land in submission order
+# (a late stage update can never overwrite a run's final state)
+_store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="arg-run-store")
+
+# Futures of runs queued by this process (lets /workflow/run wait on a duplicate)
+_run_futures: Dict[str, "asyncio.Future"] = {}
+
+
+def _store_submit(func: Callable[..., Any], *args: Any, **kwargs: Any) -> "Future":
+    """Queue a run-store call on the writer thread without waiting (for sync callbacks)."""
+    future = _store_writer.submit(func, *args, **kwargs)
+    future.add_done_callback(_report_store_error)
+    return future
+
+
+def _report_store_error(future: "Future") -> None:
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️  Run store write failed: {future.exception()}")
+
+
+async def _store_write(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a run-store call on the writer thread, after every write queued before it."""
+    return await asyncio.wrap_future(_store_writer.submit(func, *args, **kwargs))
+
+
+def _event_recorder(
+    run_id: str,
+    stages: Dict[str, str],
+    publish: bool = True
+) -> Callable[[Dict[str, Any]], None]:
+    """Build an on_event callback that tracks stage status and publishes events."""
+    def on_event(event: Dict[str, Any]) -> None:
+        if event["event"] != "token":
+            apply_stage_event(stages, event)
+            _store_submit(run_store.update_run, run_id, stages=dict(stages))
+        if publish:
+            broker.publish(run_id, event)
+    
+    return on_event
+
+
+def _get_run_or_404(run_id: str) -> Dict[str, Any]:
+    """Load run metadata from the store or raise 404."""
+    run = run_store.get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run ID {run_id} not found")
+    return run
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+def _find_duplicate_run(request: WorkflowRequest) -> Optional[Dict[str, Any]]:
+    """Return the active run of an identical query, unless the request opted out."""
+    if not request.dedupe:
+        return None
+    return run_store.find_active_run(request.query, max_age_s=DEDUPE_WINDOW_SECONDS)
+
+
+async def _enqueue_run(
+    run_id: str,
+    request: WorkflowRequest,
+    publish: bool = True,
+    resume: bool = False
+):
+    """
+    Register a queued run and submit it to the job queue.
+    
+    The workflow checkpoints to the run store after every stage; with
+    resume=True it restarts an existing run from its first incomplete stage.
+    
+    Returns:
+        Future resolving to the final workflow state
+    
+    Raises:
+        HTTPException: 429 when the queue is full, 503 when shutting down
+    """
+    stages = initial_stage_statuses()
+    if resume:
+        stages.update((await _store_write(run_store.get_run, run_id) or {}).get("stages") or {})
+    
+    def on_start(queue_wait: float) -> None:
+        _store_submit(
+            run_store.update_run,
+            run_id, status="running", started_at=time.time(), queue_wait_s=round(queue_wait, 3)
+        )
+        if publish:
+            broker.publish(run_id, {
+                "event": "workflow_start",
+                "query": request.query,
+                "queue_wait_s": round(queue_wait, 3),
+                "resumed": resume
+            })
+    
+    async def execute() -> Dict[str, Any]:
+        try:
+            on_event = _event_recorder(run_id, stages, publish=publish)
+            if resume:
+                final_state = await resume_workflow_async(
+                    run_id, use_cache=request.use_cache, on_event=on_event
+                )
+            else:
+                final_state = await run_graph_async(
+                    request.query, use_cache=request.use_cache, on_event=on_event, run_id=run_id
+                )
+            
+            # Save results if requested (file and SQLite writes stay off the event loop)
+            if request.save_results:
+                output_dir = Path(request.output_dir)
+                run_dir = await to_thread(save_results, final_state, output_dir)
+                final_state["output_path"] = str(run_dir.absolute())
+            
+            # Persist run
+            await _store_write(run_store.save_state, run_id, {
+                **final_state,
+                "stages": stages,
+                "completed_at": time.time()
+            })
+            return final_state
+        
+        except Exception as e:
+            await _store_write(
+                run_store.update_run,
+                run_id, status="error", error=str(e), stages=stages, completed_at=time.time()
+            )
+            raise
+        
+        finally:
+            if publish:
+                run = await _store_write(run_store.get_run, run_id) or {}
+                broker.publish(run_id, {
+                    "event": "workflow_end",
+                    "status": run.get("status"),
+                    "error": run.get("error"),
+                    "output_path": run.get("output_path")
+                })
+            _store_submit(run_store.evict)
+    
+    try:
+        future = job_queue.submit(run_id, execute, on_start=on_start)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except QueueClosedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    
+    # Registered after submit so rejected runs leave no record (queued before
+    # this coroutine yields, so it precedes the worker's on_start update)
+    if resume:
+        registered = _store_submit(
+            run_store.update_run, run_id, status="queued", error=None, completed_at=None
+        )
+    else:
+        registered = _store_submit(
+            run_store.create_run, run_id, request.query, status="queued", stages=stages
+        )
+    if publish:
+        # Subscribers connecting before workflow_start wait on this channel
+        broker.open(run_id)
+    _run_futures[run_id] = future
+    future.add_done_callback(lambda f: _run_futures.pop(run_id, None))
+    # Status lookups right after the response must find the run
+    await asyncio.wrap_future(registered)
+    return future
+
+
+# API endpoints
+@app.get("/")
+def root():
+    """Root endpoint with API information."""
+    return {
+        "name": "ARG Surveillance Multi-Agent API",
+        "version": "0.1.0",
+        "endpoints": {
+            "POST /workflow/run": "Execute the full workflow synchronously",
+            "POST /workflow/run-async": "Execute the full workflow asynchronously",
+            "POST /workflow/resume/{run_id}": "Resume a failed or interrupted run from its last checkpoint",
+            "GET /workflow/status/{run_id}": "Get status of an async workflow run",
+            "GET /workflow/events/{run_id}": "Server-Sent Events stream of run progress and tokens",
+            "WS /workflow/ws/{run_id}": "WebSocket stream of run progress and tokens",
+            "GET /workflow/output/{run_id}": "Get full output of a completed workflow",
+            "GET /agent/{run_id}/{agent}": "Get specific agent output"
+        }
+    }
+
+
+@app.get("/health")
+def health_check():
+    """Health check endpoint."""
+    cache = get_cache()
+    cassette = get_cassette()
+    return {
+        "status": "healthy",
+        "openai_key_set": bool(os.getenv("OPENAI_API_KEY")),
+        "llm_backend": llm_backend(),
+        "llm_cache": cache.stats() if cache is not None else None,
+        "job_queue": job_queue.stats(),
+        "rate_limiter": get_rate_limiter().stats(),
+        "http_pool": pool_stats(),
+        "llm_coalescing": coalesce_stats(),
+        "cassette": cassette.stats() if cassette is not None else None
+    }
+
+
+@app.post("/workflow/run", response_model=WorkflowResponse)
+async def run_workflow_sync(request: WorkflowRequest):
+    """
+    Execute the full workflow synchronously.
+    
+    This will run A1 → A2 → A3 → A4 and return results when complete.
+    The run waits for a job-queue worker like async runs do. If an identical
+    query is already queued/running in this process, the request waits for
+    that run instead (dedupe=false forces a new run).
+    """
+    # Check for API key
+    if missing_api_key():
+        raise HTTPException(
+            status_code=500,
+            detail="OPENAI_API_KEY environment variable not set"
+        )
+    
+    # Attach to an identical in-flight run, else generate a run ID and queue
+    duplicate = _find_duplicate_run(request)
+    future = _run_futures.get(duplicate["run_id"]) if duplicate else None
+    if future is not None:
+        run_id = duplicate["run_id"]
+    else:
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        future = await _enqueue_run(run_id, request, publish=False)
+    
+    try:
+        # Run workflow (shielded: a disconnecting client must not cancel a shared run)
+        final_state = await asyncio.shield(future)
+        
+        # Build response
+        response = WorkflowResponse(
+            status=final_state.get("status", "unknown"),
+            error=final_state.get("error"),
+            run_id=run_id,
+            output_path=final_state.get("output_path"),
+            a1_status=final_state.get("a1_output", {}).get("status"),
+            a2_status=final_state.get("a2_output", {}).get("status"),
+            a3_status=final_state.get("a3_output", {}).get("status"),
+            a4_status=final_state.get("a4_output", {}).get("status"),
+            usage=total_usage(final_state.get("usage") or {})
+        )
+        
+        return response
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/workflow/run-async", response_model=Dict[str, str], status_code=202)
+async def run_workflow_async(request: WorkflowRequest):
+    """
+    Execute the full workflow asynchronously.
+    
+    Returns immediately with a run_id. Use /workflow/status/{run_id} to check progress.
+    A query identical to a queued/running run returns that run's run_id
+    (with "deduplicated": "true") instead of starting another pipeline.
+    Responds 429 (with Retry-After) when the job queue is full.
+    """
+    # Check for API key
+    if missing_api_key():
+        raise HTTPException(
+            status_code=500,
+            detail="OPENAI_API_KEY environment variable not set"
+        )
+    
+    duplicate = _find_duplicate_run(request)
+    if duplicate is not None:
+        run_id = duplicate["run_id"]
+        return {
+            "run_id": run_id,
+            "status": duplicate["status"],
+            "deduplicated": "true",
+            "message": f"Identical query already {duplicate['status']}. Check status at /workflow/status/{run_id}"
+        }
+    
+    # Generate run ID
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    
+    # Queue the run (errors are recorded in the run store, not raised here)
+    future = await _enqueue_run(run_id, request)
+    # Mark the outcome as retrieved (failures are already recorded in the run store)
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    
+    return {
+        "run_id": run_id,
+        "status": "queued",
+        "message": f"Workflow queued. Check status at /workflow/status/{run_id}"
+    }
+
+
+@app.post("/workflow/resume/{run_id}", response_model=Dict[str, str], status_code=202)
+async def resume_workflow_run(run_id: str, request: Optional[ResumeRequest] = None):
+    """
+    Resume a failed or interrupted run from its first incomplete stage.
+    
+    Completed stages are reused from the run store checkpoint. Responds 409 if
+    the run is still queued/running (unless force=true) and 429 when the job
+    queue is full.
+    """
+    request = request or ResumeRequest()
+    run = _get_run_or_404(run_id)
+    
+    if run["status"] in ("queued", "running") and not request.force:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Run {run_id} is {run['status']}; pass force=true if it was interrupted"
+        )
+    
+    future = await _enqueue_run(
+        run_id,
+        WorkflowRequest(
+            query=run["query"],
+            save_results=request.save_results,
+            output_dir=request.output_dir,
+            use_cache=request.use_cache
+        ),
+        resume=True
+    )
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    
+    return {
+        "run_id": run_id,
+        "status": "queued",
+        "message": f"Resume queued. Check status at /workflow/status/{run_id}"
+    }
+
+
+@app.get("/workflow/status/{run_id}")
+def get_workflow_status(run_id: str):
+    """Get the current status of a workflow run."""
+    run = _get_run_or_404(run_id)
+    stages = run.get("stages") or initial_stage_statuses()
+    
+    return {
+        "run_id": run_id,
+        "status": run["status"],
+        "error": run["error"],
+        "queued_at": _isoformat(run["created_at"]),
+        "started_at": _isoformat(run["started_at"]),
+        "completed_at": _isoformat(run["completed_at"]),
+        "queue_wait_s": run["queue_wait_s"],
+        "stages": stages,
+        "stage_memo": stage_memo_stats(
+            {agent: info.get("metrics") or {} for agent, info in (run.get("agents") or {}).items()}
+        ),
+        "a1_complete": stages["a1"] == "complete",
+        "a2_complete": stages["a2"] == "complete",
+        "a3_complete": stages["a3"] == "complete",
+        "a4_complete": stages["a4"] == "complete"
+    }
+
+
+async def _run_events(
+    run_id: str,
+    last_event_id: int = 0,
+    heartbeat: Optional[float] = None
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Events for a run: live from the broker while this process streams it,
+    otherwise (run finished before a restart, runs in another worker, or a
+    synchronous /workflow/run) a single workflow_end built from the run store.
+    """
+    received = False
+    async for event in broker.subscribe(run_id, last_event_id=last_event_id, heartbeat=heartbeat):
+        received = received or event is not None
+        yield event
+    if received:
+        return
+    
+    run = run_store.get_run(run_id) or {}
+    event = {
+        "event": "workflow_end",
+        "id": last_event_id + 1,
+        "ts": time.time(),
+        "status": run.get("status", "unknown"),
+        "error": run.get("error"),
+        "output_path": run.get("output_path")
+    }
+    if run.get("status") in ACTIVE_STATUSES:
+        event["detail"] = f"Run is not streamed by this API process; poll /workflow/status/{run_id}"
+    yield event
+
+
+@app.get("/workflow/events/{run_id}")
+async def stream_workflow_events(run_id: str, request: Request):
+    """
+    Stream run progress as Server-Sent Events.
+    
+    Emits node_start/node_end/node_skipped/node_error, validation and token
+    events, then workflow_end. Supports reconnects via the Last-Event-ID header.
+    """
+    _get_run_or_404(run_id)
+    
+    try:
+        last_event_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_event_id = 0
+    
+    async def event_source():
+        async for event in _run_events(
+            run_id, last_event_id=last_event_id, heartbeat=SSE_KEEPALIVE_SECONDS
+        ):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/workflow/ws/{run_id}")
+async def workflow_events_websocket(websocket: WebSocket, run_id: str):
+    """Stream run progress events as JSON messages over a WebSocket."""
+    await websocket.accept()
+    
+    if run_store.get_run(run_id) is None:
+        await websocket.send_json({"event": "error", "detail": f"Run ID {run_id} not found"})
+        await websocket.close(code=4404)
+        return
+    
+    try:
+        async for event in _run_events(run_id):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/workflow/output/{run_id}")
+def get_workflow_output(run_id: str):
+    """Get the full output of a completed workflow."""
+    run = _get_run_or_404(run_id)
+    
+    if run["status"] in ("queued", "running"):
+        raise HTTPException(
+            status_code=202,
+            detail="Workflow still running. Check /workflow/status/{run_id}"
+        )
+    
+    # Return compact version (without raw outputs - those stay in the blob table)
+    compact_state = {
+        "status": run["status"],
+        "error": run["error"],
+        "output_path": run["output_path"],
+        "stages": run["stages"],
+        "queued_at": _isoformat(run["created_at"]),
+        "started_at": _isoformat(run["started_at"]),
+        "completed_at": _isoformat(run["completed_at"]),
+        "queue_wait_s": run["queue_wait_s"],
+        "validation_reports": {},
+        "metrics": {},
+        "usage": {}
+    }
+    for agent, meta in run["agents"].items():
+        compact_state["validation_reports"][agent] = meta["validation"]
+        compact_state["metrics"][agent] = meta["metrics"]
+        compact_state["usage"][agent] = meta["usage"]
+        # Include only metadata, not full raw text
+        compact_state[f"{agent}_output"] = {
+            "agent": meta["agent"],
+            "status": meta["status"],
+            "has_structured_output": meta["has_structured_output"],
+            "guardrail_violations": meta["guardrail_violations"]
+        }
+    
+    return {
+        "run_id": run_id,
+        "state": compact_state,
+        "usage": total_usage(compact_state["usage"])
+    }
+
+
+@app.get("/agent/{run_id}/{agent}", response_model=AgentOutputResponse)
+def get_agent_output(run_id: str, agent: str):
+    """
+    Get the output of a specific agent.
+    
+    Args:
+        run_id: Workflow run ID
+        agent: Agent name (a1, a2, a3, or a4)
+    """
+    _get_run_or_404(run_id)
+    
+    if agent not in ["a1", "a2", "a3", "a4"]:
+        raise HTTPException(status_code=400, detail="Agent must be a1, a2, a3, or a4")
+    
+    agent_output = run_store.get_agent_output(run_id, agent)
+    
+    if agent_output is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent {agent} output not found (workflow may not have reached this agent)"
+        )
+    
+    return AgentOutputResponse(
+        agent=agent_output.get("agent") or agent,
+        status=agent_output.get("status") or "unknown",
+        raw_output=agent_output.get("raw_output") or "",
+        structured_output=agent_output.get("structured_output"),
+        guardrail_report=agent_output.get("guardrail_report"),
+        validation=agent_output.get("validation"),
+        usage=agent_output.get("usage")
+    )
+
+
+# Run server
+def start_server(host: str = "0.0.0.0", port: int = 8000):
+    """Start the FastAPI server."""
+    uvicorn.run(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    start_server()
+
@@ -0,0 +1,350 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for LLM completions. Entries are keyed on a hash of the
+full request (model, messages, sampling parameters), so byte-identical calls are
+served locally instead of going back to the API.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+# Default on-disk location and limits (override via environment)
+DEFAULT_CACHE_PATH = os.getenv("ARG_LLM_CACHE_PATH", ".arg_cache/llm_responses.sqlite")
+DEFAULT_MAX_MB = float(os.getenv("ARG_LLM_CACHE_MAX_MB", "256"))
+DEFAULT_TTL_HOURS = float(os.getenv("ARG_LLM_CACHE_TTL_HOURS", "168"))
+
+# SQLite housekeeping: hit access times are written in batches, and expired
+# entries are purged (and the size total re-read) at most this often
+ACCESS_FLUSH_ENTRIES = 64
+ACCESS_FLUSH_SECONDS = 30.0
+PURGE_INTERVAL_SECONDS = 300.0
+
+# Per-run bypass flag (set with bypass_cache())
+_bypass: ContextVar[bool] = ContextVar("arg_llm_cache_bypass", default=False)
+
+
+def make_cache_key(request: Dict[str, Any]) -> str:
+    """
+    Hash a request payload into a stable cache key.
+
+    Args:
+        request: Dict with everything that determines the completion
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Base class for response cache backends (tracks hit/miss counters)."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None."""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response under key."""
+        self._set(key, value)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and backend details."""
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Backend lookup (no counters)."""
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None:
+        """Backend store."""
+
+
+class MemoryResponseCache(ResponseCache):
+    """Process-local LRU cache (useful for tests and short-lived workers)."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["entries"] = len(self._entries)
+        return stats
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk cache backed by a single SQLite file.
+
+    Eviction:
+    - Age: expired entries are dropped on read, and purged on write at most
+      every PURGE_INTERVAL_SECONDS
+    - Size: least-recently-used entries are dropped once max_bytes is exceeded
+
+    Hits do not write: access times are buffered and flushed in one batch
+    (every ACCESS_FLUSH_ENTRIES hits or ACCESS_FLUSH_SECONDS, and before
+    eviction). The total size is kept as a running count, re-read from the
+    table when expired entries are purged (other processes may share the file).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024),
+        ttl_seconds: Optional[float] = DEFAULT_TTL_HOURS * 3600
+    ):
+        super().__init__()
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._accessed_flushed = time.monotonic()
+        self._purged = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses(created_at)"
+            )
+            self._conn.commit()
+            self._total_bytes = self._stored_bytes()
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._delete(key)
+                self._conn.commit()
+                return None
+            self._accessed[key] = now
+            if (
+                len(self._accessed) >= ACCESS_FLUSH_ENTRIES
+                or time.monotonic() - self._accessed_flushed >= ACCESS_FLUSH_SECONDS
+            ):
+                self._flush_access()
+                self._conn.commit()
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO responses (key, value, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total_bytes += size
+            self._evict(now)
+            self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        """Delete one entry, keeping the size total (caller holds the lock)."""
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= row[0]
+        self._accessed.pop(key, None)
+
+    def _flush_access(self) -> None:
+        """Write buffered hit access times in one batch (caller holds the lock)."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+        self._accessed_flushed = time.monotonic()
+
+    def _stored_bytes(self) -> int:
+        """Total size from the table (full scan; caller holds the lock)."""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        """Purge expired entries (periodically), then LRU entries until under max_bytes."""
+        if time.monotonic() - self._purged >= PURGE_INTERVAL_SECONDS:
+            if self.ttl_seconds is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+            self._total_bytes = self._stored_bytes()
+            self._purged = time.monotonic()
+
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # LRU order needs current access times
+        self._flush_access()
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+
+    def flush(self) -> None:
+        """Write buffered access times now (e.g. before shutdown)."""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._accessed.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = self._total_bytes
+        stats.update({"path": str(self.path), "entries": entries, "bytes": total})
+        return stats
+
+
+# Process-wide cache instance (created on first use)
+_cache: Optional[ResponseCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache.
+
+    Backend is selected with ARG_LLM_CACHE: "sqlite" (default), "memory", or "off".
+
+    Returns:
+        ResponseCache instance, or None if caching is disabled
+    """
+    global _cache, _cache_configured
+
+    if _cache_configured:
+        return _cache
+
+    with _cache_lock:
+        if not _cache_configured:
+            backend = os.getenv("ARG_LLM_CACHE", "sqlite").lower()
+            if backend in ("off", "0", "false", "none"):
+                _cache = None
+            elif backend == "memory":
+                _cache = MemoryResponseCache()
+            else:
+                _cache = SQLiteResponseCache()
+            _cache_configured = True
+
+    return _cache
+
+
+def set_cache(cache: Optional[ResponseCache]) -> None:
+    """Replace the process-wide cache (None disables caching)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
+
+
+def cache_bypassed() -> bool:
+    """Return True if the cache is bypassed for the current run."""
+    return _bypass.get()
+
+
+@contextmanager
+def bypass_cache(enabled: bool = True) -> Iterator[None]:
+    """
+    Skip the response cache for every LLM call made inside this block.
+
+    Args:
+        enabled: Bypass when True (convenient for passing a flag straight through)
+    """
+    token = _bypass.set(enabled or _bypass.get())
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
@@ -0,0 +1,344 @@
+"""
+LLM Cassettes (Record/Replay)
+
+Records every chat-completions request/response pair, with timing, to a
+compact JSONL cassette and serves them back by request hash:
+- record: calls go to the real client; each completed response is appended
+- replay: no network or API key; responses come from the cassette, so a run
+  measures pure framework overhead (parsing, guards, graph, saving). A
+  request that is not on the cassette (e.g. a prompt changed) raises
+  CassetteMiss instead of reaching the API.
+
+Requests are keyed with the same hash as the response cache (model,
+messages and sampling parameters; transport options such as stream and
+timeout are ignored), so streamed and non-streamed calls share entries.
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from app.cache import make_cache_key
+from app.fake_llm import FakeAsyncOpenAI, FakeCompletion, FakeOpenAI
+
+
+# Defaults (override via environment)
+DEFAULT_MODE = os.getenv("ARG_LLM_CASSETTE", "off").lower()  # off | record | replay
+DEFAULT_PATH = os.getenv("ARG_LLM_CASSETTE_PATH", ".arg_cassettes/llm.jsonl")
+DEFAULT_REPLAY_TIMING = os.getenv("ARG_LLM_CASSETTE_TIMING", "0").lower() in ("1", "true", "yes", "on")
+
+MODES = ("off", "record", "replay")
+
+# create() arguments that do not change the completion
+TRANSPORT_ARGS = ("stream", "stream_options", "timeout", "extra_headers")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that is not on the cassette."""
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    Hash a chat.completions.create request.
+
+    Args:
+        request: create() keyword arguments
+
+    Returns:
+        Hex digest (equal to the response cache key for the same request)
+    """
+    return make_cache_key({k: v for k, v in request.items() if k not in TRANSPORT_ARGS})
+
+
+class Cassette:
+    """
+    A JSONL cassette in record or replay mode.
+
+    Each line holds one response: key, model, content, finish_reason, usage,
+    ttft_s (time to first token, streams only), latency_s and recorded_at.
+    A request recorded several times is replayed in recording order (the
+    last entry repeats once the others are used).
+
+    Args:
+        path: Cassette file
+        mode: "record" (append) or "replay"
+        replay_timing: In replay mode, sleep for the recorded latencies
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, mode: str = "replay", replay_timing: bool = DEFAULT_REPLAY_TIMING):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_timing = replay_timing
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def lookup(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the next recorded response for a request.
+
+        Raises:
+            CassetteMiss: If the request was never recorded
+        """
+        key = request_key(request)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(
+                    f"Request {key[:12]} (model {request.get('model')}) is not on cassette {self.path}; "
+                    f"re-record it if prompts or parameters changed"
+                )
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            self.replayed += 1
+            return entries[min(served, len(entries) - 1)]
+
+    def record(
+        self,
+        request: Dict[str, Any],
+        content: str,
+        finish_reason: Optional[str],
+        usage: Any,
+        latency_s: float,
+        ttft_s: Optional[float] = None
+    ) -> None:
+        """Append one response to the cassette."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        entry = {
+            "key": request_key(request),
+            "model": request.get("model"),
+            "content": content,
+            "finish_reason": finish_reason,
+            "usage": {
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+                "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+                "prompt_tokens_details": {"cached_tokens": getattr(details, "cached_tokens", 0) or 0}
+            },
+            "ttft_s": round(ttft_s, 4) if ttft_s is not None else None,
+            "latency_s": round(latency_s, 4),
+            "recorded_at": time.time()
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.recorded += 1
+
+    def wrap(self, client: Any) -> Any:
+        """Wrap a sync client so completed responses are recorded."""
+        return _Client(_RecordingCompletions(client.chat.completions, self))
+
+    def wrap_async(self, client: Any) -> Any:
+        """Wrap an async client so completed responses are recorded."""
+        return _Client(_AsyncRecordingCompletions(client.chat.completions, self))
+
+    def replay_client(self) -> "ReplayOpenAI":
+        """Sync client serving responses from the cassette."""
+        return ReplayOpenAI(self)
+
+    def replay_async_client(self) -> "ReplayAsyncOpenAI":
+        """Async client serving responses from the cassette."""
+        return ReplayAsyncOpenAI(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return mode, path and counters."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": str(self.path),
+                "entries": sum(len(entries) for entries in self._entries.values()),
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses
+            }
+
+
+class _Client:
+    """Minimal client exposing chat.completions.create."""
+
+    def __init__(self, completions: Any):
+        self.chat = _Chat(completions)
+
+
+class _Chat:
+    def __init__(self, completions: Any):
+        self.completions = completions
+
+
+class _RecordingCompletions:
+    """Proxies create() to a real client and records each finished response."""
+
+    def __init__(self, completions: Any, cassette: Cassette):
+        self._completions = completions
+        self._cassette = cassette
+
+    def create(self, **kwargs) -> Any:
+        started = time.perf_counter()
+        result = self._completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(kwargs, result, started)
+        choice = result.choices[0]
+        self._cassette.record(
+            kwargs, choice.message.content or "", choice.finish_reason,
+            getattr(result, "usage", None), time.perf_counter() - started
+        )
+        return result
+
+    def _record_stream(self, request: Dict[str, Any], stream: Any, started: float) -> Iterator[Any]:
+        recorder = _StreamRecorder(started)
+        for chunk in stream:
+            recorder.add(chunk)
+            yield chunk
+        recorder.save(self._cassette, request)
+
+
+class _AsyncRecordingCompletions:
+    """Async version of _RecordingCompletions."""
+
+    def __init__(self, completions: Any, cassette: Cassette):
+        self._completions = completions
+        self._cassette = cassette
+
+    async def create(self, **kwargs) -> Any:
+        started = time.perf_counter()
+        result = await self._completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(kwargs, result, started)
+        choice = result.choices[0]
+        self._cassette.record(
+            kwargs, choice.message.content or "", choice.finish_reason,
+            getattr(result, "usage", None), time.perf_counter() - started
+        )
+        return result
+
+    async def _record_stream(self, request: Dict[str, Any], stream: Any, started: float) -> AsyncIterator[Any]:
+        recorder = _StreamRecorder(started)
+        async for chunk in stream:
+            recorder.add(chunk)
+            yield chunk
+        recorder.save(self._cassette, request)
+
+
+class _StreamRecorder:
+    """Accumulates a streamed response (only complete streams are recorded)."""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.parts: List[str] = []
+        self.finish_reason: Optional[str] = None
+        self.usage: Any = None
+        self.ttft_s: Optional[float] = None
+
+    def add(self, chunk: Any) -> None:
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            if self.ttft_s is None:
+                self.ttft_s = time.perf_counter() - self.started
+            self.parts.append(choice.delta.content)
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+
+    def save(self, cassette: Cassette, request: Dict[str, Any]) -> None:
+        cassette.record(
+            request, "".join(self.parts), self.finish_reason, self.usage,
+            time.perf_counter() - self.started, self.ttft_s
+        )
+
+
+class ReplayOpenAI(FakeOpenAI):
+    """Sync client serving responses from a cassette."""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__(latency_s=0.0, tokens_per_s=0.0)
+        self.cassette = cassette
+
+    def completion_for(self, request: Dict[str, Any]) -> FakeCompletion:
+        return _replayed_completion(self.cassette, request)
+
+
+class ReplayAsyncOpenAI(FakeAsyncOpenAI):
+    """Async client serving responses from a cassette."""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__(latency_s=0.0, tokens_per_s=0.0)
+        self.cassette = cassette
+
+    def completion_for(self, request: Dict[str, Any]) -> FakeCompletion:
+        return _replayed_completion(self.cassette, request)
+
+
+def _replayed_completion(cassette: Cassette, request: Dict[str, Any]) -> FakeCompletion:
+    """Build the completion for a request from its cassette entry."""
+    entry = cassette.lookup(request)
+    latency_s, tokens_per_s = 0.0, 0.0
+    if cassette.replay_timing:
+        latency_s = entry.get("ttft_s") or entry.get("latency_s") or 0.0
+        completion_tokens = entry["usage"].get("completion_tokens") or 0
+        generation_s = (entry.get("latency_s") or 0.0) - latency_s
+        if completion_tokens and generation_s > 0:
+            tokens_per_s = completion_tokens / generation_s
+    return FakeCompletion(
+        request, latency_s, tokens_per_s,
+        content=entry["content"], usage=entry["usage"], finish_reason=entry.get("finish_reason")
+    )
+
+
+# Process-wide cassette (created on first use; None when ARG_LLM_CASSETTE=off)
+_cassette: Optional[Cassette] = None
+_configured = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette configured by ARG_LLM_CASSETTE, or None."""
+    global _cassette, _configured
+    if not _configured:
+        with _cassette_lock:
+            if not _configured:
+                if DEFAULT_MODE not in MODES:
+                    raise ValueError(f"ARG_LLM_CASSETTE must be one of {MODES}, got {DEFAULT_MODE!r}")
+                if DEFAULT_MODE != "off":
+                    _cassette = Cassette(DEFAULT_PATH, DEFAULT_MODE)
+                _configured = True
+    return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    """
+    Replace the process-wide cassette (None disables record/replay).
+
+    Clients are wrapped when created, so call app.llm.set_client() afterwards
+    to apply the change to an already-created client.
+    """
+    global _cassette, _configured
+    with _cassette_lock:
+        _cassette = cassette
+        _configured = True
@@ -1,216 +1,451 @@
-"""
-CLI Entry Point
-
-Command-line interface for running the ARG surveillance workflow.
-"""
-
-import os
-import json
-import argparse
-from datetime import datetime
-from pathlib import Path
-
-from app.graph import run_workflow
-
-
-def save_results(state: dict, output_dir: Path):
-    """
-    Save agent outputs to timestamped directory.
-    
-    Args:
-        state: Final workflow state
-        output_dir: Base output directory
-    """
-    # Create timestamped subdirectory
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    run_dir = output_dir / timestamp
-    run_dir.mkdir(parents=True, exist_ok=True)
-    
-    print(f"\n💾 Saving results to: {run_dir}")
-    
-    # Save each agent's output
-    agents = ["a1", "a2", "a3", "a4"]
-    
-    for agent in agents:
-        output_key = f"{agent}_output"
-        if output_key not in state or not state[output_key]:
-            continue
-        
-        agent_output = state[output_key]
-        
-        # Save raw markdown output
-        raw_output = agent_output.get("raw_output", "")
-        if raw_output:
-            md_path = run_dir / f"{agent.upper()}.md"
-            with open(md_path, "w", encoding="utf-8") as f:
-                f.write(raw_output)
-            print(f"  ✓ {agent.upper()}.md")
-        
-        # Save structured JSON output
-        structured = agent_output.get("structured_output")
-        if structured:
-            json_path = run_dir / f"{agent.upper()}.json"
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(structured, f, indent=2)
-            print(f"  ✓ {agent.upper()}.json")
-        
-        # Save guardrail report if present
-        guardrail = agent_output.get("guardrail_report")
-        if guardrail and guardrail.get("violations"):
-            guard_path = run_dir / f"{agent.upper()}_guardrails.json"
-            with open(guard_path, "w", encoding="utf-8") as f:
-                json.dump(guardrail, f, indent=2)
-            print(f"  ⚠ {agent.upper()}_guardrails.json (violations detected)")
-    
-    # Save validation reports
-    validation_path = run_dir / "validation_reports.json"
-    with open(validation_path, "w", encoding="utf-8") as f:
-        json.dump(state.get("validation_reports", {}), f, indent=2)
-    print(f"  ✓ validation_reports.json")
-    
-    # Save full state
-    state_path = run_dir / "full_state.json"
-    with open(state_path, "w", encoding="utf-8") as f:
-        # Remove raw outputs (too large)
-        compact_state = {k: v for k, v in state.items() if k != "user_query"}
-        for agent_key in ["a1_output", "a2_output", "a3_output", "a4_output"]:
-            if agent_key in compact_state:
-                compact_state[agent_key] = {
-                    k: v for k, v in compact_state[agent_key].items() 
-                    if k != "raw_output"
-                }
-        json.dump(compact_state, f, indent=2)
-    print(f"  ✓ full_state.json")
-    
-    # Create summary
-    summary_path = run_dir / "SUMMARY.md"
-    with open(summary_path, "w", encoding="utf-8") as f:
-        f.write(f"# ARG Surveillance Workflow Run\n\n")
-        f.write(f"**Timestamp:** {timestamp}\n\n")
-        f.write(f"**Status:** {state.get('status', 'unknown')}\n\n")
-        
-        if state.get("error"):
-            f.write(f"**Error:** {state['error']}\n\n")
-        
-        f.write(f"## User Query\n\n{state['user_query']}\n\n")
-        
-        f.write(f"## Agent Outputs\n\n")
-        for agent in agents:
-            output_key = f"{agent}_output"
-            if output_key in state and state[output_key]:
-                status = state[output_key].get("status", "unknown")
-                f.write(f"- **{agent.upper()}**: {status}\n")
-        
-        f.write(f"\n## Files Generated\n\n")
-        for file in run_dir.glob("*"):
-            if file.name != "SUMMARY.md":
-                f.write(f"- `{file.name}`\n")
-    
-    print(f"  ✓ SUMMARY.md")
-    print(f"\n✅ Results saved successfully!")
-    
-    return run_dir
-
-
-def main():
-    """Main CLI entry point."""
-    parser = argparse.ArgumentParser(
-        description="ARG Surveillance Multi-Agent Framework",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # Interactive mode
-  python -m app.cli
-  
-  # Direct query
-  python -m app.cli --query "Design a study to monitor ARG dynamics in hospital wastewater"
-  
-  # Specify output directory
-  python -m app.cli --query "..." --output ./my_results
-        """
-    )
-    
-    parser.add_argument(
-        "--query",
-        type=str,
-        help="Research question or study description (if not provided, interactive mode)"
-    )
-    
-    parser.add_argument(
-        "--output",
-        type=str,
-        default="./runs",
-        help="Output directory for results (default: ./runs)"
-    )
-    
-    parser.add_argument(
-        "--no-save",
-        action="store_true",
-        help="Don't save results to disk (just print)"
-    )
-    
-    args = parser.parse_args()
-    
-    # Check for OpenAI API key
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Error: OPENAI_API_KEY environment variable not set")
-        print("   Set it with: export OPENAI_API_KEY='your-key-here'")
-        return 1
-    
-    # Get user query
-    if args.query:
-        user_query = args.query
-    else:
-        print("=" * 60)
-        print("ARG Surveillance Multi-Agent Framework - Interactive Mode")
-        print("=" * 60)
-        print("\nEnter your research question or study description:")
-        print("(Press Ctrl+D or Ctrl+Z when done)\n")
-        
-        lines = []
-        try:
-            while True:
-                line = input()
-                lines.append(line)
-        except EOFError:
-            pass
-        
-        user_query = "\n".join(lines).strip()
-        
-        if not user_query:
-            print("\n❌ No query provided. Exiting.")
-            return 1
-    
-    print("\n" + "=" * 60)
-    print(f"Query: {user_query[:100]}...")
-    print("=" * 60 + "\n")
-    
-    # Run workflow
-    try:
-        final_state = run_workflow(user_query)
-    except Exception as e:
-        print(f"\n❌ Workflow failed with error: {e}")
-        return 1
-    
-    # Save results
-    if not args.no_save:
-        output_dir = Path(args.output)
-        run_dir = save_results(final_state, output_dir)
-        print(f"\n📂 Results saved to: {run_dir.absolute()}")
-    
-    # Print final status
-    status = final_state.get("status", "unknown")
-    if status == "complete":
-        print("\n✅ Workflow completed successfully!")
-        return 0
-    elif status == "warning":
-        print("\n⚠ Workflow completed with warnings")
-        return 0
-    else:
-        print(f"\n❌ Workflow failed: {final_state.get('error', 'Unknown error')}")
-        return 1
-
-
-if __name__ == "__main__":
-    exit(main())
-
+"""
+CLI Entry Point
+
+Command-line interface for running the ARG surveillance workflow.
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from app.llm import missing_api_key, total_usage
+
+
+def save_results(state: dict, output_dir: Path):
+    """
+    Save agent outputs to timestamped directory.
+    
+    Args:
+        state: Final workflow state
+        output_dir: Base output directory
+    """
+    # Create timestamped subdirectory
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir = output_dir / timestamp
+    run_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"\n💾 Saving results to: {run_dir}")
+    
+    # Save each agent's output
+    agents = ["a1", "a2", "a3", "a4"]
+    
+    for agent in agents:
+        output_key = f"{agent}_output"
+        if output_key not in state or not state[output_key]:
+            continue
+        
+        agent_output = state[output_key]
+        
+        # Save raw markdown output
+        raw_output = agent_output.get("raw_output", "")
+        if raw_output:
+            md_path = run_dir / f"{agent.upper()}.md"
+            with open(md_path, "w", encoding="utf-8") as f:
+                f.write(raw_output)
+            print(f"  ✓ {agent.upper()}.md")
+        
+        # Save structured JSON output
+        structured = agent_output.get("structured_output")
+        if structured:
+            json_path = run_dir / f"{agent.upper()}.json"
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(structured, f, indent=2)
+            print(f"  ✓ {agent.upper()}.json")
+        
+        # Save guardrail report if present
+        guardrail = agent_output.get("guardrail_report")
+        if guardrail and guardrail.get("violations"):
+            guard_path = run_dir / f"{agent.upper()}_guardrails.json"
+            with open(guard_path, "w", encoding="utf-8") as f:
+                json.dump(guardrail, f, indent=2)
+            print(f"  ⚠ {agent.upper()}_guardrails.json (violations detected)")
+    
+    # Save validation reports
+    validation_path = run_dir / "validation_reports.json"
+    with open(validation_path, "w", encoding="utf-8") as f:
+        json.dump(state.get("validation_reports", {}), f, indent=2)
+    print(f"  ✓ validation_reports.json")
+    
+    # Save full state
+    state_path = run_dir / "full_state.json"
+    with open(state_path, "w", encoding="utf-8") as f:
+        # Remove raw outputs (too large)
+        compact_state = {k: v for k, v in state.items() if k != "user_query"}
+        for agent_key in ["a1_output", "a2_output", "a3_output", "a4_output"]:
+            if agent_key in compact_state:
+                compact_state[agent_key] = {
+                    k: v for k, v in compact_state[agent_key].items() 
+                    if k != "raw_output"
+                }
+        json.dump(compact_state, f, indent=2)
+    print(f"  ✓ full_state.json")
+    
+    # Create summary
+    summary_path = run_dir / "SUMMARY.md"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(f"# ARG Surveillance Workflow Run\n\n")
+        f.write(f"**Timestamp:** {timestamp}\n\n")
+        f.write(f"**Status:** {state.get('status', 'unknown')}\n\n")
+        
+        if state.get("error"):
+            f.write(f"**Error:** {state['error']}\n\n")
+        
+        f.write(f"## User Query\n\n{state['user_query']}\n\n")
+        
+        f.write(f"## Agent Outputs\n\n")
+        for agent in agents:
+            output_key = f"{agent}_output"
+            if output_key in state and state[output_key]:
+                status = state[output_key].get("status", "unknown")
+                f.write(f"- **{agent.upper()}**: {status}\n")
+        
+        usage = state.get("usage") or {}
+        if usage:
+            f.write(f"\n## Token Usage\n\n")
+            f.write("| Agent | Calls | Cache hits | Prompt | Cached prompt | Completion | API latency (s) |\n")
+            f.write("|-------|-------|------------|--------|---------------|------------|-----------------|\n")
+            rows = [(agent.upper(), usage.get(agent)) for agent in agents]
+            rows.append(("Total", total_usage(usage)))
+            for label, row in rows:
+                if not row:
+                    continue
+                f.write(
+                    f"| {label} | {row['calls']} | {row['cache_hits']} | {row['prompt_tokens']} | "
+                    f"{row['cached_tokens']} | {row['completion_tokens']} | {row['latency_s']} |\n"
+                )
+        
+        f.write(f"\n## Files Generated\n\n")
+        for file in run_dir.glob("*"):
+            if file.name != "SUMMARY.md":
+                f.write(f"- `{file.name}`\n")
+    
+    print(f"  ✓ SUMMARY.md")
+    print(f"\n✅ Results saved successfully!")
+    
+    return run_dir
+
+
+def _print_token(agent: str, delta: str):
+    """Echo streamed agent output to the terminal."""
+    print(delta, end="", flush=True)
+
+
+def load_batch_queries(path: Path) -> list:
+    """
+    Read batch queries from a JSONL file.
+    
+    Each line is either a JSON string or an object with "query" and an
+    optional "id"; blank lines are ignored.
+    
+    Args:
+        path: JSONL file
+        
+    Returns:
+        List of query strings / dicts accepted by run_workflows
+    """
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+            if isinstance(item, dict) and not item.get("query"):
+                raise ValueError(f"{path}:{line_no}: missing \"query\"")
+            queries.append(item)
+    return queries
+
+
+def batch_main(argv: list) -> int:
+    """Entry point for `arg-cli batch`."""
+    parser = argparse.ArgumentParser(
+        prog="arg-cli batch",
+        description="Run the workflow for every query in a JSONL file",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Input lines are JSON strings or {"id": "...", "query": "..."} objects.
+Re-running the same command skips queries already completed in the results file.
+
+Examples:
+  python -m app.cli batch queries.jsonl --concurrency 8
+  python -m app.cli batch queries.jsonl --results ./runs/batch.jsonl --no-save
+  python -m app.cli batch queries.jsonl --pipeline --concurrency 12
+        """
+    )
+    
+    parser.add_argument("queries", type=str, help="JSONL file of queries")
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum workflows running at once, or total stage workers with --pipeline (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Pipeline stages across queries (per-agent worker pools and queues)"
+    )
+    
+    parser.add_argument(
+        "--results",
+        type=str,
+        default=None,
+        help="JSONL results file, appended as queries finish (default: <queries>.results.jsonl)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="./runs",
+        help="Output directory for per-query results (default: ./runs)"
+    )
+    
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Don't save per-query results to disk (results file only)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache for this batch"
+    )
+    
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Time budget per query; LLM call timeouts are capped at what remains"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if missing_api_key():
+        print("❌ Error: OPENAI_API_KEY environment variable not set")
+        print("   Set it with: export OPENAI_API_KEY='your-key-here'")
+        return 1
+    
+    queries_path = Path(args.queries)
+    try:
+        queries = load_batch_queries(queries_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read queries: {e}")
+        return 1
+    
+    results_path = Path(args.results) if args.results else queries_path.with_suffix(".results.jsonl")
+    output_dir = Path(args.output)
+    
+    def on_result(record: dict, state: dict):
+        # One directory per query so concurrent runs never share a timestamp dir
+        if not args.no_save:
+            run_dir = save_results(state, output_dir / record["id"])
+            record["output_path"] = str(run_dir.absolute())
+    
+    from app.graph import run_workflows  # Deferred: keeps --help fast
+    
+    results = run_workflows(
+        queries,
+        concurrency=args.concurrency,
+        results_path=results_path,
+        use_cache=not args.no_cache,
+        on_result=on_result,
+        pipelined=args.pipeline,
+        deadline_s=args.deadline
+    )
+    
+    done = sum(1 for r in results if r["status"] in ("complete", "warning"))
+    print("\n" + "=" * 60)
+    print(f"📦 Batch finished: {done}/{len(results)} queries completed")
+    print(f"📄 Results: {results_path.absolute()}")
+    _print_pool_usage()
+    print("=" * 60)
+    
+    if done < len(results):
+        print("⚠ Re-run the same command to retry failed queries")
+        return 1
+    return 0
+
+
+def _print_pool_usage():
+    """Print HTTP connection pool saturation (for sizing --concurrency)."""
+    from app.http_pool import pool_stats
+    
+    pool = pool_stats()["sync"]
+    if pool["requests"]:
+        print(
+            f"🔌 HTTP pool: peak {pool['peak_in_flight']} requests in flight for "
+            f"{pool['max_connections']} connections, {pool['saturated_requests']} of "
+            f"{pool['requests']} requests waited for a connection"
+        )
+
+
+def main():
+    """Main CLI entry point."""
+    if sys.argv[1:2] == ["batch"]:
+        return batch_main(sys.argv[2:])
+    
+    parser = argparse.ArgumentParser(
+        description="ARG Surveillance Multi-Agent Framework",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Interactive mode
+  python -m app.cli
+  
+  # Direct query
+  python -m app.cli --query "Design a study to monitor ARG dynamics in hospital wastewater"
+  
+  # Specify output directory
+  python -m app.cli --query "..." --output ./my_results
+  
+  # Resume a failed or interrupted run from its last checkpoint
+  python -m app.cli --resume 20240101_120000_000000
+  
+  # Batch mode (see: python -m app.cli batch --help)
+  python -m app.cli batch queries.jsonl --concurrency 8
+        """
+    )
+    
+    parser.add_argument(
+        "--query",
+        type=str,
+        help="Research question or study description (if not provided, interactive mode)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="./runs",
+        help="Output directory for results (default: ./runs)"
+    )
+    
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Don't save results to disk (just print)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache for this run"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print agent output live as it is generated"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="Resume a checkpointed run from its first incomplete stage"
+    )
+    
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Time budget for the run; LLM call timeouts are capped at what remains"
+    )
+    
+    args = parser.parse_args()
+    
+    # Check for OpenAI API key (.env included)
+    if missing_api_key():
+        print("❌ Error: OPENAI_API_KEY environment variable not set")
+        print("   Set it with: export OPENAI_API_KEY='your-key-here'")
+        return 1
+    
+    # Get user query
+    if args.resume:
+        user_query = None
+    elif args.query:
+        user_query = args.query
+    else:
+        print("=" * 60)
+        print("ARG Surveillance Multi-Agent Framework - Interactive Mode")
+        print("=" * 60)
+        print("\nEnter your research question or study description:")
+        print("(Press Ctrl+D or Ctrl+Z when done)\n")
+        
+        lines = []
+        try:
+            while True:
+                line = input()
+                lines.append(line)
+        except EOFError:
+            pass
+        
+        user_query = "\n".join(lines).strip()
+        
+        if not user_query:
+            print("\n❌ No query provided. Exiting.")
+            return 1
+    
+    if user_query is not None:
+        print("\n" + "=" * 60)
+        print(f"Query: {user_query[:100]}...")
+        print("=" * 60 + "\n")
+    
+    from app.graph import run_workflow, resume_workflow  # Deferred: keeps --help fast
+    
+    # Run workflow (checkpointed under run_id so it can be resumed)
+    run_id = args.resume or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    try:
+        on_token = _print_token if args.stream else None
+        if args.resume:
+            final_state = resume_workflow(
+                run_id, use_cache=not args.no_cache, on_token=on_token, deadline_s=args.deadline
+            )
+        else:
+            final_state = run_workflow(
+                user_query,
+                use_cache=not args.no_cache,
+                on_token=on_token,
+                run_id=run_id,
+                deadline_s=args.deadline
+            )
+    except KeyError as e:
+        print(f"\n❌ {e.args[0]}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ Workflow failed with error: {e}")
+        print(f"   Resume with: python -m app.cli --resume {run_id}")
+        return 1
+    
+    # Save results
+    if not args.no_save:
+        output_dir = Path(args.output)
+        run_dir = save_results(final_state, output_dir)
+        print(f"\n📂 Results saved to: {run_dir.absolute()}")
+    
+    # Print final status
+    status = final_state.get("status", "unknown")
+    if status == "complete":
+        print("\n✅ Workflow completed successfully!")
+        return 0
+    elif status == "warning":
+        print("\n⚠ Workflow completed with warnings")
+        return 0
+    else:
+        print(f"\n❌ Workflow failed: {final_state.get('error', 'Unknown error')}")
+        print(f"   Resume with: python -m app.cli --resume {run_id}")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
+
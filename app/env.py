@@ -0,0 +1,46 @@
+"""
+Environment Loading
+
+Settings are module constants read from the environment at import (ARG_*),
+so the .env file has to be loaded before any app module is imported. The
+app package does that from its __init__; python-dotenv is only imported
+when there is a .env file to load.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+_env_loaded = False
+
+
+def find_env_file(start: Optional[Path] = None) -> Optional[Path]:
+    """
+    Find the nearest .env file.
+
+    Args:
+        start: Directory to search upward from (default: the app package
+            directory, then the working directory, as for an installed package)
+
+    Returns:
+        Path to the .env file, or None if there is none
+    """
+    starts = [start] if start is not None else [Path(__file__).resolve().parent, Path(os.getcwd())]
+    for directory in starts:
+        for candidate in (directory, *directory.parents):
+            path = candidate / ".env"
+            if path.is_file():
+                return path
+    return None
+
+
+def load_env() -> None:
+    """Load environment variables from the .env file (once; set variables win)."""
+    global _env_loaded
+    if not _env_loaded:
+        path = find_env_file()
+        if path is not None:
+            from dotenv import load_dotenv
+
+            load_dotenv(path)
+        _env_loaded = True
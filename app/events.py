@@ -0,0 +1,187 @@
+"""
+Run Event Broker
+
+Fan-out of workflow progress events (node start/finish, validation results,
+token deltas) to live subscribers such as the SSE and WebSocket endpoints.
+"""
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+
+# Event types that end a run's stream
+TERMINAL_EVENTS = ("workflow_end",)
+
+
+class _RunChannel:
+    """Event history and live subscribers for one run."""
+
+    def __init__(self, max_history: int):
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        self.subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.next_id = 1
+        self.closed = False
+
+
+class RunEventBroker:
+    """
+    Publish/subscribe hub for per-run events.
+
+    Publishing is thread-safe (events may come from worker threads); each
+    subscriber receives the run's history first, then live events, until the
+    run publishes a terminal event. Channels are created by open() or
+    publish() only, so subscribing to an unknown run holds no memory.
+    """
+
+    def __init__(self, max_runs: int = 256, max_history: int = 20000):
+        self.max_runs = max_runs
+        self.max_history = max_history
+        self._channels: "OrderedDict[str, _RunChannel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, run_id: str) -> None:
+        """Create (or reopen) a run's channel before its first event, e.g. when it is queued."""
+        with self._lock:
+            self._channel(run_id).closed = False
+
+    def publish(self, run_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record an event and push it to live subscribers.
+
+        Args:
+            run_id: Workflow run ID
+            event: Event dict (must contain "event")
+
+        Returns:
+            The stored event, with "id" and "ts" filled in
+        """
+        with self._lock:
+            channel = self._channel(run_id)
+            event = dict(event)
+            event["id"] = channel.next_id
+            event.setdefault("ts", time.time())
+            channel.next_id += 1
+            channel.history.append(event)
+            if event["event"] in TERMINAL_EVENTS:
+                channel.closed = True
+            elif event["event"] == "workflow_start":
+                channel.closed = False  # Resumed run
+            subscribers = list(channel.subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # Subscriber's loop already closed
+
+        return event
+
+    async def subscribe(
+        self,
+        run_id: str,
+        last_event_id: int = 0,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events for a run: replayed history, then live events.
+
+        Yields nothing for a run without a channel (never opened or
+        published here, or already forgotten); see has_run().
+
+        Args:
+            run_id: Workflow run ID
+            last_event_id: Skip events with id <= this (SSE reconnects)
+            heartbeat: If set, yield None after this many idle seconds
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                return
+            backlog = [e for e in channel.history if e["id"] > last_event_id]
+            closed = channel.closed
+            if not closed:
+                channel.subscribers.append((loop, queue))
+
+        try:
+            for event in backlog:
+                yield event
+                last_event_id = event["id"]
+            if closed:
+                return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["id"] <= last_event_id:
+                    continue
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                channel = self._channels.get(run_id)
+                if channel is not None and (loop, queue) in channel.subscribers:
+                    channel.subscribers.remove((loop, queue))
+
+    def has_run(self, run_id: str) -> bool:
+        """Return True if any event has been published for run_id."""
+        with self._lock:
+            return run_id in self._channels
+
+    def _channel(self, run_id: str) -> _RunChannel:
+        """Get or create a run channel (caller holds the lock)."""
+        channel = self._channels.get(run_id)
+        if channel is None:
+            channel = _RunChannel(self.max_history)
+            self._channels[run_id] = channel
+            # Forget the oldest finished runs beyond max_runs (runs still in progress are kept)
+            excess = len(self._channels) - self.max_runs
+            if excess > 0:
+                finished = [key for key, value in self._channels.items() if value.closed]
+                for key in finished[:excess]:
+                    del self._channels[key]
+        return channel
+
+
+# Process-wide broker used by the API
+broker = RunEventBroker()
+
+
+# Stage status implied by each node event (a node_end whose validation failed
+# maps to "error" if that stopped the run, else "invalid")
+_STAGE_STATUS_BY_EVENT = {
+    "node_start": "running",
+    "node_end": "complete",
+    "node_error": "error",
+    "node_skipped": "skipped",
+}
+
+
+def initial_stage_statuses() -> Dict[str, str]:
+    """Return the stage status map for a run that has not started."""
+    return {agent: "pending" for agent in ("a1", "a2", "a3", "a4")}
+
+
+def apply_stage_event(stages: Dict[str, str], event: Dict[str, Any]) -> None:
+    """
+    Update a stage status map (a1..a4 -> pending/running/complete/invalid/error/skipped).
+
+    Args:
+        stages: Map to update in place
+        event: Workflow event
+    """
+    status = _STAGE_STATUS_BY_EVENT.get(event.get("event"))
+    if status == "complete" and event.get("valid") is False:
+        status = "error" if event.get("workflow_status") == "error" else "invalid"
+    agent = event.get("agent")
+    if status is not None and agent in stages:
+        stages[agent] = status
@@ -0,0 +1,649 @@
+"""
+Fake LLM Backend
+
+Deterministic stand-in for the OpenAI chat-completions API, for load tests,
+benchmarks and CI runs without network access or API cost:
+- FakeOpenAI / FakeAsyncOpenAI: drop-in clients (`ARG_LLM_BACKEND=fake`)
+- MockOpenAIServer: local HTTP server speaking enough of the
+  chat-completions protocol (JSON and SSE streaming) to sit behind the real
+  `OpenAI` client via OPENAI_BASE_URL
+
+Each agent gets a canned, schema-valid response (recognised by its system
+prompt). Latency is simulated as time-to-first-token plus a token rate.
+
+Usage:
+    python -m app.fake_llm --port 8199
+    OPENAI_BASE_URL=http://127.0.0.1:8199/v1 OPENAI_API_KEY=fake arg-cli --query "..."
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from app.sections import code_blocks
+from app.tokens import count_message_tokens, count_tokens
+
+
+# Defaults (override via environment)
+DEFAULT_LATENCY_S = float(os.getenv("ARG_FAKE_LATENCY_S", "0.05"))
+DEFAULT_TOKENS_PER_S = float(os.getenv("ARG_FAKE_TOKENS_PER_S", "0"))  # 0 = instant
+DEFAULT_PORT = int(os.getenv("ARG_FAKE_PORT", "8199"))
+
+# Characters per streamed chunk (~4 tokens, similar to real deltas)
+CHUNK_CHARS = 16
+
+FAKE_MODEL = "fake-gpt"
+
+
+# ============================================================================
+# Canned responses
+# ============================================================================
+
+A1_RESPONSE = """## Sampling Design
+
+Two hypotheses are tested across a treatment gradient, sampled monthly.
+
+```json
+""" + json.dumps({
+    "study_metadata": {
+        "research_question": "How effective is wastewater treatment at removing ARGs?",
+        "primary_objective": "Quantification",
+        "study_system": "Wastewater",
+        "scale": "Local"
+    },
+    "hypothesis_framework": {
+        "null_hypothesis": "There is no difference in ARG abundance between influent and effluent",
+        "alternative_hypothesis": "ARG abundance is reduced in effluent compared to influent",
+        "secondary_hypotheses": [
+            "ARG abundance is elevated downstream of the discharge point"
+        ]
+    },
+    "study_design": {
+        "framework_type": "Hybrid",
+        "justification": "Treatment-gradient sites sampled monthly capture removal and seasonality",
+        "spatial_design": {
+            "framework": "Spatial gradient (wastewater treatment process)",
+            "sampling_points": [
+                {"location": "Influent", "n_biological_replicates": 5},
+                {"location": "Activated sludge tank", "n_biological_replicates": 5},
+                {"location": "Effluent", "n_biological_replicates": 5},
+                {"location": "Receiving river (downstream)", "n_biological_replicates": 5}
+            ]
+        },
+        "temporal_design": {
+            "framework": "Time series with seasonal coverage",
+            "sampling_frequency": "Monthly",
+            "duration": "12 months",
+            "total_sampling_events": 12
+        }
+    },
+    "sampling_scheme": {
+        "replication": {
+            "biological_replicates": 5,
+            "technical_replicates": 2
+        },
+        "total_samples": 240
+    },
+    "metadata_requirements": {
+        "critical_metadata": [
+            "sample_id", "collection_date", "location", "water_temperature", "ph", "flow_rate"
+        ],
+        "supplementary_metadata": ["antibiotic_usage_records"]
+    },
+    "qc_strategy": {
+        "negative_controls": ["Extraction blank", "PCR no-template control"],
+        "positive_controls": ["Mock community", "Reference strain with known ARGs"]
+    },
+    "statistical_considerations": {
+        "power": 0.8,
+        "alpha": 0.05,
+        "recommended_tests": ["Kruskal-Wallis", "PERMANOVA"]
+    },
+    "handoff_to_wetlab": {
+        "sample_types": [
+            {"matrix": "Wastewater (liquid)", "expected_biomass": "High", "biosafety_level": "BSL-2"},
+            {"matrix": "Activated sludge", "expected_biomass": "Very high", "biosafety_level": "BSL-2"},
+            {"matrix": "River water", "expected_biomass": "Low", "biosafety_level": "BSL-1"}
+        ],
+        "downstream_analyses": ["qPCR", "shotgun metagenomics"],
+        "total_samples": 240
+    }
+}, indent=2) + """
+```
+"""
+
+A2_RESPONSE = """## Wet-Lab Protocol Plan
+
+Protocol choices are referenced conceptually; follow the cited kit manuals.
+
+```json
+""" + json.dumps({
+    "protocol_metadata": {
+        "protocol_id": "WetLab_ARG-WWTP_fake",
+        "study_source": "Sampling Design Agent output",
+        "total_samples": 240
+    },
+    "sample_collection_preservation": {
+        "approach": "Composite sampling with cold-chain transport",
+        "preservation": "Freeze on arrival; avoid repeated freeze-thaw",
+        "reference": "ISO 5667-3 water quality sampling guidance"
+    },
+    "extraction": {
+        "method": "Bead-beating column extraction suited to high-inhibitor matrices",
+        "reference": "DNeasy PowerSoil Pro kit manual",
+        "low_biomass_handling": "Process river samples in a separate batch with extra blanks"
+    },
+    "library_prep": {
+        "method": "Tagmentation-based shotgun library preparation",
+        "reference": "Illumina DNA Prep reference guide",
+        "sequencing_parameters": {
+            "platform": "Illumina NovaSeq",
+            "read_configuration": "Paired-end",
+            "target_depth": "Deep coverage for low-abundance ARG detection"
+        }
+    },
+    "quality_control": {
+        "extraction_blanks": "1 per extraction batch",
+        "checkpoints": ["DNA yield and purity", "Library fragment size", "Control read counts"]
+    },
+    "handoff_to_bioinformatics": {
+        "data_type": "Shotgun metagenomics",
+        "platform": "illumina",
+        "read_layout": "paired-end",
+        "controls": ["extraction_blank", "mock_community"],
+        "metadata_file": "sample_metadata.tsv"
+    }
+}, indent=2) + """
+```
+"""
+
+A3_RESPONSE = """## Bioinformatics Pipeline
+
+```bash
+# pipeline.sh
+# Template only: review paths and parameters before running
+set -euo pipefail
+CONFIG=config.yaml
+fastp --in1 reads_R1.fastq.gz --in2 reads_R2.fastq.gz --out1 trimmed_R1.fastq.gz --out2 trimmed_R2.fastq.gz
+bowtie2 -x host_index -1 trimmed_R1.fastq.gz -2 trimmed_R2.fastq.gz --un-conc-gz clean_R%.fastq.gz
+rgi bwt --read_one clean_R1.fastq.gz --read_two clean_R2.fastq.gz --output_file arg_hits
+```
+
+```yaml
+# config.yaml
+samples: sample_metadata.tsv
+trimming:
+  min_quality: 20
+  min_length: 50
+host_removal:
+  index: host_index
+arg_annotation:
+  database: CARD
+  min_identity: 90
+```
+
+```shell
+# setup_databases.sh - database setup (templates only)
+CARD_DIR=databases/card
+HOST_INDEX_DIR=databases/host
+```
+
+```markdown
+# README
+Pipeline template: quality trimming, host read removal and ARG annotation
+against CARD. Outputs are normalised ARG abundance tables per sample.
+```
+
+```yaml
+# data_handoff.yaml
+outputs:
+  arg_abundance: results/arg_abundance.tsv
+  taxonomy: results/taxonomy.tsv
+  metadata: sample_metadata.tsv
+normalisation: copies_per_16S
+```
+"""
+
+A4_RESPONSE = """## Statistical Analysis
+
+```rmarkdown
+# analysis.Rmd
+---
+title: "ARG surveillance analysis"
+output: html_document
+---
+
+## Data
+Abundance and metadata are read with the loaders from helpers.R.
+
+```{r setup}
+source("helpers.R")
+abundance <- load_abundance("results/arg_abundance.tsv")
+metadata <- load_metadata("metadata.tsv")
+```
+
+## Location effect
+Total ARG abundance per location, compared with a Kruskal-Wallis test.
+
+```{r location-effect}
+plot_arg_abundance(abundance, metadata)
+test_location_effect(abundance, metadata)
+```
+```
+
+```r
+# helpers.R
+load_abundance <- function(path) read.delim(path, row.names = 1)
+load_metadata <- function(path) read.delim(path)
+plot_arg_abundance <- function(abundance, metadata) {
+  boxplot(colSums(abundance) ~ metadata$location)
+}
+test_location_effect <- function(abundance, metadata) {
+  kruskal.test(colSums(abundance) ~ metadata$location)
+}
+```
+
+```markdown
+# Analysis workflow
+1. Load ARG abundance and metadata
+2. Compare total ARG abundance across locations (Kruskal-Wallis)
+3. Visualise abundance per location
+```
+"""
+
+GENERIC_RESPONSE = "Fake completion from the ARG-Copilot test backend."
+
+# Agent system prompt module -> canned response
+_CANNED_BY_PROMPT = {
+    "a1_sampling_system_prompt": A1_RESPONSE,
+    "a2_wetlab_system_prompt": A2_RESPONSE,
+    "a3_bioinfo_system_prompt": A3_RESPONSE,
+    "a4_analysis_system_prompt": A4_RESPONSE,
+}
+_canned: Dict[str, str] = {}
+_canned_lock = threading.Lock()
+
+
+def canned_response(messages: List[Dict[str, Any]]) -> str:
+    """
+    Pick the canned response for a request.
+
+    Args:
+        messages: Chat messages (the system prompt identifies the agent)
+
+    Returns:
+        The agent's canned response, or GENERIC_RESPONSE
+    """
+    if not _canned:
+        import importlib
+
+        with _canned_lock:
+            for module_name, response in _CANNED_BY_PROMPT.items():
+                text = importlib.import_module(f"app.prompts.{module_name}").TEXT
+                _canned[text] = response
+    system = messages[0]["content"] if messages and messages[0].get("role") == "system" else ""
+    return _canned.get(system, GENERIC_RESPONSE)
+
+
+# Section sub-requests (app/sections.py) name the one file they want
+_SECTION_PATTERN = re.compile(r"Generate ONLY the (\S+) deliverable")
+
+
+def _requested_section(content: str, messages: List[Dict[str, Any]]) -> str:
+    """For a section sub-request, the canned code block naming that file."""
+    match = _SECTION_PATTERN.search(messages[-1].get("content") or "") if messages else None
+    if match is None:
+        return content
+    stem = match.group(1).split(".")[0].lower()
+    for language, block in code_blocks(content):
+        if stem in block.split("\n", 1)[0].lower():
+            return f"```{language}\n{block}\n```"
+    return content
+
+
+def _apply_output_options(content: str, request: Dict[str, Any]) -> str:
+    """
+    Apply a request's response_format and stop sequences to canned content.
+
+    JSON mode returns only the fenced JSON block (as the API returns a bare
+    object); generation ends before the first stop sequence.
+    """
+    response_format = request.get("response_format") or {}
+    if response_format.get("type") in ("json_object", "json_schema") and "```json" in content:
+        start = content.find("```json") + 7
+        content = content[start:content.find("```", start)].strip()
+    stop = request.get("stop") or []
+    for sequence in [stop] if isinstance(stop, str) else stop:
+        if sequence in content:
+            content = content[:content.find(sequence)]
+    return content
+
+
+# ============================================================================
+# Completion simulation (wire-format dicts shared by clients and server)
+# ============================================================================
+
+class FakeCompletion:
+    """
+    One simulated completion: content, usage and timing for a request.
+
+    Args:
+        request: chat.completions.create keyword arguments / JSON body
+        latency_s: Time to first token
+        tokens_per_s: Generation rate (0 = instant)
+        content: Response text (default: canned response for the agent)
+        usage: Usage payload to report (default: counted locally)
+        finish_reason: Finish reason to report (default: "stop"/"length")
+    """
+
+    def __init__(
+        self,
+        request: Dict[str, Any],
+        latency_s: float,
+        tokens_per_s: float,
+        content: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        finish_reason: Optional[str] = None
+    ):
+        self.model = request.get("model") or FAKE_MODEL
+        self.stream = bool(request.get("stream"))
+        self.include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+        self.latency_s = latency_s
+        self.tokens_per_s = tokens_per_s
+        self.created = int(time.time())
+        self.id = f"chatcmpl-fake-{time.monotonic_ns()}"
+
+        messages = request.get("messages") or []
+        if content is not None:
+            # Replayed response: report it exactly as recorded
+            self.content = content
+            self.finish_reason = finish_reason or "stop"
+            self.usage = usage or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            return
+
+        content = _requested_section(canned_response(messages), messages)
+        content = _apply_output_options(content, request)
+        self.finish_reason = "stop"
+        max_tokens = request.get("max_tokens")
+        completion_tokens = count_tokens(content)
+        if max_tokens and completion_tokens > max_tokens:
+            content = content[:len(content) * max_tokens // completion_tokens]
+            completion_tokens = count_tokens(content)
+            self.finish_reason = "length"
+        self.content = content
+        self.usage = {
+            "prompt_tokens": count_message_tokens(messages),
+            "completion_tokens": completion_tokens,
+            "total_tokens": count_message_tokens(messages) + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+
+    def total_delay(self) -> float:
+        """Seconds a non-streamed response takes."""
+        generation = self.usage["completion_tokens"] / self.tokens_per_s if self.tokens_per_s else 0.0
+        return self.latency_s + generation
+
+    def response(self) -> Dict[str, Any]:
+        """chat.completion payload."""
+        return {
+            "id": self.id,
+            "object": "chat.completion",
+            "created": self.created,
+            "model": self.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.content},
+                "finish_reason": self.finish_reason
+            }],
+            "usage": self.usage
+        }
+
+    def chunks(self) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """
+        Yield (delay_before, chat.completion.chunk payload) pairs.
+
+        The first chunk waits for latency_s; later ones for their share of
+        the token rate. A usage chunk follows when stream_options asks for it.
+        """
+        pieces = [
+            self.content[i:i + CHUNK_CHARS] for i in range(0, len(self.content), CHUNK_CHARS)
+        ] or [""]
+        per_chunk = 0.0
+        if self.tokens_per_s:
+            per_chunk = self.usage["completion_tokens"] / self.tokens_per_s / len(pieces)
+        for n, piece in enumerate(pieces):
+            delay = self.latency_s if n == 0 else per_chunk
+            yield delay, self._chunk({"content": piece}, None)
+        yield 0.0, self._chunk({}, self.finish_reason)
+        if self.include_usage:
+            yield 0.0, {**self._chunk_base(), "choices": [], "usage": self.usage}
+
+    def _chunk_base(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "object": "chat.completion.chunk",
+            "created": self.created,
+            "model": self.model
+        }
+
+    def _chunk(self, delta: Dict[str, Any], finish_reason: Optional[str]) -> Dict[str, Any]:
+        return {
+            **self._chunk_base(),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+
+
+# ============================================================================
+# In-process clients
+# ============================================================================
+
+class _Namespace:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class FakeOpenAI:
+    """
+    Drop-in replacement for openai.OpenAI (chat.completions.create only).
+
+    Responses are real openai.types objects, so usage, streaming and
+    finish_reason handling run through the same code paths as production.
+    """
+
+    def __init__(self, latency_s: float = DEFAULT_LATENCY_S, tokens_per_s: float = DEFAULT_TOKENS_PER_S):
+        self.latency_s = latency_s
+        self.tokens_per_s = tokens_per_s
+        self.requests = 0
+        self.chat = _Namespace(completions=_Namespace(create=self._create))
+
+    def _create(self, **kwargs) -> Any:
+        from openai.types.chat import ChatCompletion
+
+        self.requests += 1
+        completion = self.completion_for(kwargs)
+        if completion.stream:
+            return self._stream(completion)
+        time.sleep(completion.total_delay())
+        return ChatCompletion.model_validate(completion.response())
+
+    def completion_for(self, request: Dict[str, Any]) -> FakeCompletion:
+        """Simulate the completion for a request (override to change responses)."""
+        return FakeCompletion(request, self.latency_s, self.tokens_per_s)
+
+    @staticmethod
+    def _stream(completion: FakeCompletion) -> Iterator[Any]:
+        from openai.types.chat import ChatCompletionChunk
+
+        for delay, chunk in completion.chunks():
+            if delay:
+                time.sleep(delay)
+            yield ChatCompletionChunk.model_validate(chunk)
+
+
+class FakeAsyncOpenAI:
+    """Drop-in replacement for openai.AsyncOpenAI (chat.completions.create only)."""
+
+    def __init__(self, latency_s: float = DEFAULT_LATENCY_S, tokens_per_s: float = DEFAULT_TOKENS_PER_S):
+        self.latency_s = latency_s
+        self.tokens_per_s = tokens_per_s
+        self.requests = 0
+        self.chat = _Namespace(completions=_Namespace(create=self._create))
+
+    async def _create(self, **kwargs) -> Any:
+        from openai.types.chat import ChatCompletion
+
+        self.requests += 1
+        completion = self.completion_for(kwargs)
+        if completion.stream:
+            return self._stream(completion)
+        await asyncio.sleep(completion.total_delay())
+        return ChatCompletion.model_validate(completion.response())
+
+    def completion_for(self, request: Dict[str, Any]) -> FakeCompletion:
+        """Simulate the completion for a request (override to change responses)."""
+        return FakeCompletion(request, self.latency_s, self.tokens_per_s)
+
+    @staticmethod
+    async def _stream(completion: FakeCompletion) -> AsyncIterator[Any]:
+        from openai.types.chat import ChatCompletionChunk
+
+        for delay, chunk in completion.chunks():
+            if delay:
+                await asyncio.sleep(delay)
+            yield ChatCompletionChunk.model_validate(chunk)
+
+
+# ============================================================================
+# Mock HTTP server
+# ============================================================================
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Handles POST /v1/chat/completions (JSON or SSE) and GET /v1/models."""
+
+    protocol_version = "HTTP/1.1"
+    server: "MockOpenAIServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Keep benchmark output clean
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": FAKE_MODEL, "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send_json(400, {"error": {"message": f"Invalid JSON: {e}"}})
+            return
+
+        self.server.count_request()
+        completion = FakeCompletion(request, self.server.latency_s, self.server.tokens_per_s)
+        if not completion.stream:
+            time.sleep(completion.total_delay())
+            self._send_json(200, completion.response())
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for delay, chunk in completion.chunks():
+            if delay:
+                time.sleep(delay)
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Local chat-completions server backed by FakeCompletion.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 = pick a free one)
+        latency_s: Time to first token
+        tokens_per_s: Generation rate (0 = instant)
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        latency_s: float = DEFAULT_LATENCY_S,
+        tokens_per_s: float = DEFAULT_TOKENS_PER_S
+    ):
+        super().__init__((host, port), _MockHandler)
+        self.latency_s = latency_s
+        self.tokens_per_s = tokens_per_s
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """OPENAI_BASE_URL for clients of this server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> "MockOpenAIServer":
+        """Serve from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name="mock-openai", daemon=True).start()
+        return self
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the mock chat-completions server in the foreground."""
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to bind")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_S, help="Time to first token (s)")
+    parser.add_argument("--tokens-per-sec", type=float, default=DEFAULT_TOKENS_PER_S,
+                        help="Generation rate (0 = instant)")
+    args = parser.parse_args(argv)
+
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.tokens_per_sec)
+    print(f"🧪 Mock OpenAI server on {server.base_url}")
+    print(f"   export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=fake")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,233 +1,1425 @@
-"""
-LangGraph Orchestration
-
-Defines the multi-agent workflow graph: A1 → A2 → A3 → A4
-"""
-
-from typing import TypedDict, Dict, Any
-from langgraph.graph import StateGraph, END
-
-from app.agents.a1_sampling import run_sampling_agent, validate_sampling_output
-from app.agents.a2_wetlab import run_wetlab_agent, validate_wetlab_output
-from app.agents.a3_bioinfo import run_bioinfo_agent, validate_bioinfo_output
-from app.agents.a4_analysis import run_analysis_agent, validate_analysis_output
-
-
-# State schema for the workflow
-class WorkflowState(TypedDict):
-    """State passed between agents in the graph."""
-    user_query: str
-    a1_output: Dict[str, Any]
-    a2_output: Dict[str, Any]
-    a3_output: Dict[str, Any]
-    a4_output: Dict[str, Any]
-    validation_reports: Dict[str, Any]
-    status: str
-    error: str
-
-
-# Agent node functions
-def node_a1_sampling(state: WorkflowState) -> WorkflowState:
-    """Execute A1 Sampling Agent."""
-    print("🔬 Running A1: Sampling Design Agent...")
-    
-    try:
-        output = run_sampling_agent(state["user_query"])
-        validation = validate_sampling_output(output)
-        
-        state["a1_output"] = output
-        state["validation_reports"]["a1"] = validation
-        
-        # Only set error if there's NO output at all
-        if not output.get("raw_output"):
-            state["status"] = "error"
-            state["error"] = "A1 produced no output"
-        elif not validation["valid"]:
-            # Validation failed but we have output - continue with warning
-            state["status"] = "warning"
-            print(f"⚠ A1 validation warnings: {validation.get('errors', [])}")
-        
-        print(f"✓ A1 complete (status: {output['status']})")
-    
-    except Exception as e:
-        print(f"✗ A1 failed: {e}")
-        import traceback
-        traceback.print_exc()  # Print full traceback for debugging
-        state["status"] = "error"
-        state["error"] = str(e)
-    
-    return state
-
-
-def node_a2_wetlab(state: WorkflowState) -> WorkflowState:
-    """Execute A2 Wet-Lab Agent."""
-    print("🧪 Running A2: Wet-Lab Protocol Agent...")
-    
-    if state.get("status") == "error":
-        print("⚠ Skipping A2 due to previous error")
-        return state
-    
-    try:
-        output = run_wetlab_agent(state["a1_output"])
-        validation = validate_wetlab_output(output)
-        
-        state["a2_output"] = output
-        state["validation_reports"]["a2"] = validation
-        
-        if not validation["valid"]:
-            state["status"] = "error"
-            state["error"] = f"A2 validation failed: {validation['errors']}"
-        
-        print(f"✓ A2 complete (status: {output['status']})")
-    
-    except Exception as e:
-        print(f"✗ A2 failed: {e}")
-        state["status"] = "error"
-        state["error"] = str(e)
-    
-    return state
-
-
-def node_a3_bioinfo(state: WorkflowState) -> WorkflowState:
-    """Execute A3 Bioinformatics Agent."""
-    print("💻 Running A3: Bioinformatics Pipeline Agent...")
-    
-    if state.get("status") == "error":
-        print("⚠ Skipping A3 due to previous error")
-        return state
-    
-    try:
-        output = run_bioinfo_agent(state["a2_output"])
-        validation = validate_bioinfo_output(output)
-        
-        state["a3_output"] = output
-        state["validation_reports"]["a3"] = validation
-        
-        if not validation["valid"]:
-            state["status"] = "error"
-            state["error"] = f"A3 validation failed: {validation['errors']}"
-        
-        print(f"✓ A3 complete (status: {output['status']})")
-    
-    except Exception as e:
-        print(f"✗ A3 failed: {e}")
-        state["status"] = "error"
-        state["error"] = str(e)
-    
-    return state
-
-
-def node_a4_analysis(state: WorkflowState) -> WorkflowState:
-    """Execute A4 Analysis Agent."""
-    print("📊 Running A4: Statistical Analysis Agent...")
-    
-    if state.get("status") == "error":
-        print("⚠ Skipping A4 due to previous error")
-        return state
-    
-    try:
-        output = run_analysis_agent(state["a3_output"])
-        validation = validate_analysis_output(output)
-        
-        state["a4_output"] = output
-        state["validation_reports"]["a4"] = validation
-        
-        if not validation["valid"]:
-            state["status"] = "warning"  # A4 is terminal, so warning not error
-        else:
-            state["status"] = "complete"
-        
-        print(f"✓ A4 complete (status: {output['status']})")
-    
-    except Exception as e:
-        print(f"✗ A4 failed: {e}")
-        state["status"] = "error"
-        state["error"] = str(e)
-    
-    return state
-
-
-# Build the graph
-def create_workflow_graph():
-    """
-    Create the LangGraph workflow.
-    
-    Returns:
-        Compiled LangGraph
-    """
-    workflow = StateGraph(WorkflowState)
-    
-    # Add nodes
-    workflow.add_node("a1_sampling", node_a1_sampling)
-    workflow.add_node("a2_wetlab", node_a2_wetlab)
-    workflow.add_node("a3_bioinfo", node_a3_bioinfo)
-    workflow.add_node("a4_analysis", node_a4_analysis)
-    
-    # Define edges (sequential flow)
-    workflow.set_entry_point("a1_sampling")
-    workflow.add_edge("a1_sampling", "a2_wetlab")
-    workflow.add_edge("a2_wetlab", "a3_bioinfo")
-    workflow.add_edge("a3_bioinfo", "a4_analysis")
-    workflow.add_edge("a4_analysis", END)
-    
-    # Compile
-    return workflow.compile()
-
-
-# Main execution function
-def run_workflow(user_query: str) -> Dict[str, Any]:
-    """
-    Execute the full multi-agent workflow.
-    
-    Args:
-        user_query: User's research question or study description
-        
-    Returns:
-        Final state dict with all agent outputs
-    """
-    # Initialize state
-    initial_state: WorkflowState = {
-        "user_query": user_query,
-        "a1_output": {},
-        "a2_output": {},
-        "a3_output": {},
-        "a4_output": {},
-        "validation_reports": {},
-        "status": "running",
-        "error": ""
-    }
-    
-    # Create and run graph
-    graph = create_workflow_graph()
-    
-    print("=" * 60)
-    print("🚀 Starting ARG Surveillance Multi-Agent Workflow")
-    print("=" * 60)
-    print(f"User Query: {user_query[:100]}...")
-    print()
-    
-    final_state = graph.invoke(initial_state)
-    
-    print()
-    print("=" * 60)
-    print(f"✓ Workflow completed with status: {final_state['status']}")
-    print("=" * 60)
-    
-    return final_state
-
-
-# Optional: Add conditional routing for error handling
-def should_continue(state: WorkflowState) -> str:
-    """
-    Conditional routing based on state.
-    
-    Args:
-        state: Current workflow state
-        
-    Returns:
-        Next node name or "end"
-    """
-    if state.get("status") == "error":
-        return "end"
-    return "continue"
-
+"""
+LangGraph Orchestration
+
+Defines the multi-agent workflow graph: A1 → A2 → A3 → A4
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    TypedDict, Dict, Any, Awaitable, Callable, Iterator, List, Optional, Sequence, Tuple, Union
+)
+from langgraph.graph import StateGraph, END
+
+from app.agents.a1_sampling import (
+    partial_sampling_output, run_sampling_agent, run_sampling_agent_async, validate_sampling_output
+)
+from app.agents.a2_wetlab import (
+    run_wetlab_agent, run_wetlab_agent_async, validate_wetlab_output
+)
+from app.agents.a3_bioinfo import (
+    partial_bioinfo_output, run_bioinfo_agent, run_bioinfo_agent_async, validate_bioinfo_output
+)
+from app.agents.a4_analysis import (
+    run_analysis_agent, run_analysis_agent_async, validate_analysis_output
+)
+from app.agents import a2_wetlab, a3_bioinfo, a4_analysis
+from app.cache import (
+    MemoryResponseCache, ResponseCache, SQLiteResponseCache, bypass_cache, cache_bypassed, make_cache_key
+)
+from app.handoff import DEFAULT_MODE as HANDOFF_MODE, build_handoff, handoff_payload
+from app.llm import (
+    call_log, default_model, emit_tokens, record_calls, summarize_usage, to_thread, token_listener,
+    total_usage
+)
+from app.retry import workflow_deadline
+from app.run_store import get_run_store, hash_query
+from app.speculation import SPECULATIVE_HANDOFF, HandoffWatcher, Speculation, SpeculativeResult
+
+
+# State schema for the workflow
+class WorkflowState(TypedDict):
+    """State passed between agents in the graph."""
+    user_query: str
+    a1_output: Dict[str, Any]
+    a2_output: Dict[str, Any]
+    a3_output: Dict[str, Any]
+    a4_output: Dict[str, Any]
+    validation_reports: Dict[str, Any]
+    metrics: Dict[str, Any]
+    usage: Dict[str, Any]
+    status: str
+    error: str
+
+
+# Listener for live token deltas: callback(agent, delta), set by run_workflow(on_token=...)
+_token_sink: ContextVar[Optional[Callable[[str, str], None]]] = ContextVar(
+    "arg_workflow_token_sink", default=None
+)
+
+# Listener for progress events: callback(event_dict), set by run_workflow(on_event=...)
+_event_sink: ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = ContextVar(
+    "arg_workflow_event_sink", default=None
+)
+
+
+# Agent node functions
+def node_a1_sampling(state: WorkflowState) -> WorkflowState:
+    """Execute A1 Sampling Agent."""
+    print("🔬 Running A1: Sampling Design Agent...")
+    
+    try:
+        with _stream_stage(state, "a1", watch=_speculation_watcher("a1")):
+            output = run_sampling_agent(state["user_query"])
+        _apply_a1_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A1", e, show_traceback=True)
+    
+    return state
+
+
+def node_a2_wetlab(state: WorkflowState) -> WorkflowState:
+    """Execute A2 Wet-Lab Agent."""
+    print("🧪 Running A2: Wet-Lab Protocol Agent...")
+    
+    if state.get("status") == "error":
+        print("⚠ Skipping A2 due to previous error")
+        _emit("node_skipped", "a2")
+        return state
+    
+    try:
+        with _stream_stage(state, "a2"):
+            output = _run_speculated("a2", state["a1_output"], run_wetlab_agent)
+        _apply_a2_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A2", e)
+    
+    return state
+
+
+def node_a3_bioinfo(state: WorkflowState) -> WorkflowState:
+    """Execute A3 Bioinformatics Agent."""
+    print("💻 Running A3: Bioinformatics Pipeline Agent...")
+    
+    if state.get("status") == "error":
+        print("⚠ Skipping A3 due to previous error")
+        _emit("node_skipped", "a3")
+        return state
+    
+    try:
+        with _stream_stage(state, "a3", watch=_speculation_watcher("a3")):
+            output = _run_memoized("a3", state["a2_output"], run_bioinfo_agent)
+        _apply_a3_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A3", e)
+    
+    return state
+
+
+def node_a4_analysis(state: WorkflowState) -> WorkflowState:
+    """Execute A4 Analysis Agent."""
+    print("📊 Running A4: Statistical Analysis Agent...")
+    
+    if state.get("status") == "error":
+        print("⚠ Skipping A4 due to previous error")
+        _emit("node_skipped", "a4")
+        return state
+    
+    try:
+        with _stream_stage(state, "a4"):
+            output = _run_speculated("a4", state["a3_output"], run_analysis_agent)
+        _apply_a4_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A4", e)
+    
+    return state
+
+
+# Async agent node functions (used with graph.ainvoke)
+async def node_a1_sampling_async(state: WorkflowState) -> WorkflowState:
+    """Execute A1 Sampling Agent (async)."""
+    print("🔬 Running A1: Sampling Design Agent...")
+    
+    try:
+        with _stream_stage(state, "a1", watch=_speculation_watcher("a1", use_async=True)):
+            output = await run_sampling_agent_async(state["user_query"])
+        _apply_a1_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A1", e, show_traceback=True)
+    
+    return state
+
+
+async def node_a2_wetlab_async(state: WorkflowState) -> WorkflowState:
+    """Execute A2 Wet-Lab Agent (async)."""
+    print("🧪 Running A2: Wet-Lab Protocol Agent...")
+    
+    if state.get("status") == "error":
+        print("⚠ Skipping A2 due to previous error")
+        _emit("node_skipped", "a2")
+        return state
+    
+    try:
+        with _stream_stage(state, "a2"):
+            output = await _run_speculated_async("a2", state["a1_output"], run_wetlab_agent_async)
+        _apply_a2_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A2", e)
+    
+    return state
+
+
+async def node_a3_bioinfo_async(state: WorkflowState) -> WorkflowState:
+    """Execute A3 Bioinformatics Agent (async)."""
+    print("💻 Running A3: Bioinformatics Pipeline Agent...")
+    
+    if state.get("status") == "error":
+        print("⚠ Skipping A3 due to previous error")
+        _emit("node_skipped", "a3")
+        return state
+    
+    try:
+        with _stream_stage(state, "a3", watch=_speculation_watcher("a3", use_async=True)):
+            output = await _run_memoized_async("a3", state["a2_output"], run_bioinfo_agent_async)
+        _apply_a3_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A3", e)
+    
+    return state
+
+
+async def node_a4_analysis_async(state: WorkflowState) -> WorkflowState:
+    """Execute A4 Analysis Agent (async)."""
+    print("📊 Running A4: Statistical Analysis Agent...")
+    
+    if state.get("status") == "error":
+        print("⚠ Skipping A4 due to previous error")
+        _emit("node_skipped", "a4")
+        return state
+    
+    try:
+        with _stream_stage(state, "a4"):
+            output = await _run_speculated_async("a4", state["a3_output"], run_analysis_agent_async)
+        _apply_a4_output(state, output)
+    except Exception as e:
+        _mark_failed(state, "A4", e)
+    
+    return state
+
+
+@contextmanager
+def _stream_stage(
+    state: WorkflowState,
+    agent: str,
+    watch: Optional[Callable[[str], None]] = None
+) -> Iterator[None]:
+    """
+    Stream the agent's LLM output to the workflow token listener.
+    
+    Records time-to-first-token, generation throughput and LLM call
+    attempts/retry time in state["metrics"], and token usage reported by the
+    API in state["usage"]. Throughput counts stream chunks, which the API
+    emits roughly one per token. watch, if given, also receives every delta
+    (see _speculation_watcher). Deltas may arrive from several threads
+    (parallel-section calls), so they are handled under a lock.
+    """
+    sink = _token_sink.get()
+    stream_events = _event_sink.get() is not None
+    started = time.perf_counter()
+    stats = {"first_token": None, "chunks": 0}
+    lock = threading.Lock()
+    
+    def on_delta(delta: str) -> None:
+        with lock:
+            if stats["first_token"] is None:
+                stats["first_token"] = time.perf_counter()
+            stats["chunks"] += 1
+            if watch is not None:
+                watch(delta)
+            if sink is not None:
+                sink(agent, delta)
+            if stream_events:
+                _emit("token", agent, delta=delta)
+    
+    _emit("node_start", agent)
+    
+    with call_log() as calls:
+        try:
+            with token_listener(on_delta):
+                yield
+        finally:
+            finished = time.perf_counter()
+            first_token = stats["first_token"]
+            generation_s = finished - first_token if first_token is not None else 0.0
+            usage = summarize_usage(calls)
+            attempts = sum(call["attempts"] for call in calls)
+            state["usage"][agent] = usage
+            state["metrics"][agent] = {
+                "duration_s": round(finished - started, 3),
+                "ttft_s": round(first_token - started, 3) if first_token is not None else None,
+                "output_chunks": stats["chunks"],
+                "tokens_per_sec": round(stats["chunks"] / generation_s, 1) if generation_s > 0 else None,
+                "llm_calls": usage["calls"],
+                "attempts": attempts,
+                "retries": attempts - usage["calls"],
+                "retry_wait_s": round(sum(call["retry_wait_s"] for call in calls), 3)
+            }
+
+
+# Stage memo: A2-A4 are pure functions of their upstream handoff, prompt and
+# generation settings, so their outputs are stored under a hash of those and
+# reused without calling the LLM (skipped when the run bypasses the cache).
+# Backend via ARG_STAGE_MEMO: "sqlite" (default), "memory", or "off".
+STAGE_MEMO_BACKEND = os.getenv("ARG_STAGE_MEMO", "sqlite").lower()
+STAGE_MEMO_PATH = os.getenv("ARG_STAGE_MEMO_PATH", ".arg_cache/stage_memo.sqlite")
+
+# Agent module and handoff edge per memoized stage
+MEMO_STAGES: Dict[str, Tuple[Any, str]] = {
+    "a2": (a2_wetlab, "a1_a2"),
+    "a3": (a3_bioinfo, "a2_a3"),
+    "a4": (a4_analysis, "a3_a4"),
+}
+
+# Agent module settings that change the output (part of the memo key)
+MEMO_PARAMS = ("TEMPERATURE", "MAX_TOKENS", "RESPONSE_FORMAT", "PARALLEL_SECTIONS")
+
+_stage_memo: Optional[ResponseCache] = None
+_stage_memo_configured = False
+_stage_memo_lock = threading.Lock()
+_prompt_versions: Dict[str, str] = {}
+
+
+def get_stage_memo() -> Optional[ResponseCache]:
+    """Return the process-wide stage memo store (None when ARG_STAGE_MEMO=off)."""
+    global _stage_memo, _stage_memo_configured
+    if not _stage_memo_configured:
+        with _stage_memo_lock:
+            if not _stage_memo_configured:
+                if STAGE_MEMO_BACKEND in ("off", "0", "false", "none"):
+                    _stage_memo = None
+                elif STAGE_MEMO_BACKEND == "memory":
+                    _stage_memo = MemoryResponseCache()
+                else:
+                    _stage_memo = SQLiteResponseCache(path=STAGE_MEMO_PATH)
+                _stage_memo_configured = True
+    return _stage_memo
+
+
+def set_stage_memo(memo: Optional[ResponseCache]) -> None:
+    """Replace the process-wide stage memo store (None disables memoization)."""
+    global _stage_memo, _stage_memo_configured
+    with _stage_memo_lock:
+        _stage_memo = memo
+        _stage_memo_configured = True
+
+
+def stage_memo_key(agent: str, upstream_output: Dict[str, Any]) -> str:
+    """
+    Memo key for a stage: the canonical upstream handoff (only the fields the
+    agent receives), prompt version, model and generation settings.
+    
+    Args:
+        agent: "a2", "a3" or "a4"
+        upstream_output: Output dict of the previous agent
+        
+    Returns:
+        Hex digest
+    """
+    module, edge = MEMO_STAGES[agent]
+    if agent not in _prompt_versions:
+        _prompt_versions[agent] = make_cache_key(
+            {"system": module.SYSTEM_PROMPT, "user": module.USER_PROMPT}
+        )[:16]
+    return make_cache_key({
+        "stage": agent,
+        "handoff": handoff_payload(edge, upstream_output.get("structured_output")),
+        "handoff_mode": HANDOFF_MODE,
+        "prompt_version": _prompt_versions[agent],
+        "model": default_model(),
+        "params": {name: getattr(module, name, None) for name in MEMO_PARAMS}
+    })
+
+
+def _memo_lookup(
+    agent: str,
+    upstream_output: Dict[str, Any]
+) -> Tuple[Optional[ResponseCache], Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Look up a stage in the memo.
+    
+    Returns:
+        (memo, key, output) - memo is None when disabled or bypassed; output
+        is the stored agent output (marked "stage_memo": "hit") or None;
+        the caller replays a hit's raw output to the token stream
+    """
+    memo = get_stage_memo() if not cache_bypassed() else None
+    if memo is None:
+        return None, None, None
+    key = stage_memo_key(agent, upstream_output)
+    stored = memo.get(key)
+    if stored is None:
+        return memo, key, None
+    output = json.loads(stored)
+    output["stage_memo"] = "hit"
+    print(f"  ↺ {agent.upper()} served from stage memo")
+    return memo, key, output
+
+
+def _memo_store(memo: Optional[ResponseCache], key: Optional[str], output: Dict[str, Any]) -> None:
+    """Store a fresh stage output (only complete ones) and mark it a miss."""
+    if memo is None:
+        return
+    if output.get("raw_output") and output.get("structured_output"):
+        memo.set(key, json.dumps(output))
+    output["stage_memo"] = "miss"
+
+
+def _run_memoized(
+    agent: str,
+    upstream_output: Dict[str, Any],
+    run: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Return the memoized output for a stage, else run the agent and store it."""
+    memo, key, output = _memo_lookup(agent, upstream_output)
+    if output is None:
+        output = run(upstream_output)
+        _memo_store(memo, key, output)
+    else:
+        emit_tokens(output.get("raw_output") or "")
+    return output
+
+
+async def _run_memoized_async(
+    agent: str,
+    upstream_output: Dict[str, Any],
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Async version of _run_memoized (memo reads and writes run off the event loop)."""
+    memo, key, output = await to_thread(_memo_lookup, agent, upstream_output)
+    if output is None:
+        output = await run(upstream_output)
+        await to_thread(_memo_store, memo, key, output)
+    else:
+        emit_tokens(output.get("raw_output") or "")
+    return output
+
+
+def stage_memo_stats(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage memo hits/misses for a run.
+    
+    Args:
+        metrics: state["metrics"] (per-agent dicts with "stage_memo")
+        
+    Returns:
+        Dict with "hits", "misses" and "hit_rate"
+    """
+    outcomes = [m.get("stage_memo") for m in metrics.values() if isinstance(m, dict)]
+    hits = outcomes.count("hit")
+    misses = outcomes.count("miss")
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0
+    }
+
+
+# Speculative downstream start (app/speculation.py, ARG_SPECULATIVE_HANDOFF):
+# upstream stage -> (downstream stage, parser returning the partial structured
+# output once the streamed handoff section has closed)
+SPECULATION_EDGES: Dict[str, Tuple[str, Callable[[str], Optional[Dict[str, Any]]]]] = {
+    "a1": ("a2", partial_sampling_output),
+    "a3": ("a4", partial_bioinfo_output),
+}
+
+# Downstream stage -> (sync agent, async agent)
+SPECULATIVE_AGENTS: Dict[str, Tuple[Callable[..., Any], Callable[..., Any]]] = {
+    "a2": (run_wetlab_agent, run_wetlab_agent_async),
+    "a4": (run_analysis_agent, run_analysis_agent_async),
+}
+
+# Speculative runs of the current workflow run by downstream stage (None: disabled)
+_speculations: ContextVar[Optional[Dict[str, Speculation]]] = ContextVar(
+    "arg_workflow_speculations", default=None
+)
+
+
+def _speculation_watcher(agent: str, use_async: bool = False) -> Optional[Callable[[str], None]]:
+    """
+    Token watcher for an upstream stage: starts the next stage on the partial
+    output once the handoff section has closed in the stream.
+    
+    Returns:
+        Delta callback for _stream_stage, or None when speculation is off
+        (or the stage has no single streamed handoff)
+    """
+    speculations = _speculations.get()
+    if speculations is None or agent not in SPECULATION_EDGES:
+        return None
+    if agent == "a3" and a3_bioinfo.PARALLEL_SECTIONS:
+        return None  # Section sub-requests stream interleaved
+    downstream, detect = SPECULATION_EDGES[agent]
+    run, run_async = SPECULATIVE_AGENTS[downstream]
+    
+    def start(partial: Dict[str, Any]) -> None:
+        speculation = Speculation(downstream, {"structured_output": partial})
+        if use_async:
+            speculation.start_async(lambda upstream: _run_memoized_async(downstream, upstream, run_async))
+        else:
+            speculation.start(lambda upstream: _run_memoized(downstream, upstream, run))
+        speculations[downstream] = speculation
+        print(f"  ⚡ {downstream.upper()} started speculatively ({agent.upper()} handoff closed)")
+    
+    return HandoffWatcher(detect, start).feed
+
+
+def _claim_speculation(agent: str, upstream_output: Dict[str, Any]) -> Tuple[Optional[Speculation], str]:
+    """
+    Take the stage's speculative run, if its handoff matches the final one.
+    
+    Returns:
+        (speculation, reason) - speculation is None when there is none or it
+        was discarded (reason says why)
+    """
+    speculations = _speculations.get()
+    speculation = speculations.pop(agent, None) if speculations else None
+    if speculation is None:
+        return None, ""
+    speculation.claim()
+    edge = MEMO_STAGES[agent][1]
+    speculated = handoff_payload(edge, speculation.upstream_output["structured_output"])
+    if speculated == handoff_payload(edge, upstream_output.get("structured_output")):
+        return speculation, ""
+    return None, _discard(speculation, "final handoff differs")
+
+
+def _confirm(
+    speculation: Speculation,
+    result: SpeculativeResult,
+    upstream_output: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Adopt a speculative run: its calls and tokens count for this stage."""
+    output, calls, text = result
+    record_calls(calls)
+    emit_tokens(text)
+    if output.get("handoff"):
+        # Same payload, but dropped fields/savings are measured on the final output
+        _, output["handoff"] = build_handoff(MEMO_STAGES[speculation.agent][1], upstream_output.get("structured_output"))
+    output["speculation"] = speculation.report("confirmed")
+    print(f"  ⚡ {speculation.agent.upper()} speculation confirmed ({output['speculation']['lead_s']}s ahead)")
+    return output
+
+
+def _discard(speculation: Speculation, reason: str) -> str:
+    """Drop a speculative run; returns the reason."""
+    speculation.discard()
+    print(f"  ⚡ {speculation.agent.upper()} speculation discarded ({reason})")
+    return reason
+
+
+def _discard_speculations(reason: str) -> None:
+    """Drop speculative runs no node claimed (e.g. stages skipped after an error)."""
+    speculations = _speculations.get()
+    while speculations:
+        _, speculation = speculations.popitem()
+        _discard(speculation, reason)
+
+
+def _run_speculated(
+    agent: str,
+    upstream_output: Dict[str, Any],
+    run: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Use the stage's confirmed speculative run, else run it (memoized)."""
+    speculation, reason = _claim_speculation(agent, upstream_output)
+    if speculation is not None:
+        try:
+            return _confirm(speculation, speculation.result(), upstream_output)
+        except Exception as e:
+            reason = _discard(speculation, f"speculative run failed: {e}")
+    output = _run_memoized(agent, upstream_output, run)
+    if reason:
+        output["speculation"] = {"outcome": "discarded", "reason": reason}
+    return output
+
+
+async def _run_speculated_async(
+    agent: str,
+    upstream_output: Dict[str, Any],
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Async version of _run_speculated."""
+    speculation, reason = _claim_speculation(agent, upstream_output)
+    if speculation is not None:
+        try:
+            return _confirm(speculation, await speculation.result_async(), upstream_output)
+        except Exception as e:
+            reason = _discard(speculation, f"speculative run failed: {e}")
+    output = await _run_memoized_async(agent, upstream_output, run)
+    if reason:
+        output["speculation"] = {"outcome": "discarded", "reason": reason}
+    return output
+
+
+# Shared output handling (same rules for sync and async nodes)
+def _apply_a1_output(state: WorkflowState, output: Dict[str, Any]) -> None:
+    """Validate A1 output and update state."""
+    validation = validate_sampling_output(output)
+    
+    state["a1_output"] = output
+    state["validation_reports"]["a1"] = validation
+    
+    # Only set error if there's NO output at all
+    if not output.get("raw_output"):
+        state["status"] = "error"
+        state["error"] = "A1 produced no output"
+    elif not validation["valid"]:
+        # Validation failed but we have output - continue with warning
+        state["status"] = "warning"
+        print(f"⚠ A1 validation warnings: {validation.get('errors', [])}")
+    
+    _report_stage(state, "a1", output, validation)
+
+
+def _apply_a2_output(state: WorkflowState, output: Dict[str, Any]) -> None:
+    """Validate A2 output and update state."""
+    validation = validate_wetlab_output(output)
+    
+    state["a2_output"] = output
+    state["validation_reports"]["a2"] = validation
+    
+    if not validation["valid"]:
+        state["status"] = "error"
+        state["error"] = f"A2 validation failed: {validation['errors']}"
+    
+    _report_stage(state, "a2", output, validation)
+
+
+def _apply_a3_output(state: WorkflowState, output: Dict[str, Any]) -> None:
+    """Validate A3 output and update state."""
+    validation = validate_bioinfo_output(output)
+    
+    state["a3_output"] = output
+    state["validation_reports"]["a3"] = validation
+    
+    if not validation["valid"]:
+        state["status"] = "error"
+        state["error"] = f"A3 validation failed: {validation['errors']}"
+    
+    _report_stage(state, "a3", output, validation)
+
+
+def _apply_a4_output(state: WorkflowState, output: Dict[str, Any]) -> None:
+    """Validate A4 output and update state."""
+    validation = validate_analysis_output(output)
+    
+    state["a4_output"] = output
+    state["validation_reports"]["a4"] = validation
+    
+    if not validation["valid"]:
+        state["status"] = "warning"  # A4 is terminal, so warning not error
+    else:
+        state["status"] = "complete"
+    
+    _report_stage(state, "a4", output, validation)
+
+
+def _report_stage(
+    state: WorkflowState,
+    agent: str,
+    output: Dict[str, Any],
+    validation: Dict[str, Any]
+) -> None:
+    """Log stage completion and publish validation/node_end events."""
+    print(f"✓ {agent.upper()} complete (status: {output['status']})")
+    if output.get("stage_memo"):
+        state["metrics"].setdefault(agent, {})["stage_memo"] = output["stage_memo"]
+    if output.get("section_timings"):
+        state["metrics"].setdefault(agent, {})["section_timings"] = output["section_timings"]
+    if output.get("speculation"):
+        state["metrics"].setdefault(agent, {})["speculation"] = output["speculation"]
+    handoff = output.get("handoff")
+    if handoff:
+        # Prompt-token savings of the upstream handoff (kept with the stage metrics)
+        state["metrics"].setdefault(agent, {})["handoff"] = handoff
+        print(
+            f"  ↳ handoff {handoff['edge']}: {handoff['tokens']} tokens "
+            f"(full payload {handoff['full_tokens']}, saved {handoff['saved_pct']}%)"
+        )
+    _emit("validation", agent, report=validation)
+    _emit(
+        "node_end",
+        agent,
+        status=output["status"],
+        valid=validation.get("valid", True),
+        workflow_status=state["status"],
+        metrics=state["metrics"].get(agent),
+        usage=state["usage"].get(agent)
+    )
+
+
+def _mark_failed(
+    state: WorkflowState,
+    agent_label: str,
+    error: Exception,
+    show_traceback: bool = False
+) -> None:
+    """Record an agent exception in state."""
+    print(f"✗ {agent_label} failed: {error}")
+    if show_traceback:
+        traceback.print_exc()  # Print full traceback for debugging
+    state["status"] = "error"
+    state["error"] = str(error)
+    _emit("node_error", agent_label.lower(), error=str(error))
+
+
+def _emit(event: str, agent: str, **data: Any) -> None:
+    """Publish a progress event to the workflow event listener (if any)."""
+    sink = _event_sink.get()
+    if sink is None:
+        return
+    sink({"event": event, "agent": agent, "ts": time.time(), **data})
+
+
+# Build the graph
+STAGES = ("a1_sampling", "a2_wetlab", "a3_bioinfo", "a4_analysis")
+
+# Node implementations per (stage, use_async)
+NODE_FUNCTIONS: Dict[Tuple[str, bool], Callable] = {
+    ("a1_sampling", False): node_a1_sampling,
+    ("a2_wetlab", False): node_a2_wetlab,
+    ("a3_bioinfo", False): node_a3_bioinfo,
+    ("a4_analysis", False): node_a4_analysis,
+    ("a1_sampling", True): node_a1_sampling_async,
+    ("a2_wetlab", True): node_a2_wetlab_async,
+    ("a3_bioinfo", True): node_a3_bioinfo_async,
+    ("a4_analysis", True): node_a4_analysis_async,
+}
+
+
+def create_workflow_graph(use_async: bool = False, stages: Sequence[str] = STAGES):
+    """
+    Create the LangGraph workflow.
+    
+    Prefer get_workflow_graph(), which reuses compiled graphs across runs.
+    
+    Args:
+        use_async: Use async node functions (run the graph with ainvoke)
+        stages: Stages to include, in pipeline order (default: all four)
+    
+    Returns:
+        Compiled LangGraph
+    """
+    stages = tuple(stages)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if not stages or unknown:
+        raise ValueError(f"Invalid workflow stages: {list(stages)}")
+    
+    workflow = StateGraph(WorkflowState)
+    
+    # Add nodes
+    for stage in stages:
+        workflow.add_node(stage, NODE_FUNCTIONS[(stage, use_async)])
+    
+    # Define edges (sequential flow)
+    workflow.set_entry_point(stages[0])
+    for upstream, downstream in zip(stages, stages[1:]):
+        workflow.add_edge(upstream, downstream)
+    workflow.add_edge(stages[-1], END)
+    
+    # Compile
+    return workflow.compile()
+
+
+# Compiled graphs keyed by configuration (use_async, stages)
+_compiled_graphs: Dict[Tuple[bool, Tuple[str, ...]], Any] = {}
+_compiled_graphs_lock = threading.Lock()
+
+
+def get_workflow_graph(use_async: bool = False, stages: Sequence[str] = STAGES):
+    """
+    Return the compiled workflow graph for a configuration, compiling it once.
+    
+    Compiled graphs hold no per-run state, so one instance is shared by all
+    runs and threads.
+    
+    Args:
+        use_async: Use async node functions (run the graph with ainvoke)
+        stages: Stages to include, in pipeline order (default: all four)
+    
+    Returns:
+        Compiled LangGraph
+    """
+    key = (use_async, tuple(stages))
+    graph = _compiled_graphs.get(key)
+    if graph is None:
+        with _compiled_graphs_lock:
+            graph = _compiled_graphs.get(key)
+            if graph is None:
+                graph = create_workflow_graph(use_async=use_async, stages=stages)
+                _compiled_graphs[key] = graph
+    return graph
+
+
+def warm_graph_cache() -> None:
+    """Compile the default sync and async graphs ahead of the first run."""
+    get_workflow_graph(use_async=False)
+    get_workflow_graph(use_async=True)
+
+
+# Main execution function
+def run_workflow(
+    user_query: str,
+    use_cache: bool = True,
+    on_token: Optional[Callable[[str, str], None]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    run_id: Optional[str] = None,
+    deadline_s: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Execute the full multi-agent workflow.
+    
+    Args:
+        user_query: User's research question or study description
+        use_cache: Allow LLM responses to be served from the response cache
+        on_token: Optional callback(agent, delta) receiving generated text live
+        on_event: Optional callback(event) receiving node_start/node_end/
+            node_skipped/node_error, validation and token events
+        run_id: If set, checkpoint the state to the run store after every
+            node so the run can be resumed with resume_workflow(run_id)
+        deadline_s: Time budget for the whole run; every LLM call's timeout
+            is capped at what remains (default ARG_WORKFLOW_DEADLINE_S)
+        
+    Returns:
+        Final state dict with all agent outputs
+    """
+    # Initialize state
+    initial_state = _initial_state(user_query)
+    
+    # Get (cached) compiled graph and run it
+    graph = get_workflow_graph()
+    
+    _print_header(user_query)
+    
+    final_state = _execute(
+        graph, initial_state, use_cache, on_token, on_event, run_id, deadline_s
+    )
+    
+    _print_footer(final_state)
+    
+    return final_state
+
+
+async def run_workflow_async(
+    user_query: str,
+    use_cache: bool = True,
+    on_token: Optional[Callable[[str, str], None]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    run_id: Optional[str] = None,
+    deadline_s: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Execute the full multi-agent workflow on the running event loop.
+    
+    Args:
+        user_query: User's research question or study description
+        use_cache: Allow LLM responses to be served from the response cache
+        on_token: Optional callback(agent, delta) receiving generated text live
+        on_event: Optional callback(event) receiving node_start/node_end/
+            node_skipped/node_error, validation and token events
+        run_id: If set, checkpoint the state to the run store after every node
+        deadline_s: Time budget for the whole run (default ARG_WORKFLOW_DEADLINE_S)
+        
+    Returns:
+        Final state dict with all agent outputs
+    """
+    initial_state = _initial_state(user_query)
+    
+    graph = get_workflow_graph(use_async=True)
+    
+    _print_header(user_query)
+    
+    final_state = await _execute_async(
+        graph, initial_state, use_cache, on_token, on_event, run_id, deadline_s
+    )
+    
+    _print_footer(final_state)
+    
+    return final_state
+
+
+def resume_workflow(
+    run_id: str,
+    use_cache: bool = True,
+    on_token: Optional[Callable[[str, str], None]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Resume a checkpointed run from its first incomplete or failed stage.
+    
+    Completed upstream stages are reused from the checkpoint, so their tokens
+    and latency are not paid again.
+    
+    Args:
+        run_id: Run ID passed to run_workflow (or assigned by the API)
+        use_cache: Allow LLM responses to be served from the response cache
+        on_token: Optional callback(agent, delta) receiving generated text live
+        on_event: Optional callback(event) receiving progress events
+        deadline_s: Time budget for the resumed stages (default
+            ARG_WORKFLOW_DEADLINE_S)
+        
+    Returns:
+        Final state dict with all agent outputs
+        
+    Raises:
+        KeyError: If no checkpoint exists for run_id
+    """
+    state, stages = load_resume_point(run_id)
+    if stages is None:
+        print(f"✓ Run {run_id} has no incomplete stages - nothing to resume")
+        return state
+    
+    graph = get_workflow_graph(stages=stages)
+    
+    _print_resume_header(run_id, state["user_query"], stages[0])
+    
+    final_state = _execute(graph, state, use_cache, on_token, on_event, run_id, deadline_s)
+    
+    _print_footer(final_state)
+    
+    return final_state
+
+
+async def resume_workflow_async(
+    run_id: str,
+    use_cache: bool = True,
+    on_token: Optional[Callable[[str, str], None]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Async version of resume_workflow.
+    
+    Raises:
+        KeyError: If no checkpoint exists for run_id
+    """
+    state, stages = load_resume_point(run_id)
+    if stages is None:
+        print(f"✓ Run {run_id} has no incomplete stages - nothing to resume")
+        return state
+    
+    graph = get_workflow_graph(use_async=True, stages=stages)
+    
+    _print_resume_header(run_id, state["user_query"], stages[0])
+    
+    final_state = await _execute_async(
+        graph, state, use_cache, on_token, on_event, run_id, deadline_s
+    )
+    
+    _print_footer(final_state)
+    
+    return final_state
+
+
+def first_incomplete_stage(state: Dict[str, Any]) -> Optional[str]:
+    """
+    Find the stage a run should restart from.
+    
+    A stage is incomplete if it produced no output, or if its stored
+    validation report failed for A2/A3 (which stops the run). The run-level
+    status is not consulted: the API marks a run queued/running before the
+    checkpoint is loaded.
+    
+    Args:
+        state: Workflow state (typically loaded from a checkpoint)
+        
+    Returns:
+        Stage name, or None if every stage completed
+    """
+    for stage in STAGES:
+        agent = stage[:2]
+        output = state.get(f"{agent}_output") or {}
+        if not output.get("raw_output"):
+            return stage
+        validation = state.get("validation_reports", {}).get(agent) or {}
+        if agent in ("a2", "a3") and not validation.get("valid", True):
+            return stage
+    return None
+
+
+def load_resume_point(run_id: str) -> Tuple[Dict[str, Any], Optional[Tuple[str, ...]]]:
+    """
+    Load a checkpoint and reset it to the first incomplete stage.
+    
+    Args:
+        run_id: Checkpointed run ID
+        
+    Returns:
+        (state, remaining stages) - stages is None if nothing is left to run
+        
+    Raises:
+        KeyError: If no checkpoint exists for run_id
+    """
+    state = get_run_store().get_state(run_id)
+    if state is None:
+        raise KeyError(f"No checkpoint found for run {run_id}")
+    
+    stage = first_incomplete_stage(state)
+    if stage is None:
+        return state, None
+    
+    remaining = STAGES[STAGES.index(stage):]
+    for pending in remaining:
+        agent = pending[:2]
+        state[f"{agent}_output"] = {}
+        state["validation_reports"].pop(agent, None)
+        state["metrics"].pop(agent, None)
+        state.setdefault("usage", {}).pop(agent, None)
+    state["status"] = "running"
+    state["error"] = ""
+    
+    return state, remaining
+
+
+def _execute(
+    graph: Any,
+    state: Dict[str, Any],
+    use_cache: bool,
+    on_token: Optional[Callable[[str, str], None]],
+    on_event: Optional[Callable[[Dict[str, Any]], None]],
+    run_id: Optional[str],
+    deadline_s: Optional[float] = None
+) -> Dict[str, Any]:
+    """Run a compiled graph, checkpointing after every node when run_id is set."""
+    sink_token = _token_sink.set(on_token)
+    event_token = _event_sink.set(on_event)
+    speculation_token = _speculations.set({} if SPECULATIVE_HANDOFF else None)
+    try:
+        with bypass_cache(not use_cache), workflow_deadline(deadline_s):
+            final_state = state
+            for values in graph.stream(state, stream_mode="values"):
+                final_state = values
+                save_checkpoint(run_id, values)
+    finally:
+        _discard_speculations("stage not reached")
+        _speculations.reset(speculation_token)
+        _event_sink.reset(event_token)
+        _token_sink.reset(sink_token)
+    
+    save_checkpoint(run_id, final_state, final=True)
+    return final_state
+
+
+async def _execute_async(
+    graph: Any,
+    state: Dict[str, Any],
+    use_cache: bool,
+    on_token: Optional[Callable[[str, str], None]],
+    on_event: Optional[Callable[[Dict[str, Any]], None]],
+    run_id: Optional[str],
+    deadline_s: Optional[float] = None
+) -> Dict[str, Any]:
+    """Async version of _execute (checkpoints are written in a worker thread)."""
+    sink_token = _token_sink.set(on_token)
+    event_token = _event_sink.set(on_event)
+    speculation_token = _speculations.set({} if SPECULATIVE_HANDOFF else None)
+    try:
+        with bypass_cache(not use_cache), workflow_deadline(deadline_s):
+            final_state = state
+            async for values in graph.astream(state, stream_mode="values"):
+                final_state = values
+                if run_id is not None:
+                    # SQLite write, compression and hashing stay off the event loop
+                    await to_thread(save_checkpoint, run_id, values)
+    finally:
+        _discard_speculations("stage not reached")
+        _speculations.reset(speculation_token)
+        _event_sink.reset(event_token)
+        _token_sink.reset(sink_token)
+    
+    if run_id is not None:
+        await to_thread(save_checkpoint, run_id, final_state, True)
+    return final_state
+
+
+def save_checkpoint(run_id: Optional[str], state: Dict[str, Any], final: bool = False) -> None:
+    """
+    Persist state to the run store (no-op when run_id is None).
+    
+    Args:
+        run_id: Run ID to checkpoint under
+        state: Current workflow state
+        final: True once the workflow has finished; in-flight checkpoints are
+            stored with status "running" (or "error")
+    """
+    if run_id is None:
+        return
+    if final:
+        get_run_store().save_state(run_id, {**state, "completed_at": time.time()})
+    else:
+        status = "error" if state.get("status") == "error" else "running"
+        get_run_store().save_state(run_id, {**state, "status": status})
+
+
+# Batch execution
+BatchItem = Union[str, Dict[str, Any]]
+
+# Statuses that count as done when resuming a batch
+BATCH_DONE_STATUSES = ("complete", "warning")
+
+
+def run_workflows(
+    queries: Sequence[BatchItem],
+    concurrency: int = 4,
+    results_path: Optional[Union[str, Path]] = None,
+    use_cache: bool = True,
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    pipelined: bool = False,
+    deadline_s: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run many workflows with bounded concurrency.
+    
+    Per-query failures are recorded and do not stop the batch. If results_path
+    is given, one JSON record per query is appended as soon as it finishes, and
+    queries whose latest record is complete/warning are skipped on re-run;
+    failed queries with a checkpoint are resumed instead of restarted.
+    
+    Args:
+        queries: Query strings, or dicts with "query" and an optional "id"
+        concurrency: Maximum number of workflows running at once
+        results_path: JSONL file to append result records to (and resume from)
+        use_cache: Allow LLM responses to be served from the response cache
+        on_result: Optional callback(record, final_state) run before a record
+            is written; it may add fields to record (e.g. "output_path")
+        pipelined: Run stage-by-stage through app.pipeline.PipelineExecutor
+            (concurrency is then the total worker count, split across stages)
+        deadline_s: Time budget per query (default ARG_WORKFLOW_DEADLINE_S)
+        
+    Returns:
+        One result record per unique query, in input order
+    """
+    items, previous = _prepare_batch(queries, results_path)
+    pending = [item for item in items if item["id"] not in previous
+               or previous[item["id"]]["status"] not in BATCH_DONE_STATUSES]
+    writer = _BatchWriter(results_path)
+    
+    _print_batch_header(len(items), len(pending), concurrency)
+    
+    results = {}
+    if pipelined:
+        def finish(record: Dict[str, Any], state: Optional[Dict[str, Any]]) -> None:
+            if on_result is not None and state is not None:
+                on_result(record, state)
+            writer.write(record)
+            results[record["id"]] = record
+        
+        _run_batch_pipelined(pending, previous, concurrency, use_cache, finish, deadline_s)
+        return [results.get(item["id"]) or previous[item["id"]] for item in items]
+    
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [
+            pool.submit(_run_batch_item, item, previous.get(item["id"]), use_cache, deadline_s)
+            for item in pending
+        ]
+        for future in as_completed(futures):
+            record, state = future.result()
+            if on_result is not None and state is not None:
+                on_result(record, state)
+            writer.write(record)
+            results[record["id"]] = record
+    
+    return [results.get(item["id"]) or previous[item["id"]] for item in items]
+
+
+async def run_workflows_async(
+    queries: Sequence[BatchItem],
+    concurrency: int = 4,
+    results_path: Optional[Union[str, Path]] = None,
+    use_cache: bool = True,
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Async version of run_workflows (concurrency bounded by a semaphore).
+    
+    Returns:
+        One result record per unique query, in input order
+    """
+    items, previous = _prepare_batch(queries, results_path)
+    pending = [item for item in items if item["id"] not in previous
+               or previous[item["id"]]["status"] not in BATCH_DONE_STATUSES]
+    writer = _BatchWriter(results_path)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    _print_batch_header(len(items), len(pending), concurrency)
+    
+    results = {}
+    
+    async def run_one(item: Dict[str, Any]) -> None:
+        async with semaphore:
+            record, state = await _run_batch_item_async(
+                item, previous.get(item["id"]), use_cache, deadline_s
+            )
+        if on_result is not None and state is not None:
+            on_result(record, state)
+        writer.write(record)
+        results[record["id"]] = record
+    
+    await asyncio.gather(*(run_one(item) for item in pending))
+    
+    return [results.get(item["id"]) or previous[item["id"]] for item in items]
+
+
+def _run_batch_pipelined(
+    pending: List[Dict[str, Any]],
+    previous: Dict[str, Dict[str, Any]],
+    concurrency: int,
+    use_cache: bool,
+    finish: Callable[[Dict[str, Any], Optional[Dict[str, Any]]], None],
+    deadline_s: Optional[float] = None
+) -> None:
+    """Run batch items through the staged pipeline executor."""
+    # Imported here: app.pipeline builds on this module
+    from app.pipeline import PipelineExecutor, default_stage_configs
+    
+    started = time.perf_counter()
+    work = []
+    for item in pending:
+        run_id, resume = _batch_run_id(item, previous.get(item["id"]))
+        entry = {**item, "run_id": run_id}
+        if resume:
+            state, stages = load_resume_point(run_id)
+            if stages is None:
+                finish(_batch_record(item, run_id, state, started), state)
+                continue
+            entry.update(state=state, stage=stages[0])
+        work.append(entry)
+    
+    executor = PipelineExecutor(
+        default_stage_configs(concurrency), use_cache=use_cache, deadline_s=deadline_s
+    )
+    executor.run(
+        work,
+        on_complete=lambda entry, state, error: finish(
+            _batch_record(entry, entry["run_id"], state, started, error=error), state
+        )
+    )
+    
+    for stage, stats in executor.stats()["stages"].items():
+        print(
+            f"   {stage:<12} workers {stats['workers']}  processed {stats['processed']}"
+            f"  utilization {stats['utilization']:.0%}"
+        )
+
+
+def _prepare_batch(
+    queries: Sequence[BatchItem],
+    results_path: Optional[Union[str, Path]]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Normalize batch items (assigning IDs) and load prior result records."""
+    items = []
+    seen = set()
+    for query in queries:
+        item = {"query": query} if isinstance(query, str) else dict(query)
+        item["id"] = str(item.get("id") or hash_query(item["query"])[:16])
+        if item["id"] in seen:
+            continue
+        seen.add(item["id"])
+        items.append(item)
+    
+    # Latest record per query ID wins
+    previous = {}
+    if results_path is not None and Path(results_path).exists():
+        with open(results_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written line from an interrupted batch
+                if "id" in record:
+                    previous[str(record["id"])] = record
+    
+    return items, previous
+
+
+def _run_batch_item(
+    item: Dict[str, Any],
+    previous: Optional[Dict[str, Any]],
+    use_cache: bool,
+    deadline_s: Optional[float] = None
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Run (or resume) one batch query, never raising."""
+    run_id, resume = _batch_run_id(item, previous)
+    started = time.perf_counter()
+    try:
+        if resume:
+            state = resume_workflow(run_id, use_cache=use_cache, deadline_s=deadline_s)
+        else:
+            state = run_workflow(
+                item["query"], use_cache=use_cache, run_id=run_id, deadline_s=deadline_s
+            )
+    except Exception as e:
+        return _batch_record(item, run_id, None, started, error=str(e)), None
+    return _batch_record(item, run_id, state, started), state
+
+
+async def _run_batch_item_async(
+    item: Dict[str, Any],
+    previous: Optional[Dict[str, Any]],
+    use_cache: bool,
+    deadline_s: Optional[float] = None
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Async version of _run_batch_item."""
+    run_id, resume = _batch_run_id(item, previous)
+    started = time.perf_counter()
+    try:
+        if resume:
+            state = await resume_workflow_async(run_id, use_cache=use_cache, deadline_s=deadline_s)
+        else:
+            state = await run_workflow_async(
+                item["query"], use_cache=use_cache, run_id=run_id, deadline_s=deadline_s
+            )
+    except Exception as e:
+        return _batch_record(item, run_id, None, started, error=str(e)), None
+    return _batch_record(item, run_id, state, started), state
+
+
+def _batch_run_id(item: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Tuple[str, bool]:
+    """Pick the run ID for a batch item and whether to resume a prior checkpoint."""
+    if previous and previous.get("run_id") and get_run_store().get_run(previous["run_id"]):
+        return previous["run_id"], True
+    return f"batch_{item['id']}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}", False
+
+
+def _batch_record(
+    item: Dict[str, Any],
+    run_id: str,
+    state: Optional[Dict[str, Any]],
+    started: float,
+    error: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the JSONL result record for a finished batch item."""
+    state = state or {}
+    record = {
+        "id": item["id"],
+        "query": item["query"],
+        "run_id": run_id,
+        "status": state.get("status", "error"),
+        "error": error or state.get("error") or None,
+        "duration_s": round(time.perf_counter() - started, 3),
+        "finished_at": datetime.now().isoformat()
+    }
+    for agent in ("a1", "a2", "a3", "a4"):
+        record[f"{agent}_status"] = (state.get(f"{agent}_output") or {}).get("status")
+    record["usage"] = total_usage(state.get("usage") or {})
+    return record
+
+
+class _BatchWriter:
+    """Thread-safe, line-buffered appender for batch result records."""
+    
+    def __init__(self, path: Optional[Union[str, Path]]):
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        status = record["status"]
+        icon = "✓" if status in BATCH_DONE_STATUSES else "✗"
+        print(f"{icon} [{record['id']}] {status} in {record['duration_s']:.1f}s")
+        if self.path is None:
+            return
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+
+
+def _print_batch_header(total: int, pending: int, concurrency: int) -> None:
+    print("=" * 60)
+    print(f"📦 Batch: {pending} of {total} queries to run (concurrency {concurrency})")
+    if pending < total:
+        print(f"   Skipping {total - pending} already completed")
+    print("=" * 60)
+
+
+def _initial_state(user_query: str) -> WorkflowState:
+    """Build the initial workflow state for a query."""
+    return {
+        "user_query": user_query,
+        "a1_output": {},
+        "a2_output": {},
+        "a3_output": {},
+        "a4_output": {},
+        "validation_reports": {},
+        "metrics": {},
+        "usage": {},
+        "status": "running",
+        "error": ""
+    }
+
+
+def _print_header(user_query: str) -> None:
+    print("=" * 60)
+    print("🚀 Starting ARG Surveillance Multi-Agent Workflow")
+    print("=" * 60)
+    print(f"User Query: {user_query[:100]}...")
+    print()
+
+
+def _print_resume_header(run_id: str, user_query: str, stage: str) -> None:
+    print("=" * 60)
+    print(f"🔁 Resuming run {run_id} from {stage}")
+    print("=" * 60)
+    print(f"User Query: {user_query[:100]}...")
+    print()
+
+
+def _print_footer(final_state: Dict[str, Any]) -> None:
+    print()
+    print("=" * 60)
+    print(f"✓ Workflow completed with status: {final_state['status']}")
+    usage = total_usage(final_state.get("usage") or {})
+    if usage["calls"] or usage["cache_hits"] or usage["coalesced"]:
+        shared = f", {usage['coalesced']} shared with identical in-flight calls" if usage["coalesced"] else ""
+        print(
+            f"📊 Tokens: {usage['prompt_tokens']} prompt ({usage['cached_tokens']} cached) + "
+            f"{usage['completion_tokens']} completion in {usage['calls']} calls "
+            f"({usage['cache_hits']} served from cache{shared})"
+        )
+    memo = stage_memo_stats(final_state.get("metrics") or {})
+    if memo["hits"] or memo["misses"]:
+        print(f"↺ Stage memo: {memo['hits']} of {memo['hits'] + memo['misses']} stages reused")
+    print("=" * 60)
+
+
+# Optional: Add conditional routing for error handling
+def should_continue(state: WorkflowState) -> str:
+    """
+    Conditional routing based on state.
+    
+    Args:
+        state: Current workflow state
+        
+    Returns:
+        Next node name or "end"
+    """
+    if state.get("status") == "error":
+        return "end"
+    return "continue"
+
@@ -0,0 +1,207 @@
+"""
+Agent Handoff Payloads
+
+Builds the upstream output injected into each downstream agent prompt. Every
+edge keeps only the fields its agent uses (a projection of the upstream
+structured_output) and serializes them as minified JSON; the indented full
+payload used before is kept as the "full" mode for comparison. Each handoff
+reports its token count against that full payload, so the savings per edge
+show up in the run metrics.
+
+The JSON edges (A1 -> A2, A2 -> A3) take their fields from the output schema
+in the upstream agent's user prompt and fail at import if a field is not in
+that schema; fields missing from an actual upstream output are reported.
+"""
+
+import os
+import re
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.prompts import a1_sampling_user_prompt, a2_wetlab_user_prompt
+from app.tokens import count_tokens
+
+
+# Handoff mode: projected (per-edge fields, minified) or full (all fields, indented)
+DEFAULT_MODE = os.getenv("ARG_HANDOFF_MODE", "projected").lower()
+
+MODES = ("projected", "full")
+
+# A ```json block that is a whole object, and its top-level keys (2-space indent)
+_SCHEMA_BLOCK = re.compile(r"^```json\n(\{\n.*?\n\})\n```", re.S | re.M)
+_SCHEMA_KEY = re.compile(r'^  "(\w+)":', re.M)
+
+
+def schema_fields(prompt: str) -> List[str]:
+    """
+    Top-level fields of the output schema in an agent prompt.
+
+    The schema is the ```json object block with the most top-level fields
+    (prompts also hold smaller example objects).
+
+    Returns:
+        Field names in schema order ([] if the prompt has no JSON object block)
+    """
+    blocks = [_SCHEMA_KEY.findall(block) for block in _SCHEMA_BLOCK.findall(prompt)]
+    return max(blocks, key=len, default=[])
+
+
+def schema_edge_fields(prompt: str, fields: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Edge fields checked against the upstream prompt's output schema.
+
+    Raises:
+        ValueError: If a field's top-level key is not in the schema
+    """
+    schema = set(schema_fields(prompt))
+    unknown = [path for path in fields if path.split(".")[0] not in schema]
+    if unknown:
+        raise ValueError(f"Handoff fields not in the upstream output schema: {unknown}")
+    return tuple(fields)
+
+
+# Fields each downstream agent needs from its upstream output. Dotted paths
+# select nested fields; paths missing from the payload are skipped (and reported).
+EDGE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    # Wet-lab: sample types, volumes, counts, preservation, biosafety, controls
+    "a1_a2": schema_edge_fields(a1_sampling_user_prompt.TEXT, (
+        "handoff_to_wetlab",
+        "study_metadata",
+        "study_design",
+        "sampling_scheme",
+        "metadata_requirements",
+        "qc_strategy",
+    )),
+    # Bioinformatics: data types, sequencing parameters, naming, QC flags
+    "a2_a3": schema_edge_fields(a2_wetlab_user_prompt.TEXT, (
+        "handoff_to_bioinformatics",
+        "protocol_metadata",
+        "library_prep",
+    )),
+    # Analysis: data_handoff.yaml (tables, normalization, design) and output
+    # layout (A3 section keys, see a3_bioinfo.SECTION_FILES)
+    "a3_a4": (
+        "handoff_yaml",
+        "config_yaml",
+    ),
+}
+
+
+def missing_fields(payload: Dict[str, Any], fields: Sequence[str]) -> List[str]:
+    """Fields (dotted paths) that a payload does not have."""
+    missing = []
+    for path in fields:
+        value: Any = payload
+        for key in path.split("."):
+            if not isinstance(value, dict) or key not in value:
+                missing.append(path)
+                break
+            value = value[key]
+    return missing
+
+
+def project(payload: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Keep only the given fields of a payload.
+
+    Args:
+        payload: Upstream structured_output
+        fields: Top-level keys or dotted paths ("a.b") to keep
+
+    Returns:
+        Projected dict (the payload itself if none of the fields are present,
+        so an upstream output that ignored the schema is passed on whole)
+    """
+    projected: Dict[str, Any] = {}
+    for path in fields:
+        keys = path.split(".")
+        value: Any = payload
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = projected
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+    return projected or payload
+
+
+def serialize(payload: Any) -> str:
+    """Minified JSON (no indentation or spaces after separators, raw unicode)."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def handoff_payload(
+    edge: str,
+    payload: Optional[Dict[str, Any]],
+    mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    The part of an upstream output that an edge passes downstream.
+
+    Args:
+        edge: Edge name (key of EDGE_FIELDS, e.g. "a1_a2")
+        payload: Upstream structured_output (None is treated as {})
+        mode: "projected" or "full" (default: ARG_HANDOFF_MODE)
+
+    Returns:
+        Projected payload ("full" mode: the payload itself)
+
+    Raises:
+        ValueError: For an unknown edge or mode
+    """
+    mode = mode or DEFAULT_MODE
+    if edge not in EDGE_FIELDS:
+        raise ValueError(f"Unknown handoff edge: {edge}")
+    if mode not in MODES:
+        raise ValueError(f"ARG_HANDOFF_MODE must be one of {MODES}, got {mode!r}")
+    payload = payload or {}
+    return payload if mode == "full" else project(payload, EDGE_FIELDS[edge])
+
+
+def build_handoff(
+    edge: str,
+    payload: Optional[Dict[str, Any]],
+    mode: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the handoff text for one edge.
+
+    Args:
+        edge: Edge name (key of EDGE_FIELDS, e.g. "a1_a2")
+        payload: Upstream structured_output (None is treated as {})
+        mode: "projected" or "full" (default: ARG_HANDOFF_MODE)
+
+    Returns:
+        (text, report) - report holds the mode, kept/dropped top-level fields,
+        edge fields missing from the payload (also printed as a warning) and
+        token counts of the text vs the full indented payload
+
+    Raises:
+        ValueError: For an unknown edge or mode
+    """
+    mode = mode or DEFAULT_MODE
+    payload = payload or {}
+    kept = handoff_payload(edge, payload, mode)
+    full_text = json.dumps(payload, indent=2)
+    text = full_text if mode == "full" else serialize(kept)
+    missing = missing_fields(payload, EDGE_FIELDS[edge])
+    if missing:
+        print(f"⚠ Handoff {edge}: upstream output is missing {', '.join(missing)}")
+
+    full_tokens = count_tokens(full_text)
+    tokens = full_tokens if mode == "full" else count_tokens(text)
+    report = {
+        "edge": edge,
+        "mode": mode,
+        "fields": sorted(kept),
+        "dropped_fields": sorted(key for key in payload if key not in kept),
+        "missing_fields": missing,
+        "full_tokens": full_tokens,
+        "tokens": tokens,
+        "saved_tokens": full_tokens - tokens,
+        "saved_pct": round(100.0 * (full_tokens - tokens) / full_tokens, 1) if full_tokens else 0.0
+    }
+    return text, report
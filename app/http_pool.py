@@ -0,0 +1,253 @@
+"""
+HTTP Connection Pool
+
+Tuned httpx clients for the OpenAI SDK: pool size, keep-alive, optional
+HTTP/2 and separate connect/read/pool timeouts (configured via environment).
+The transports count in-flight requests, so pool saturation can be checked
+when sizing API job workers, batch concurrency and pipeline stages.
+"""
+
+import os
+import threading
+from typing import Any, Dict
+
+import httpx
+
+
+# Defaults (override via environment)
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("ARG_HTTP_MAX_CONNECTIONS", "64"))
+DEFAULT_MAX_KEEPALIVE = int(os.getenv("ARG_HTTP_MAX_KEEPALIVE", "32"))
+DEFAULT_KEEPALIVE_EXPIRY_S = float(os.getenv("ARG_HTTP_KEEPALIVE_EXPIRY_S", "60"))
+DEFAULT_HTTP2 = os.getenv("ARG_HTTP2", "0").lower() in ("1", "true", "yes", "on")
+DEFAULT_CONNECT_TIMEOUT_S = float(os.getenv("ARG_HTTP_CONNECT_TIMEOUT_S", "10"))
+DEFAULT_READ_TIMEOUT_S = float(os.getenv("ARG_HTTP_READ_TIMEOUT_S", "300"))
+DEFAULT_POOL_TIMEOUT_S = float(os.getenv("ARG_HTTP_POOL_TIMEOUT_S", "60"))
+
+
+class PoolStats:
+    """
+    Request counters for one pool.
+
+    A request is in flight from send until its response body is closed
+    (streamed completions hold their connection until the last chunk), so
+    in_flight includes requests still waiting for a connection. Requests that
+    start while max_connections are already in flight are counted as
+    saturated; a peak_utilization above 1 means the pool is too small for
+    the configured concurrency.
+    """
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self.requests += 1
+            if self.in_flight >= self.max_connections:
+                self.saturated += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters and utilisation (peak in-flight / max_connections)."""
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "peak_utilization": round(self.peak_in_flight / self.max_connections, 3),
+                "saturated_requests": self.saturated
+            }
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """Response body that releases its pool slot when closed."""
+
+    def __init__(self, stream: httpx.SyncByteStream, stats: PoolStats):
+        self._stream = stream
+        self._stats = stats
+        self._released = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._stats.release()
+
+
+class _TrackedAsyncStream(httpx.AsyncByteStream):
+    """Async version of _TrackedStream."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, stats: PoolStats):
+        self._stream = stream
+        self._stats = stats
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._stats.release()
+
+
+class TrackedTransport(httpx.HTTPTransport):
+    """httpx transport that records in-flight requests in a PoolStats."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.acquire()
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            self.stats.release()
+            raise
+        response.stream = _TrackedStream(response.stream, self.stats)
+        return response
+
+    def open_connections(self) -> int:
+        """Connections currently held by the pool (idle or busy)."""
+        return len(getattr(self._pool, "connections", []))
+
+
+class TrackedAsyncTransport(httpx.AsyncHTTPTransport):
+    """Async version of TrackedTransport."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.acquire()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self.stats.release()
+            raise
+        response.stream = _TrackedAsyncStream(response.stream, self.stats)
+        return response
+
+    def open_connections(self) -> int:
+        """Connections currently held by the pool (idle or busy)."""
+        return len(getattr(self._pool, "connections", []))
+
+
+# One pool per I/O model: httpx sync and async clients cannot share
+# connections, so the sync (CLI/batch threads) and async (API event loop)
+# paths each get one process-wide pool with the same settings.
+_stats = {
+    "sync": PoolStats(DEFAULT_MAX_CONNECTIONS),
+    "async": PoolStats(DEFAULT_MAX_CONNECTIONS),
+}
+_transports: Dict[str, Any] = {}
+
+
+def _transport_options() -> Dict[str, Any]:
+    """Keyword arguments shared by the sync and async transports."""
+    http2 = DEFAULT_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401 (httpx needs it for HTTP/2)
+        except ImportError:
+            print("⚠ ARG_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+            http2 = False
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=DEFAULT_MAX_CONNECTIONS,
+            max_keepalive_connections=DEFAULT_MAX_KEEPALIVE,
+            keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY_S
+        ),
+    }
+
+
+def default_timeout() -> httpx.Timeout:
+    """Client-level timeouts (used when a request does not pass its own)."""
+    return httpx.Timeout(
+        DEFAULT_READ_TIMEOUT_S,
+        connect=DEFAULT_CONNECT_TIMEOUT_S,
+        pool=DEFAULT_POOL_TIMEOUT_S
+    )
+
+
+def request_timeout(total: float) -> httpx.Timeout:
+    """
+    Per-request timeouts with every phase capped at a call budget.
+
+    Args:
+        total: Seconds the call may take (see retry.call_timeout())
+
+    Returns:
+        httpx.Timeout keeping the short connect/pool limits
+    """
+    return httpx.Timeout(
+        min(DEFAULT_READ_TIMEOUT_S, total),
+        connect=min(DEFAULT_CONNECT_TIMEOUT_S, total),
+        pool=min(DEFAULT_POOL_TIMEOUT_S, total)
+    )
+
+
+def create_http_client() -> httpx.Client:
+    """
+    Create the pooled httpx client for the sync OpenAI client.
+
+    Returns:
+        httpx.Client backed by a TrackedTransport
+    """
+    transport = TrackedTransport(_stats["sync"], **_transport_options())
+    _transports["sync"] = transport
+    return httpx.Client(transport=transport, timeout=default_timeout(), follow_redirects=True)
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled httpx client for the async OpenAI client.
+
+    Returns:
+        httpx.AsyncClient backed by a TrackedAsyncTransport
+    """
+    transport = TrackedAsyncTransport(_stats["async"], **_transport_options())
+    _transports["async"] = transport
+    return httpx.AsyncClient(transport=transport, timeout=default_timeout(), follow_redirects=True)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Return pool settings and saturation counters for the sync and async pools.
+
+    Returns:
+        Dict with "http2", "keepalive_expiry_s" and per-pool counters
+        (plus "open_connections" once the pool has been created)
+    """
+    stats: Dict[str, Any] = {
+        "http2": DEFAULT_HTTP2,
+        "keepalive_expiry_s": DEFAULT_KEEPALIVE_EXPIRY_S,
+    }
+    for kind, counters in _stats.items():
+        stats[kind] = counters.snapshot()
+        transport = _transports.get(kind)
+        stats[kind]["open_connections"] = transport.open_connections() if transport else 0
+    return stats
@@ -0,0 +1,164 @@
+"""
+Workflow Job Queue
+
+Bounded asyncio worker pool for API workflow runs. Caps how many pipelines run
+at once, queues the rest in FIFO order, and rejects submissions once the queue
+is full so callers can back off.
+"""
+
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Defaults (override via environment)
+DEFAULT_WORKERS = int(os.getenv("ARG_JOB_WORKERS", "4"))
+DEFAULT_MAX_QUEUE = int(os.getenv("ARG_JOB_QUEUE_MAX", "100"))
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted to a full queue."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueClosedError(Exception):
+    """Raised when a job is submitted while the queue is shutting down."""
+
+
+class _Job:
+    """A queued unit of work."""
+
+    def __init__(
+        self,
+        job_id: str,
+        run: Callable[[], Awaitable[Any]],
+        on_start: Optional[Callable[[float], None]],
+        future: "asyncio.Future"
+    ):
+        self.job_id = job_id
+        self.run = run
+        self.on_start = on_start
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class JobQueue:
+    """
+    FIFO job queue served by a fixed number of asyncio workers.
+
+    Workers are started on first submit (or explicitly with start()) on the
+    running event loop.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._closed = False
+        self._active = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def start(self) -> None:
+        """Start worker tasks on the running event loop (idempotent)."""
+        if self._queue is not None:
+            return
+        self._closed = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop accepting jobs and cancel the workers."""
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(
+        self,
+        job_id: str,
+        run: Callable[[], Awaitable[Any]],
+        on_start: Optional[Callable[[float], None]] = None
+    ) -> "asyncio.Future":
+        """
+        Enqueue a job.
+
+        Args:
+            job_id: Identifier (usually the run_id)
+            run: Zero-argument coroutine function doing the work
+            on_start: Optional callback(queue_wait_seconds) when a worker picks it up
+
+        Returns:
+            Future resolving to the job's result
+
+        Raises:
+            QueueFullError: If max_queue jobs are already waiting
+            QueueClosedError: If the queue is shutting down
+        """
+        if self._closed:
+            raise QueueClosedError("Job queue is shutting down")
+        self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_Job(job_id, run, on_start, future))
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                f"Job queue is full ({self.max_queue} waiting)",
+                retry_after=self.retry_after()
+            )
+        return future
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up."""
+        avg_run = self._total_run / self._completed if self._completed else 60.0
+        return max(1, int(avg_run / max(self.workers, 1)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker/queue counters."""
+        return {
+            "workers": self.workers,
+            "active": self._active,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "avg_queue_wait_s": round(self._total_wait / self._completed, 3) if self._completed else 0.0,
+            "avg_run_s": round(self._total_run / self._completed, 3) if self._completed else 0.0
+        }
+
+    async def _worker(self) -> None:
+        """Pull jobs off the queue until cancelled."""
+        while True:
+            job = await self._queue.get()
+            wait = time.monotonic() - job.queued_at
+            started = time.monotonic()
+            self._active += 1
+            try:
+                if job.on_start is not None:
+                    job.on_start(wait)
+                result = await job.run()
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self._active -= 1
+                self._completed += 1
+                self._total_wait += wait
+                self._total_run += time.monotonic() - started
+                self._queue.task_done()
@@ -1,117 +1,989 @@
-"""
-LLM Interface using OpenAI API
-
-Centralized module for calling OpenAI models.
-"""
-
-import os
-from typing import Optional
-from openai import OpenAI
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Default model
-DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
-
-
-def call_llm(
-    system_prompt: str,
-    user_prompt: str,
-    model: Optional[str] = None,
-    temperature: float = 0.3,
-    max_tokens: int = 4000
-) -> str:
-    """
-    Call OpenAI API with system and user prompts.
-    
-    Args:
-        system_prompt: System-level instructions
-        user_prompt: User query or task description
-        model: Model name (default: gpt-4o)
-        temperature: Sampling temperature (0-2)
-        max_tokens: Maximum tokens in response
-        
-    Returns:
-        Response text from LLM
-        
-    Raises:
-        Exception if API call fails
-    """
-    if model is None:
-        model = DEFAULT_MODEL
-    
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        return response.choices[0].message.content
-    
-    except Exception as e:
-        print(f"Error calling OpenAI API: {e}")
-        raise
-
-
-def call_llm_with_history(
-    system_prompt: str,
-    messages: list,
-    model: Optional[str] = None,
-    temperature: float = 0.3,
-    max_tokens: int = 4000
-) -> str:
-    """
-    Call OpenAI API with message history (for multi-turn conversations).
-    
-    Args:
-        system_prompt: System-level instructions
-        messages: List of dicts with 'role' and 'content' keys
-        model: Model name (default: gpt-4o)
-        temperature: Sampling temperature (0-2)
-        max_tokens: Maximum tokens in response
-        
-    Returns:
-        Response text from LLM
-    """
-    if model is None:
-        model = DEFAULT_MODEL
-    
-    try:
-        full_messages = [{"role": "system", "content": system_prompt}] + messages
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=full_messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        return response.choices[0].message.content
-    
-    except Exception as e:
-        print(f"Error calling OpenAI API: {e}")
-        raise
-
-
-def estimate_tokens(text: str) -> int:
-    """
-    Rough estimate of token count (1 token ≈ 4 characters).
-    
-    Args:
-        text: Input text
-        
-    Returns:
-        Estimated token count
-    """
-    return len(text) // 4
-
+"""
+LLM Interface using OpenAI API
+
+Centralized module for calling OpenAI models.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple, Any, Callable, Dict, Iterator, AsyncIterator, List
+
+from app.cache import get_cache, cache_bypassed, make_cache_key
+from app.ratelimit import get_rate_limiter
+from app.retry import FATAL, DeadlineExceeded, call_timeout, classify_error, get_retry_policy
+from app.singleflight import AsyncSingleFlight, SingleFlight
+from app.tokens import count_message_tokens, count_tokens
+
+# Default model (when OPENAI_MODEL is unset)
+DEFAULT_MODEL = "gpt-4o"
+
+# Model context window (prompt + max_tokens), checked before every request
+CONTEXT_TOKENS = int(os.getenv("ARG_LLM_CONTEXT_TOKENS", "128000"))
+
+# Output constraint for agents that return one JSON object (opt in per agent
+# with response_format=...; ARG_LLM_JSON_MODE=0 for models/servers without it)
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+JSON_MODE = os.getenv("ARG_LLM_JSON_MODE", "1").lower() in ("1", "true", "yes", "on")
+
+# Coalesce identical in-flight call_llm* requests (followers share the leader's
+# response); requests that bypass the response cache are never coalesced
+COALESCE = os.getenv("ARG_LLM_COALESCE", "1").lower() in ("1", "true", "yes", "on")
+
+
+def _shared_failure(error: BaseException) -> bool:
+    """
+    Whether a coalesced leader's failure is also its followers' outcome.
+    
+    Non-retryable errors would fail the same way for every caller; an
+    exhausted retry budget or a passed deadline belongs to the leader, so
+    followers run the call on their own budget instead.
+    """
+    return classify_error(error) == FATAL and not isinstance(error, DeadlineExceeded)
+
+
+_inflight = SingleFlight(share_error=_shared_failure)
+_inflight_async = AsyncSingleFlight(share_error=_shared_failure)
+
+
+def _coalesces(use_cache: bool) -> bool:
+    """
+    Whether a request may share an identical in-flight request's response.
+    
+    A caller bypassing the response cache (use_cache=False or bypass_cache())
+    asked for a fresh completion, so it neither joins nor leads a shared one.
+    """
+    return COALESCE and use_cache and not cache_bypassed()
+
+# OpenAI clients (sync for CLI/scripts, async for the event loop), created on
+# first use so importing this module needs neither the SDK nor an API key
+_client: Optional[Any] = None
+_async_client: Optional[Any] = None
+_client_lock = threading.Lock()
+
+# Token listener for the current context (set with token_listener())
+_token_listener: ContextVar[Optional[Callable[[str], None]]] = ContextVar(
+    "arg_llm_token_listener", default=None
+)
+
+
+# Per-call records for the current context (set with call_log())
+_call_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar(
+    "arg_llm_call_log", default=None
+)
+
+
+def get_client() -> Any:
+    """
+    Return the shared OpenAI client, creating it on first use.
+    
+    Retries are handled in this module (app/retry.py), not by the SDK;
+    connections come from the tuned pool in app/http_pool.py.
+    
+    Returns:
+        openai.OpenAI instance (FakeOpenAI when ARG_LLM_BACKEND=fake; wrapped
+        or replaced by the cassette when ARG_LLM_CASSETTE is set)
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client(use_async=False)
+    return _client
+
+
+def get_async_client() -> Any:
+    """
+    Return the shared AsyncOpenAI client, creating it on first use.
+    
+    Returns:
+        openai.AsyncOpenAI instance (see get_client for fake/cassette modes)
+    """
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = _build_client(use_async=True)
+    return _async_client
+
+
+def _build_client(use_async: bool) -> Any:
+    """Create a client for the configured backend and cassette mode."""
+    from app.cassette import get_cassette
+    
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        return cassette.replay_async_client() if use_async else cassette.replay_client()
+    
+    if llm_backend() == "fake":
+        from app.fake_llm import FakeAsyncOpenAI, FakeOpenAI
+        
+        client = FakeAsyncOpenAI() if use_async else FakeOpenAI()
+    elif use_async:
+        from openai import AsyncOpenAI
+        from app.http_pool import create_async_http_client
+        
+        client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=0,
+            http_client=create_async_http_client()
+        )
+    else:
+        from openai import OpenAI
+        from app.http_pool import create_http_client
+        
+        client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=0,
+            http_client=create_http_client()
+        )
+    
+    if cassette is not None:
+        client = cassette.wrap_async(client) if use_async else cassette.wrap(client)
+    return client
+
+
+def set_client(client: Optional[Any] = None, async_client: Optional[Any] = None) -> None:
+    """
+    Replace the shared clients (e.g. with mocks in tests).
+    
+    Args:
+        client: Sync client (None = recreate from the environment on next use)
+        async_client: Async client (None = recreate from the environment on next use)
+    """
+    global _client, _async_client
+    with _client_lock:
+        _client = client
+        _async_client = async_client
+
+
+def llm_backend() -> str:
+    """Configured backend: "openai" (default) or "fake" (app/fake_llm.py, no network)."""
+    return os.getenv("ARG_LLM_BACKEND", "openai").lower()
+
+
+def missing_api_key() -> bool:
+    """True if calls would need OPENAI_API_KEY and it is not set (.env included)."""
+    if llm_backend() == "fake" or os.getenv("ARG_LLM_CASSETTE", "").lower() == "replay":
+        return False
+    return not os.getenv("OPENAI_API_KEY")
+
+
+def default_model() -> str:
+    """Model used when a call does not name one (OPENAI_MODEL, else gpt-4o)."""
+    return os.getenv("OPENAI_MODEL", DEFAULT_MODEL)
+
+
+@contextmanager
+def call_log() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Collect a record for every API call made in this context.
+    
+    Each record holds "attempts", "retry_wait_s", "errors" (one
+    {"type", "message"} entry per failed attempt) and the usage reported by
+    the API: "model", "prompt_tokens", "completion_tokens", "cached_tokens",
+    "finish_reason" and "latency_s". Response-cache hits are recorded with
+    "cache_hit": True and no tokens; calls that waited for an identical
+    in-flight request are recorded with "coalesced": True and no tokens.
+    
+    Yields:
+        List that records are appended to as calls start
+    """
+    records: List[Dict[str, Any]] = []
+    token = _call_log.set(records)
+    try:
+        yield records
+    finally:
+        _call_log.reset(token)
+
+
+def record_calls(records: List[Dict[str, Any]]) -> None:
+    """Append call records collected in another context (e.g. a speculative stage run) to the active call_log()."""
+    active = _call_log.get()
+    if active is not None:
+        active.extend(records)
+
+
+@contextmanager
+def token_listener(callback: Callable[[str], None]) -> Iterator[None]:
+    """
+    Forward generated text to callback while it is produced.
+    
+    While active, every call_llm* call in this context streams its completion
+    and passes each text delta to callback (cache hits arrive as one delta).
+    The calls still return the full response text.
+    
+    Args:
+        callback: Function receiving each text delta
+    """
+    token = _token_listener.set(callback)
+    try:
+        yield
+    finally:
+        _token_listener.reset(token)
+
+
+def active_token_listener() -> Optional[Callable[[str], None]]:
+    """The token_listener() callback for the current context, or None."""
+    return _token_listener.get()
+
+
+def emit_tokens(text: str) -> None:
+    """Pass text to the active token_listener() callback, if any (e.g. a memoized stage output)."""
+    listener = _token_listener.get()
+    if listener is not None and text:
+        listener(text)
+
+
+def call_llm(
+    system_prompt: str,
+    user_prompt: str,
+    model: Optional[str] = None,
+    temperature: float = 0.3,
+    max_tokens: int = 4000,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+    stop: Optional[List[str]] = None
+) -> str:
+    """
+    Call OpenAI API with system and user prompts.
+    
+    Args:
+        system_prompt: System-level instructions
+        user_prompt: User query or task description
+        model: Model name (default: OPENAI_MODEL or gpt-4o)
+        temperature: Sampling temperature (0-2)
+        max_tokens: Maximum tokens in response
+        use_cache: Serve/store identical requests from the response cache
+        response_format: Output constraint passed to the API, e.g.
+            JSON_OBJECT_FORMAT (part of the cache key)
+        stop: Up to 4 sequences that end generation (part of the cache key)
+        
+    Returns:
+        Response text from LLM
+        
+    Raises:
+        Exception if API call fails
+    """
+    messages = [{"role": "user", "content": user_prompt}]
+    
+    return call_llm_with_history(
+        system_prompt=system_prompt,
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        use_cache=use_cache,
+        response_format=response_format,
+        stop=stop
+    )
+
+
+def call_llm_with_history(
+    system_prompt: str,
+    messages: list,
+    model: Optional[str] = None,
+    temperature: float = 0.3,
+    max_tokens: int = 4000,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+    stop: Optional[List[str]] = None
+) -> str:
+    """
+    Call OpenAI API with message history (for multi-turn conversations).
+    
+    Args:
+        system_prompt: System-level instructions
+        messages: List of dicts with 'role' and 'content' keys
+        model: Model name (default: OPENAI_MODEL or gpt-4o)
+        temperature: Sampling temperature (0-2)
+        max_tokens: Maximum tokens in response
+        use_cache: Serve/store identical requests from the response cache
+        response_format: Output constraint passed to the API, e.g.
+            JSON_OBJECT_FORMAT (part of the cache key)
+        stop: Up to 4 sequences that end generation (part of the cache key)
+        
+    Returns:
+        Response text from LLM
+    """
+    if model is None:
+        model = default_model()
+    
+    full_messages = [{"role": "system", "content": system_prompt}] + messages
+    
+    # Check response cache (keyed on the full request)
+    options = _request_options(response_format, stop)
+    cache, cache_key, cached = _cache_lookup(
+        use_cache, model, full_messages, temperature, max_tokens, options
+    )
+    listener = _token_listener.get()
+    if cached is not None:
+        _new_call_record(model, cache_hit=True)
+        if listener is not None:
+            listener(cached)
+        return cached
+    
+    def complete() -> str:
+        if listener is None:
+            response = _create(model, full_messages, temperature, max_tokens, options)
+            content = response.choices[0].message.content
+        else:
+            parts = []
+            for delta in _stream_deltas(model, full_messages, temperature, max_tokens, options):
+                listener(delta)
+                parts.append(delta)
+            content = "".join(parts)
+        
+        if cache is not None and content:
+            cache.set(cache_key, content)
+        
+        return content
+    
+    try:
+        if not _coalesces(use_cache):
+            return complete()
+        
+        # Identical requests already in flight: wait for that response
+        content, shared = _inflight.do(
+            cache_key or _request_key(model, full_messages, temperature, max_tokens, options), complete
+        )
+        if shared:
+            _new_call_record(model, coalesced=True)
+            if listener is not None and content:
+                listener(content)
+        return content
+    
+    except Exception as e:
+        print(f"Error calling OpenAI API: {e}")
+        raise
+
+
+async def call_llm_async(
+    system_prompt: str,
+    user_prompt: str,
+    model: Optional[str] = None,
+    temperature: float = 0.3,
+    max_tokens: int = 4000,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+    stop: Optional[List[str]] = None
+) -> str:
+    """
+    Async version of call_llm (does not block the event loop).
+    
+    Args:
+        system_prompt: System-level instructions
+        user_prompt: User query or task description
+        model: Model name (default: OPENAI_MODEL or gpt-4o)
+        temperature: Sampling temperature (0-2)
+        max_tokens: Maximum tokens in response
+        use_cache: Serve/store identical requests from the response cache
+        response_format: Output constraint passed to the API, e.g.
+            JSON_OBJECT_FORMAT (part of the cache key)
+        stop: Up to 4 sequences that end generation (part of the cache key)
+        
+    Returns:
+        Response text from LLM
+    """
+    messages = [{"role": "user", "content": user_prompt}]
+    
+    return await call_llm_with_history_async(
+        system_prompt=system_prompt,
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        use_cache=use_cache,
+        response_format=response_format,
+        stop=stop
+    )
+
+
+async def call_llm_with_history_async(
+    system_prompt: str,
+    messages: list,
+    model: Optional[str] = None,
+    temperature: float = 0.3,
+    max_tokens: int = 4000,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+    stop: Optional[List[str]] = None
+) -> str:
+    """
+    Async version of call_llm_with_history.
+    
+    Args:
+        system_prompt: System-level instructions
+        messages: List of dicts with 'role' and 'content' keys
+        model: Model name (default: OPENAI_MODEL or gpt-4o)
+        temperature: Sampling temperature (0-2)
+        max_tokens: Maximum tokens in response
+        use_cache: Serve/store identical requests from the response cache
+        response_format: Output constraint passed to the API, e.g.
+            JSON_OBJECT_FORMAT (part of the cache key)
+        stop: Up to 4 sequences that end generation (part of the cache key)
+        
+    Returns:
+        Response text from LLM
+    """
+    if model is None:
+        model = default_model()
+    
+    full_messages = [{"role": "system", "content": system_prompt}] + messages
+    
+    options = _request_options(response_format, stop)
+    cache, cache_key, cached = await to_thread(
+        _cache_lookup, use_cache, model, full_messages, temperature, max_tokens, options
+    )
+    listener = _token_listener.get()
+    if cached is not None:
+        _new_call_record(model, cache_hit=True)
+        if listener is not None:
+            listener(cached)
+        return cached
+    
+    async def complete() -> str:
+        if listener is None:
+            response = await _create_async(model, full_messages, temperature, max_tokens, options)
+            content = response.choices[0].message.content
+        else:
+            parts = []
+            async for delta in _stream_deltas_async(model, full_messages, temperature, max_tokens, options):
+                listener(delta)
+                parts.append(delta)
+            content = "".join(parts)
+        
+        if cache is not None and content:
+            await to_thread(cache.set, cache_key, content)
+        
+        return content
+    
+    try:
+        if not _coalesces(use_cache):
+            return await complete()
+        
+        content, shared = await _inflight_async.do(
+            cache_key or _request_key(model, full_messages, temperature, max_tokens, options), complete
+        )
+        if shared:
+            _new_call_record(model, coalesced=True)
+            if listener is not None and content:
+                listener(content)
+        return content
+    
+    except Exception as e:
+        print(f"Error calling OpenAI API: {e}")
+        raise
+
+
+def stream_llm(
+    system_prompt: str,
+    user_prompt: str,
+    model: Optional[str] = None,
+    temperature: float = 0.3,
+    max_tokens: int = 4000,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+    stop: Optional[List[str]] = None
+) -> Iterator[str]:
+    """
+    Stream a completion, yielding text deltas as they are generated.
+    
+    Args:
+        system_prompt: System-level instructions
+        user_prompt: User query or task description
+        model: Model name (default: OPENAI_MODEL or gpt-4o)
+        temperature: Sampling temperature (0-2)
+        max_tokens: Maximum tokens in response
+        use_cache: Serve/store identical requests from the response cache
+        response_format: Output constraint passed to the API, e.g.
+            JSON_OBJECT_FORMAT (part of the cache key)
+        stop: Up to 4 sequences that end generation (part of the cache key)
+        
+    Yields:
+        Text deltas (a cache hit is yielded as a single delta)
+    """
+    if model is None:
+        model = default_model()
+    
+    full_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    
+    options = _request_options(response_format, stop)
+    cache, cache_key, cached = _cache_lookup(
+        use_cache, model, full_messages, temperature, max_tokens, options
+    )
+    if cached is not None:
+        _new_call_record(model, cache_hit=True)
+        yield cached
+        return
+    
+    parts = []
+    for delta in _stream_deltas(model, full_messages, temperature, max_tokens, options):
+        parts.append(delta)
+        yield delta
+    
+    content = "".join(parts)
+    if cache is not None and content:
+        cache.set(cache_key, content)
+
+
+async def stream_llm_async(
+    system_prompt: str,
+    user_prompt: str,
+    model: Optional[str] = None,
+    temperature: float = 0.3,
+    max_tokens: int = 4000,
+    use_cache: bool = True,
+    response_format: Optional[Dict[str, Any]] = None,
+    stop: Optional[List[str]] = None
+) -> AsyncIterator[str]:
+    """
+    Async version of stream_llm.
+    
+    Yields:
+        Text deltas (a cache hit is yielded as a single delta)
+    """
+    if model is None:
+        model = default_model()
+    
+    full_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    
+    options = _request_options(response_format, stop)
+    cache, cache_key, cached = await to_thread(
+        _cache_lookup, use_cache, model, full_messages, temperature, max_tokens, options
+    )
+    if cached is not None:
+        _new_call_record(model, cache_hit=True)
+        yield cached
+        return
+    
+    parts = []
+    async for delta in _stream_deltas_async(model, full_messages, temperature, max_tokens, options):
+        parts.append(delta)
+        yield delta
+    
+    content = "".join(parts)
+    if cache is not None and content:
+        await to_thread(cache.set, cache_key, content)
+
+
+def _create(
+    model: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    options: Dict[str, Any]
+) -> Any:
+    """Non-streaming completion with rate limiting, retries and the call deadline."""
+    reserved = _request_tokens(messages, max_tokens)
+    record = _new_call_record(model)
+    while True:
+        record["attempts"] += 1
+        try:
+            with get_rate_limiter().slot(reserved) as lease:
+                response = get_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=_request_timeout(),
+                    **options
+                )
+                lease.settle(_usage_tokens(response))
+            _record_response(record, response)
+            return response
+        except Exception as e:
+            delay = _retry_delay(record, e)
+            if delay is None:
+                raise
+            time.sleep(delay)
+
+
+async def _create_async(
+    model: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    options: Dict[str, Any]
+) -> Any:
+    """Async version of _create."""
+    reserved = _request_tokens(messages, max_tokens)
+    record = _new_call_record(model)
+    while True:
+        record["attempts"] += 1
+        try:
+            async with get_rate_limiter().slot_async(reserved) as lease:
+                response = await get_async_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=_request_timeout(),
+                    **options
+                )
+                lease.settle(_usage_tokens(response))
+            _record_response(record, response)
+            return response
+        except Exception as e:
+            delay = _retry_delay(record, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+
+def _stream_deltas(
+    model: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    options: Dict[str, Any]
+) -> Iterator[str]:
+    """
+    Open a streaming completion and yield non-empty text deltas.
+    
+    Failures are retried only until the first delta is produced (a retry
+    after that would repeat text the caller has already seen).
+    """
+    reserved = _request_tokens(messages, max_tokens)
+    record = _new_call_record(model)
+    generated = 0
+    while True:
+        record["attempts"] += 1
+        try:
+            with get_rate_limiter().slot(reserved) as lease:
+                stream = get_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=_request_timeout(),
+                    **options
+                )
+                for chunk in stream:
+                    _record_chunk(record, chunk)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        generated += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                lease.settle(_stream_tokens(record, messages, generated))
+            return
+        except Exception as e:
+            delay = _retry_delay(record, e) if generated == 0 else None
+            if delay is None:
+                raise
+            time.sleep(delay)
+
+
+async def _stream_deltas_async(
+    model: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    options: Dict[str, Any]
+) -> AsyncIterator[str]:
+    """Async version of _stream_deltas."""
+    reserved = _request_tokens(messages, max_tokens)
+    record = _new_call_record(model)
+    generated = 0
+    while True:
+        record["attempts"] += 1
+        try:
+            async with get_rate_limiter().slot_async(reserved) as lease:
+                stream = await get_async_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=_request_timeout(),
+                    **options
+                )
+                async for chunk in stream:
+                    _record_chunk(record, chunk)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        generated += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                lease.settle(_stream_tokens(record, messages, generated))
+            return
+        except Exception as e:
+            delay = _retry_delay(record, e) if generated == 0 else None
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+
+def _new_call_record(model: str, cache_hit: bool = False, coalesced: bool = False) -> Dict[str, Any]:
+    """Start a call record (appended to the active call_log(), if any)."""
+    record = {
+        "model": model,
+        "cache_hit": cache_hit,
+        "coalesced": coalesced,
+        "attempts": 0,
+        "retry_wait_s": 0.0,
+        "errors": [],
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "finish_reason": None,
+        "latency_s": 0.0,
+        "_started": time.perf_counter()
+    }
+    records = _call_log.get()
+    if records is not None:
+        records.append(record)
+    return record
+
+
+def _record_usage(record: Dict[str, Any], usage: Any) -> None:
+    """Copy token counts from a CompletionUsage object into a call record."""
+    record["prompt_tokens"] = getattr(usage, "prompt_tokens", 0) or 0
+    record["completion_tokens"] = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    record["cached_tokens"] = getattr(details, "cached_tokens", 0) or 0
+
+
+def _record_response(record: Dict[str, Any], response: Any) -> None:
+    """Fill a call record from a non-streaming completion."""
+    record["model"] = getattr(response, "model", None) or record["model"]
+    if getattr(response, "usage", None) is not None:
+        _record_usage(record, response.usage)
+    if response.choices:
+        record["finish_reason"] = response.choices[0].finish_reason
+    record["latency_s"] = round(time.perf_counter() - record["_started"], 3)
+
+
+def _record_chunk(record: Dict[str, Any], chunk: Any) -> None:
+    """Fill a call record from a stream chunk (usage arrives in the last one)."""
+    record["model"] = getattr(chunk, "model", None) or record["model"]
+    if getattr(chunk, "usage", None) is not None:
+        _record_usage(record, chunk.usage)
+    if chunk.choices and chunk.choices[0].finish_reason:
+        record["finish_reason"] = chunk.choices[0].finish_reason
+    record["latency_s"] = round(time.perf_counter() - record["_started"], 3)
+
+
+def _stream_tokens(record: Dict[str, Any], messages: list, generated_chars: int) -> int:
+    """Actual tokens used by a stream (reported usage, else an estimate)."""
+    if record["prompt_tokens"] or record["completion_tokens"]:
+        return record["prompt_tokens"] + record["completion_tokens"]
+    return count_message_tokens(messages) + generated_chars // 4
+
+
+def summarize_usage(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate call records (from call_log()) into one usage summary.
+    
+    Args:
+        records: Call records
+        
+    Returns:
+        Dict with call/cache-hit/coalesced counts, token totals, summed API
+        latency, models used and a finish_reason histogram
+    """
+    summary = {
+        "calls": 0,
+        "cache_hits": 0,
+        "coalesced": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "total_tokens": 0,
+        "latency_s": 0.0,
+        "models": [],
+        "finish_reasons": {}
+    }
+    for record in records:
+        if record.get("cache_hit"):
+            summary["cache_hits"] += 1
+            continue
+        if record.get("coalesced"):
+            summary["coalesced"] += 1
+            continue
+        summary["calls"] += 1
+        for key in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+            summary[key] += record.get(key) or 0
+        summary["latency_s"] += record.get("latency_s") or 0.0
+        if record.get("model") and record["model"] not in summary["models"]:
+            summary["models"].append(record["model"])
+        if record.get("finish_reason"):
+            reason = record["finish_reason"]
+            summary["finish_reasons"][reason] = summary["finish_reasons"].get(reason, 0) + 1
+    summary["total_tokens"] = summary["prompt_tokens"] + summary["completion_tokens"]
+    summary["latency_s"] = round(summary["latency_s"], 3)
+    return summary
+
+
+def total_usage(usage_by_agent: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum per-agent usage summaries (state["usage"]) into run totals.
+    
+    Args:
+        usage_by_agent: Dict of agent -> summarize_usage() result
+        
+    Returns:
+        Usage summary for the whole run
+    """
+    total = summarize_usage([])
+    for summary in usage_by_agent.values():
+        if not summary:
+            continue
+        for key in ("calls", "cache_hits", "coalesced", "prompt_tokens", "completion_tokens",
+                    "cached_tokens", "total_tokens", "latency_s"):
+            total[key] += summary.get(key) or 0
+        for model in summary.get("models", []):
+            if model not in total["models"]:
+                total["models"].append(model)
+        for reason, count in summary.get("finish_reasons", {}).items():
+            total["finish_reasons"][reason] = total["finish_reasons"].get(reason, 0) + count
+    total["latency_s"] = round(total["latency_s"], 3)
+    return total
+
+
+def _retry_delay(record: Dict[str, Any], error: Exception) -> Optional[float]:
+    """Log a failed attempt and return the backoff delay (None = give up)."""
+    record["errors"].append({"type": classify_error(error), "message": str(error)[:200]})
+    delay = get_retry_policy().next_delay(error, record["attempts"])
+    if delay is not None:
+        record["retry_wait_s"] = round(record["retry_wait_s"] + delay, 3)
+        print(f"⚠ LLM call failed ({classify_error(error)}), retrying in {delay:.1f}s: {error}")
+    return delay
+
+
+async def to_thread(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking call in the default executor (asyncio.to_thread for Python 3.8).
+    
+    The call runs in a copy of the current context, so context variables
+    such as cache_bypassed() keep their values.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args)
+    return await loop.run_in_executor(None, call)
+
+
+def _cache_lookup(
+    use_cache: bool,
+    model: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    options: Dict[str, Any]
+) -> Tuple[Any, Optional[str], Optional[str]]:
+    """
+    Look up a request in the response cache.
+    
+    Returns:
+        (cache, cache_key, cached_response) - cache is None when bypassed
+    """
+    cache = get_cache() if use_cache and not cache_bypassed() else None
+    if cache is None:
+        return None, None, None
+    
+    cache_key = _request_key(model, messages, temperature, max_tokens, options)
+    return cache, cache_key, cache.get(cache_key)
+
+
+def _request_key(
+    model: str,
+    messages: list,
+    temperature: float,
+    max_tokens: int,
+    options: Dict[str, Any]
+) -> str:
+    """Hash of everything that determines a completion (cache and coalescing key)."""
+    return make_cache_key({
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **options
+    })
+
+
+def _request_options(
+    response_format: Optional[Dict[str, Any]],
+    stop: Optional[List[str]]
+) -> Dict[str, Any]:
+    """
+    Optional create() arguments that were set.
+    
+    Unset options are left out of both the request and the cache key, so
+    keys for plain requests are unchanged.
+    """
+    options: Dict[str, Any] = {}
+    if response_format is not None:
+        options["response_format"] = response_format
+    if stop:
+        options["stop"] = [stop] if isinstance(stop, str) else list(stop)
+    return options
+
+
+def coalesce_stats() -> Dict[str, Any]:
+    """
+    Return in-flight coalescing counters for the sync and async paths.
+    
+    Returns:
+        Dict with "enabled" and per-path leaders/followers/in_flight counts
+    """
+    return {
+        "enabled": COALESCE,
+        "sync": _inflight.stats(),
+        "async": _inflight_async.stats()
+    }
+
+
+def _request_timeout() -> Any:
+    """httpx timeouts for the next call, capped by the workflow deadline."""
+    from app.http_pool import request_timeout
+    
+    return request_timeout(call_timeout())
+
+
+def _request_tokens(messages: list, max_tokens: int) -> int:
+    """
+    Token reservation for a request: prompt size + max_tokens.
+    
+    Raises:
+        ValueError: If the request cannot fit the model context window
+            (ARG_LLM_CONTEXT_TOKENS), so it fails before reaching the API
+    """
+    prompt_tokens = count_message_tokens(messages)
+    if CONTEXT_TOKENS and prompt_tokens + max_tokens > CONTEXT_TOKENS:
+        raise ValueError(
+            f"Request too large: {prompt_tokens} prompt + {max_tokens} max_tokens "
+            f"exceeds the {CONTEXT_TOKENS}-token context window"
+        )
+    return prompt_tokens + max_tokens
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by a completion (None if usage is missing)."""
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of text (tiktoken when available, else a heuristic).
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Estimated token count
+    """
+    return count_tokens(text)
+
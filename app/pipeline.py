@@ -0,0 +1,263 @@
+"""
+Staged Pipeline Executor
+
+Runs a batch of workflows as a pipeline: each agent stage has its own worker
+pool and token budget, and stages are connected by bounded queues. While one
+query is in A2, the next can already be in A1, and the long-output stages
+(A3/A4) get more workers than the short ones.
+"""
+
+import os
+import queue
+import time
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.agents import a1_sampling, a2_wetlab, a3_bioinfo, a4_analysis
+from app.cache import bypass_cache
+from app.ratelimit import TokenBucket
+from app.retry import DEFAULT_WORKFLOW_DEADLINE_S, workflow_deadline
+from app.graph import (
+    STAGES, NODE_FUNCTIONS, save_checkpoint, _initial_state, _print_footer
+)
+
+
+# Defaults (override via environment)
+DEFAULT_TOTAL_WORKERS = int(os.getenv("ARG_PIPELINE_WORKERS", "8"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("ARG_PIPELINE_QUEUE_SIZE", "4"))
+
+# Upper bound on output tokens per stage (worker allocation and budget cost)
+STAGE_MAX_TOKENS = {
+    "a1_sampling": a1_sampling.MAX_TOKENS,
+    "a2_wetlab": a2_wetlab.MAX_TOKENS,
+    "a3_bioinfo": a3_bioinfo.MAX_TOKENS,
+    "a4_analysis": a4_analysis.MAX_TOKENS,
+}
+
+# Queue sentinel telling a worker to exit
+_DONE = object()
+
+
+class StageConfig:
+    """Worker count, input queue size and token budget for one stage."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        tokens_per_minute: Optional[int] = None
+    ):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.tokens_per_minute = tokens_per_minute
+
+    def __repr__(self) -> str:
+        return (
+            f"StageConfig(workers={self.workers}, queue_size={self.queue_size}, "
+            f"tokens_per_minute={self.tokens_per_minute})"
+        )
+
+
+def default_stage_configs(
+    total_workers: int = DEFAULT_TOTAL_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE
+) -> Dict[str, StageConfig]:
+    """
+    Split a worker budget across stages in proportion to their output size.
+
+    Stages that generate more tokens take longer per item, so they get more
+    workers to keep throughput balanced (largest-remainder rounding, at least
+    one worker per stage).
+
+    Args:
+        total_workers: Total workers across all stages
+        queue_size: Input queue size for every stage
+
+    Returns:
+        Dict of stage name -> StageConfig
+    """
+    total_workers = max(total_workers, len(STAGES))
+    total_tokens = sum(STAGE_MAX_TOKENS[stage] for stage in STAGES)
+    shares = {stage: total_workers * STAGE_MAX_TOKENS[stage] / total_tokens for stage in STAGES}
+    workers = {stage: max(1, int(share)) for stage, share in shares.items()}
+
+    by_remainder = sorted(STAGES, key=lambda stage: shares[stage] - int(shares[stage]), reverse=True)
+    for stage in by_remainder:
+        if sum(workers.values()) >= total_workers:
+            break
+        workers[stage] += 1
+
+    return {stage: StageConfig(workers[stage], queue_size) for stage in STAGES}
+
+
+class _StageStats:
+    """Per-stage counters."""
+
+    def __init__(self):
+        self.processed = 0
+        self.busy_s = 0.0
+        self.budget_wait_s = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy: float, budget_wait: float, depth: int) -> None:
+        with self._lock:
+            self.processed += 1
+            self.busy_s += busy
+            self.budget_wait_s += budget_wait
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+
+class PipelineExecutor:
+    """
+    Stage-parallel executor for batches of workflows.
+
+    Each stage runs the same node function the LangGraph workflow uses, so
+    outputs, validation and error/skip behaviour are identical to run_workflow.
+    Every item gets its own time budget (deadline_s, default
+    ARG_WORKFLOW_DEADLINE_S), counted from when its first stage picks it up.
+    """
+
+    def __init__(
+        self,
+        stage_configs: Optional[Dict[str, StageConfig]] = None,
+        use_cache: bool = True,
+        deadline_s: Optional[float] = None
+    ):
+        self.stage_configs = stage_configs or default_stage_configs()
+        missing = [stage for stage in STAGES if stage not in self.stage_configs]
+        if missing:
+            raise ValueError(f"Missing stage configs: {missing}")
+        self.use_cache = use_cache
+        # Per-item budget, started when the item's first stage picks it up
+        self.deadline_s = DEFAULT_WORKFLOW_DEADLINE_S if deadline_s is None else deadline_s
+        self._stats = {stage: _StageStats() for stage in STAGES}
+        self._elapsed = 0.0
+
+    def run(
+        self,
+        items: Sequence[Dict[str, Any]],
+        on_complete: Optional[Callable[[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]], None]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Push items through the pipeline and wait for all of them.
+
+        Args:
+            items: Dicts with "query", plus optional "run_id" (checkpoint after
+                every stage), "state" and "stage" (start a resumed run at that
+                stage with the given state)
+            on_complete: Optional callback(item, final_state, error) called from
+                a worker thread as each item leaves the last stage
+
+        Returns:
+            Final states in input order (None for items that raised)
+        """
+        started = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.stage_configs[stage].queue_size) for stage in STAGES]
+        budgets = {
+            stage: TokenBucket(config.tokens_per_minute)
+            for stage, config in self.stage_configs.items()
+            if config.tokens_per_minute
+        }
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        # Absolute time.monotonic() deadline per item (shared by its stages)
+        deadlines: List[Optional[float]] = [None] * len(items)
+        # Live workers per stage; the last one to exit closes the next stage
+        alive = {position: self.stage_configs[stage].workers for position, stage in enumerate(STAGES)}
+        alive_lock = threading.Lock()
+
+        def finish(index: int, state: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+            results[index] = state
+            item = items[index]
+            if state is not None:
+                save_checkpoint(item.get("run_id"), state, final=True)
+                _print_footer(state)
+            if on_complete is not None:
+                try:
+                    on_complete(item, state, error)
+                except Exception as e:
+                    # Never let a callback kill a worker (the pipeline would stall)
+                    print(f"⚠ Pipeline on_complete callback failed: {e}")
+
+        def worker(position: int) -> None:
+            stage = STAGES[position]
+            node = NODE_FUNCTIONS[(stage, False)]
+            budget = budgets.get(stage)
+            inbox = queues[position]
+            with bypass_cache(not self.use_cache):
+                while True:
+                    entry = inbox.get()
+                    if entry is _DONE:
+                        break
+                    index, state = entry
+                    if deadlines[index] is None and self.deadline_s:
+                        deadlines[index] = time.monotonic() + self.deadline_s
+                    depth = inbox.qsize()
+                    waited = budget.reserve(STAGE_MAX_TOKENS[stage]) if budget else 0.0
+                    time.sleep(waited)
+                    begin = time.perf_counter()
+                    try:
+                        deadline = deadlines[index]
+                        with workflow_deadline(until=deadline) if deadline else nullcontext():
+                            state = node(state)
+                        save_checkpoint(items[index].get("run_id"), state)
+                    except Exception as e:
+                        finish(index, None, str(e))
+                        continue
+                    finally:
+                        self._stats[stage].record(time.perf_counter() - begin, waited, depth)
+
+                    if position + 1 < len(STAGES):
+                        queues[position + 1].put((index, state))
+                    else:
+                        finish(index, state, None)
+
+            with alive_lock:
+                alive[position] -= 1
+                last = alive[position] == 0
+            if last and position + 1 < len(STAGES):
+                for _ in range(self.stage_configs[STAGES[position + 1]].workers):
+                    queues[position + 1].put(_DONE)
+
+        threads = []
+        for position, stage in enumerate(STAGES):
+            for n in range(self.stage_configs[stage].workers):
+                thread = threading.Thread(
+                    target=worker, args=(position,), name=f"pipeline-{stage}-{n}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        # Feed items (blocks while the first queue is full - backpressure)
+        for index, item in enumerate(items):
+            state = item.get("state") or _initial_state(item["query"])
+            position = STAGES.index(item["stage"]) if item.get("stage") else 0
+            queues[position].put((index, state))
+        for _ in range(self.stage_configs[STAGES[0]].workers):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+
+        self._elapsed += time.perf_counter() - started
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-stage throughput, utilisation and budget wait counters."""
+        stages = {}
+        for stage in STAGES:
+            config = self.stage_configs[stage]
+            stats = self._stats[stage]
+            capacity = config.workers * self._elapsed
+            stages[stage] = {
+                "workers": config.workers,
+                "queue_size": config.queue_size,
+                "tokens_per_minute": config.tokens_per_minute,
+                "processed": stats.processed,
+                "busy_s": round(stats.busy_s, 3),
+                "utilization": round(stats.busy_s / capacity, 3) if capacity else 0.0,
+                "budget_wait_s": round(stats.budget_wait_s, 3),
+                "max_queue_depth": stats.max_queue_depth
+            }
+        return {"elapsed_s": round(self._elapsed, 3), "stages": stages}
@@ -1,2 +1,2 @@
-"""Prompt storage modules"""
-
+"""Prompt storage modules"""
+
@@ -0,0 +1,331 @@
+"""
+LLM Rate Limiting
+
+Process-wide limiter shared by every OpenAI call (CLI, batch and API runs):
+- Token buckets for requests/minute and tokens/minute
+- AIMD concurrency: +1/limit per success, halve on a 429 and pause new
+  requests for the provider's Retry-After
+"""
+
+import os
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+
+# Defaults (override via environment; 0 disables a bucket)
+DEFAULT_RPM = float(os.getenv("ARG_LLM_RPM", "0"))
+DEFAULT_TPM = float(os.getenv("ARG_LLM_TPM", "0"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("ARG_LLM_MAX_CONCURRENCY", "16"))
+DEFAULT_MIN_CONCURRENCY = int(os.getenv("ARG_LLM_MIN_CONCURRENCY", "1"))
+
+# Pause applied on a 429 without a Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+# Polling interval for async waiters
+_ASYNC_POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute.
+
+    reserve() deducts immediately and returns how long the caller must wait,
+    letting the balance go negative, so waiting works the same from threads
+    and coroutines and callers are served in reservation order.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount tokens from the bucket.
+
+        Args:
+            amount: Tokens to take (capped at the bucket capacity)
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens (e.g. when the real usage was below the estimate)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def available(self) -> float:
+        """Current balance (negative while reservations are waiting)."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class Lease:
+    """A granted request slot; call settle() once actual token usage is known."""
+
+    def __init__(self, limiter: "RateLimiter", tokens: float):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.waited_s = 0.0
+        self.admitted_at = time.monotonic()
+
+    def settle(self, actual_tokens: Optional[float]) -> None:
+        """Refund the difference between the reserved estimate and actual usage."""
+        if actual_tokens is None or self.limiter.tpm_bucket is None:
+            return
+        unused = self.tokens - actual_tokens
+        if unused > 0:
+            self.limiter.tpm_bucket.refund(unused)
+            self.tokens = actual_tokens
+
+
+class RateLimiter:
+    """
+    Requests/minute + tokens/minute buckets with an AIMD concurrency limit.
+
+    Use slot() (threads) or slot_async() (coroutines) around each API call;
+    exceptions carrying status_code 429 shrink the concurrency limit and pause
+    new requests for the Retry-After interval.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_RPM,
+        tokens_per_minute: float = DEFAULT_TPM,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = DEFAULT_MIN_CONCURRENCY
+    ):
+        self.rpm_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tpm_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        self._requests = 0
+        self._rate_limited = 0
+        self._wait_s = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self, tokens: float) -> Iterator[Lease]:
+        """
+        Block until a request may be sent, then hold a concurrency slot.
+
+        The bucket reservation is waited out before a slot is taken, so
+        requests waiting for rate budget do not occupy concurrency slots.
+
+        Args:
+            tokens: Estimated tokens for the request (prompt + max_tokens)
+
+        Yields:
+            Lease for the request
+        """
+        started = time.monotonic()
+        try:
+            time.sleep(self._reserve(tokens))
+            with self._cond:
+                while True:
+                    delay = self._admission_delay()
+                    if delay <= 0:
+                        self._in_flight += 1
+                        break
+                    self._cond.wait(timeout=delay)
+        except BaseException:
+            self._unreserve(tokens)
+            raise
+
+        lease = Lease(self, tokens)
+        try:
+            lease.waited_s = self._record_wait(started)
+            lease.admitted_at = time.monotonic()
+            yield lease
+        except BaseException as e:
+            self._release(lease, e)
+            raise
+        else:
+            self._release(lease, None)
+
+    @asynccontextmanager
+    async def slot_async(self, tokens: float) -> AsyncIterator[Lease]:
+        """Async version of slot() (waits without blocking the event loop)."""
+        started = time.monotonic()
+        try:
+            await asyncio.sleep(self._reserve(tokens))
+            while True:
+                with self._cond:
+                    delay = self._admission_delay()
+                    if delay <= 0:
+                        self._in_flight += 1
+                        break
+                await asyncio.sleep(min(delay, _ASYNC_POLL_SECONDS))
+        except BaseException:
+            self._unreserve(tokens)
+            raise
+
+        lease = Lease(self, tokens)
+        try:
+            lease.waited_s = self._record_wait(started)
+            lease.admitted_at = time.monotonic()
+            yield lease
+        except BaseException as e:
+            self._release(lease, e)
+            raise
+        else:
+            self._release(lease, None)
+
+    def on_rate_limited(
+        self,
+        retry_after: Optional[float] = None,
+        admitted_at: Optional[float] = None
+    ) -> None:
+        """
+        Register a 429: halve the concurrency limit and pause new requests.
+
+        The limit is halved at most once per window: 429s from requests that
+        were admitted before the last decrease only extend the pause.
+
+        Args:
+            retry_after: Seconds requested by the provider (Retry-After)
+            admitted_at: time.monotonic() when the failed request was admitted
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._rate_limited += 1
+            pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+            self._paused_until = max(self._paused_until, now + pause)
+            if admitted_at is None or admitted_at >= self._last_decrease:
+                self._limit = max(float(self.min_concurrency), self._limit / 2)
+                self._last_decrease = now
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limiter state and counters."""
+        with self._cond:
+            return {
+                "concurrency_limit": int(self._limit),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 3),
+                "requests": self._requests,
+                "rate_limited": self._rate_limited,
+                "total_wait_s": round(self._wait_s, 3),
+                "rpm_available": round(self.rpm_bucket.available(), 1) if self.rpm_bucket else None,
+                "tpm_available": round(self.tpm_bucket.available(), 1) if self.tpm_bucket else None
+            }
+
+    def _admission_delay(self) -> float:
+        """Seconds until a new request may start (caller holds the lock)."""
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+        if self._in_flight >= int(self._limit):
+            return _ASYNC_POLL_SECONDS * 10  # Woken early by _release
+        return 0.0
+
+    def _reserve(self, tokens: float) -> float:
+        """Reserve one request and tokens; return the longer of the two waits."""
+        delay = 0.0
+        if self.rpm_bucket is not None:
+            delay = max(delay, self.rpm_bucket.reserve(1))
+        if self.tpm_bucket is not None:
+            delay = max(delay, self.tpm_bucket.reserve(tokens))
+        return delay
+
+    def _unreserve(self, tokens: float) -> None:
+        """Return a reservation whose request was never sent (e.g. cancelled while waiting)."""
+        if self.rpm_bucket is not None:
+            self.rpm_bucket.refund(1)
+        if self.tpm_bucket is not None:
+            self.tpm_bucket.refund(min(tokens, self.tpm_bucket.capacity))
+
+    def _record_wait(self, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._cond:
+            self._requests += 1
+            self._wait_s += waited
+        return waited
+
+    def _release(self, lease: Lease, error: Optional[BaseException]) -> None:
+        """Free the slot and apply the AIMD update for the outcome."""
+        if error is not None and getattr(error, "status_code", None) == 429:
+            self.on_rate_limited(retry_after_seconds(error), admitted_at=lease.admitted_at)
+        with self._cond:
+            self._in_flight -= 1
+            if error is None and self._limit < self.max_concurrency:
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Read Retry-After (or retry-after-ms) from an API error's response headers.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Seconds to wait, or None if the header is absent/unparseable
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None  # HTTP-date form is not used by the OpenAI API
+    return None
+
+
+# Process-wide limiter instance (created on first use)
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter (configured from ARG_LLM_* env vars)."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    """Replace the process-wide rate limiter (e.g. for tests)."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
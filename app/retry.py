@@ -0,0 +1,168 @@
+"""
+LLM Retry and Deadlines
+
+Retry policy for OpenAI calls (exponential backoff with full jitter, chosen
+by error type) and a per-workflow deadline that bounds every call's timeout.
+"""
+
+import os
+import time
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.ratelimit import retry_after_seconds
+
+
+# Defaults (override via environment)
+DEFAULT_MAX_RETRIES = int(os.getenv("ARG_LLM_MAX_RETRIES", "4"))
+DEFAULT_BACKOFF_BASE_S = float(os.getenv("ARG_LLM_BACKOFF_BASE_S", "1"))
+DEFAULT_BACKOFF_MAX_S = float(os.getenv("ARG_LLM_BACKOFF_MAX_S", "30"))
+DEFAULT_CALL_TIMEOUT_S = float(os.getenv("ARG_LLM_TIMEOUT_S", "300"))
+DEFAULT_WORKFLOW_DEADLINE_S = float(os.getenv("ARG_WORKFLOW_DEADLINE_S", "0"))
+
+# Error classes (see classify_error)
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+SERVER = "server"
+FATAL = "fatal"
+
+RETRYABLE = (RATE_LIMIT, TIMEOUT, CONNECTION, SERVER)
+
+# Absolute time.monotonic() deadline for the current workflow (None = no deadline)
+_deadline: ContextVar[Optional[float]] = ContextVar("arg_workflow_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the workflow deadline leaves no time for another LLM call."""
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classify an LLM call failure.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        One of RATE_LIMIT, TIMEOUT, CONNECTION, SERVER (retryable) or FATAL
+    """
+    if isinstance(error, DeadlineExceeded):
+        return FATAL
+    import openai  # Deferred: only needed once a call has failed
+
+    if isinstance(error, openai.APITimeoutError):
+        return TIMEOUT
+    if isinstance(error, openai.APIConnectionError):
+        return CONNECTION
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return RATE_LIMIT
+    if status in (408, 409) or (status is not None and status >= 500):
+        return SERVER
+    return FATAL
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by the workflow deadline."""
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BACKOFF_BASE_S,
+        max_delay: float = DEFAULT_BACKOFF_MAX_S
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        Decide whether to retry after a failed attempt.
+
+        Args:
+            error: Exception from the attempt
+            attempt: 1-based number of the attempt that failed
+
+        Returns:
+            Seconds to sleep before retrying, or None to give up
+        """
+        if attempt > self.max_retries or classify_error(error) not in RETRYABLE:
+            return None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+_policy = RetryPolicy()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Return the process-wide retry policy."""
+    return _policy
+
+
+def set_retry_policy(policy: RetryPolicy) -> None:
+    """Replace the process-wide retry policy (e.g. for tests)."""
+    global _policy
+    _policy = policy
+
+
+@contextmanager
+def workflow_deadline(seconds: Optional[float] = None, until: Optional[float] = None) -> Iterator[None]:
+    """
+    Bound every LLM call made inside this block by a shared time budget.
+
+    Nested deadlines never extend an outer one.
+
+    Args:
+        seconds: Budget in seconds (default ARG_WORKFLOW_DEADLINE_S; 0/None = none)
+        until: Absolute time.monotonic() deadline, used instead of seconds
+            (lets a run's stages share one budget across threads)
+    """
+    if until is not None:
+        deadline = until
+    else:
+        if seconds is None:
+            seconds = DEFAULT_WORKFLOW_DEADLINE_S
+        deadline = time.monotonic() + seconds if seconds else None
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current workflow deadline (None if unbounded)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout() -> float:
+    """
+    Timeout for the next LLM call: ARG_LLM_TIMEOUT_S capped by the deadline.
+
+    Raises:
+        DeadlineExceeded: If the workflow deadline has passed
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return DEFAULT_CALL_TIMEOUT_S
+    if remaining <= 0:
+        raise DeadlineExceeded("Workflow deadline exceeded before LLM call")
+    return min(DEFAULT_CALL_TIMEOUT_S, remaining)
@@ -0,0 +1,445 @@
+"""
+Workflow Run Store
+
+Durable storage for workflow runs. Run status, query, timestamps and per-agent
+metadata live in indexed columns; agent output fields are stored as separate
+compressed blobs and only loaded when requested. Checkpoints rewrite only the
+agents whose output changed (tracked by a content hash per agent).
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Default location and retention (override via environment)
+DEFAULT_STORE_PATH = os.getenv("ARG_RUN_STORE_PATH", "./runs/run_store.sqlite")
+DEFAULT_TTL_HOURS = float(os.getenv("ARG_RUN_STORE_TTL_HOURS", "720"))
+DEFAULT_MAX_RUNS = int(os.getenv("ARG_RUN_STORE_MAX_RUNS", "1000"))
+
+AGENTS = ("a1", "a2", "a3", "a4")
+
+# Agent output fields kept in run_agents columns (every other field is a blob)
+COLUMN_FIELDS = ("agent", "status")
+
+# Run statuses that are still in progress (never evicted)
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def hash_query(query: str) -> str:
+    """Return the SHA-256 hex digest of a query string."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class RunStore(ABC):
+    """Interface for workflow run storage backends."""
+
+    @abstractmethod
+    def create_run(self, run_id: str, query: str, status: str = "running", **fields: Any) -> None:
+        """Register a new run."""
+
+    @abstractmethod
+    def update_run(self, run_id: str, **fields: Any) -> None:
+        """Update run-level fields (status, error, output_path, stages, ...)."""
+
+    @abstractmethod
+    def save_state(self, run_id: str, state: Dict[str, Any]) -> None:
+        """Persist a workflow state: run fields, agent metadata and full agent outputs."""
+
+    @abstractmethod
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Return run-level fields and per-agent metadata (no output blobs)."""
+
+    @abstractmethod
+    def get_agent_output(self, run_id: str, agent: str) -> Optional[Dict[str, Any]]:
+        """Return one agent's full output, including blobs."""
+
+    @abstractmethod
+    def get_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Reconstruct the full workflow state for a run."""
+
+    @abstractmethod
+    def list_runs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recent runs (optionally filtered by status)."""
+
+    @abstractmethod
+    def find_active_run(self, query: str, max_age_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the newest queued/running run of an identical query (updated within max_age_s)."""
+
+    @abstractmethod
+    def evict(self) -> int:
+        """Drop expired/excess finished runs. Returns the number removed."""
+
+
+class SQLiteRunStore(RunStore):
+    """
+    SQLite (WAL) run store, safe to share between threads and uvicorn workers.
+
+    Eviction drops finished runs older than ttl_seconds, then the oldest
+    finished runs beyond max_runs.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STORE_PATH,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_HOURS * 3600,
+        max_runs: Optional[int] = DEFAULT_MAX_RUNS
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    query_hash TEXT NOT NULL,
+                    error TEXT,
+                    output_path TEXT,
+                    stages TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    started_at REAL,
+                    completed_at REAL,
+                    queue_wait_s REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status);
+                CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at);
+                CREATE INDEX IF NOT EXISTS idx_runs_query_hash ON runs(query_hash);
+
+                CREATE TABLE IF NOT EXISTS run_agents (
+                    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+                    agent TEXT NOT NULL,
+                    agent_name TEXT,
+                    status TEXT,
+                    has_structured_output INTEGER NOT NULL DEFAULT 0,
+                    guardrail_violations INTEGER NOT NULL DEFAULT 0,
+                    validation TEXT,
+                    metrics TEXT,
+                    usage TEXT,
+                    output_hash TEXT,
+                    PRIMARY KEY (run_id, agent)
+                );
+                CREATE INDEX IF NOT EXISTS idx_run_agents_status ON run_agents(agent, status);
+
+                CREATE TABLE IF NOT EXISTS run_outputs (
+                    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+                    agent TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (run_id, agent, field)
+                );
+                """
+            )
+            self._migrate()
+            self._conn.commit()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a store file was created."""
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        for column in ("started_at REAL", "queue_wait_s REAL"):
+            if column.split()[0] not in existing:
+                self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column}")
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(run_agents)")}
+        for column in ("usage TEXT", "output_hash TEXT"):
+            if column.split()[0] not in existing:
+                self._conn.execute(f"ALTER TABLE run_agents ADD COLUMN {column}")
+
+    # Run-level fields ------------------------------------------------------
+
+    def create_run(self, run_id: str, query: str, status: str = "running", **fields: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs"
+                " (run_id, status, query, query_hash, stages, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, status, query, hash_query(query),
+                 json.dumps(fields.pop("stages", None)), now, now)
+            )
+            self._update(run_id, fields, now)
+            self._conn.commit()
+
+    def update_run(self, run_id: str, **fields: Any) -> None:
+        with self._lock:
+            self._update(run_id, fields, time.time())
+            self._conn.commit()
+
+    def _update(self, run_id: str, fields: Dict[str, Any], now: float) -> None:
+        """Apply run-level field updates (caller holds the lock)."""
+        columns = {"updated_at": now}
+        for key in ("status", "error", "output_path", "started_at", "completed_at", "queue_wait_s"):
+            if key in fields:
+                columns[key] = fields[key]
+        if "stages" in fields:
+            columns["stages"] = json.dumps(fields["stages"])
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        self._conn.execute(
+            f"UPDATE runs SET {assignments} WHERE run_id = ?",
+            list(columns.values()) + [run_id]
+        )
+
+    # Full state ------------------------------------------------------------
+
+    def save_state(self, run_id: str, state: Dict[str, Any]) -> None:
+        now = time.time()
+        validation_reports = state.get("validation_reports", {})
+        metrics = state.get("metrics", {})
+        usage = state.get("usage", {})
+
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if not exists:
+                self._conn.execute(
+                    "INSERT INTO runs (run_id, status, query, query_hash, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, "running", state.get("user_query", ""),
+                     hash_query(state.get("user_query", "")), now, now)
+                )
+
+            fields = {"status": state.get("status", "unknown"), "error": state.get("error")}
+            for key in ("output_path", "stages", "completed_at"):
+                if key in state:
+                    fields[key] = state[key]
+            self._update(run_id, fields, now)
+
+            saved = dict(self._conn.execute(
+                "SELECT agent, output_hash FROM run_agents WHERE run_id = ?", (run_id,)
+            ).fetchall())
+            for agent in AGENTS:
+                output = state.get(f"{agent}_output")
+                if not output:
+                    if agent in saved:
+                        # Stage is being re-run - drop stale rows
+                        self._delete_agent(run_id, agent)
+                    continue
+                records = (validation_reports.get(agent), metrics.get(agent), usage.get(agent))
+                output_hash = _hash_output(output, records)
+                if saved.get(agent) == output_hash:
+                    continue
+                self._delete_agent(run_id, agent)
+                self._conn.execute(
+                    "INSERT INTO run_agents"
+                    " (run_id, agent, agent_name, status, has_structured_output,"
+                    "  guardrail_violations, validation, metrics, usage, output_hash)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        agent,
+                        output.get("agent"),
+                        output.get("status"),
+                        int(bool(output.get("structured_output"))),
+                        len((output.get("guardrail_report") or {}).get("violations", [])),
+                        *(json.dumps(record) for record in records),
+                        output_hash
+                    )
+                )
+                self._conn.executemany(
+                    "INSERT INTO run_outputs (run_id, agent, field, data) VALUES (?, ?, ?, ?)",
+                    [
+                        (run_id, agent, field, _pack(value))
+                        for field, value in output.items()
+                        if field not in COLUMN_FIELDS and value is not None
+                    ]
+                )
+
+            self._conn.commit()
+
+    def _delete_agent(self, run_id: str, agent: str) -> None:
+        """Drop an agent's rows (caller holds the lock)."""
+        self._conn.execute("DELETE FROM run_agents WHERE run_id = ? AND agent = ?", (run_id, agent))
+        self._conn.execute("DELETE FROM run_outputs WHERE run_id = ? AND agent = ?", (run_id, agent))
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            agent_rows = self._conn.execute(
+                "SELECT * FROM run_agents WHERE run_id = ? ORDER BY agent", (run_id,)
+            ).fetchall()
+
+        run = _run_from_row(row)
+        run["agents"] = {
+            agent_row["agent"]: {
+                "agent": agent_row["agent_name"],
+                "status": agent_row["status"],
+                "has_structured_output": bool(agent_row["has_structured_output"]),
+                "guardrail_violations": agent_row["guardrail_violations"],
+                "validation": json.loads(agent_row["validation"] or "null"),
+                "metrics": json.loads(agent_row["metrics"] or "null"),
+                "usage": json.loads(agent_row["usage"] or "null")
+            }
+            for agent_row in agent_rows
+        }
+        return run
+
+    def get_agent_output(self, run_id: str, agent: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            agent_row = self._conn.execute(
+                "SELECT * FROM run_agents WHERE run_id = ? AND agent = ?", (run_id, agent)
+            ).fetchone()
+            if agent_row is None:
+                return None
+            blob_rows = self._conn.execute(
+                "SELECT field, data FROM run_outputs WHERE run_id = ? AND agent = ?",
+                (run_id, agent)
+            ).fetchall()
+
+        output = {"agent": agent_row["agent_name"], "status": agent_row["status"]}
+        for blob_row in blob_rows:
+            output[blob_row["field"]] = _unpack(blob_row["data"])
+        output["validation"] = json.loads(agent_row["validation"] or "null")
+        output["metrics"] = json.loads(agent_row["metrics"] or "null")
+        output["usage"] = json.loads(agent_row["usage"] or "null")
+        return output
+
+    def get_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        run = self.get_run(run_id)
+        if run is None:
+            return None
+
+        state = {
+            "user_query": run["query"],
+            "status": run["status"],
+            "error": run["error"] or "",
+            "validation_reports": {},
+            "metrics": {},
+            "usage": {}
+        }
+        for agent in AGENTS:
+            output = self.get_agent_output(run_id, agent) or {}
+            validation = output.pop("validation", None)
+            metrics = output.pop("metrics", None)
+            usage = output.pop("usage", None)
+            if validation is not None:
+                state["validation_reports"][agent] = validation
+            if metrics is not None:
+                state["metrics"][agent] = metrics
+            if usage is not None:
+                state["usage"][agent] = usage
+            state[f"{agent}_output"] = output
+        return state
+
+    def list_runs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute(
+                    "SELECT * FROM runs ORDER BY created_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM runs WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+                    (status, limit)
+                ).fetchall()
+        return [_run_from_row(row) for row in rows]
+
+    def find_active_run(self, query: str, max_age_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        active = ", ".join("?" for _ in ACTIVE_STATUSES)
+        updated_after = time.time() - max_age_s if max_age_s is not None else 0.0
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM runs WHERE query_hash = ? AND status IN ({active}) AND updated_at >= ?"
+                " ORDER BY created_at DESC",
+                [hash_query(query)] + list(ACTIVE_STATUSES) + [updated_after]
+            ).fetchall()
+        for row in rows:
+            if row["query"] == query:
+                return _run_from_row(row)
+        return None
+
+    def evict(self) -> int:
+        active = ", ".join("?" for _ in ACTIVE_STATUSES)
+        removed = 0
+        with self._lock:
+            if self.ttl_seconds is not None:
+                cursor = self._conn.execute(
+                    f"DELETE FROM runs WHERE status NOT IN ({active}) AND created_at < ?",
+                    list(ACTIVE_STATUSES) + [time.time() - self.ttl_seconds]
+                )
+                removed += cursor.rowcount
+            if self.max_runs is not None:
+                cursor = self._conn.execute(
+                    f"DELETE FROM runs WHERE status NOT IN ({active}) AND run_id NOT IN"
+                    " (SELECT run_id FROM runs ORDER BY created_at DESC LIMIT ?)",
+                    list(ACTIVE_STATUSES) + [self.max_runs]
+                )
+                removed += cursor.rowcount
+            self._conn.commit()
+        return removed
+
+
+def _pack(value: Any) -> bytes:
+    """Serialize and compress an output field."""
+    return zlib.compress(json.dumps(value).encode("utf-8"))
+
+
+def _unpack(data: bytes) -> Any:
+    """Inverse of _pack."""
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _hash_output(output: Dict[str, Any], records: Any) -> str:
+    """Content hash of an agent output and its validation/metrics/usage records."""
+    canonical = json.dumps([output, records], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _run_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a runs row to a dict."""
+    return {
+        "run_id": row["run_id"],
+        "status": row["status"],
+        "query": row["query"],
+        "error": row["error"],
+        "output_path": row["output_path"],
+        "stages": json.loads(row["stages"] or "null"),
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "started_at": row["started_at"],
+        "completed_at": row["completed_at"],
+        "queue_wait_s": row["queue_wait_s"]
+    }
+
+
+# Process-wide store instance (created on first use)
+_store: Optional[RunStore] = None
+_store_lock = threading.Lock()
+
+
+def get_run_store() -> RunStore:
+    """Return the process-wide run store (SQLite at ARG_RUN_STORE_PATH)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteRunStore()
+    return _store
+
+
+def set_run_store(store: RunStore) -> None:
+    """Replace the process-wide run store (e.g. for tests)."""
+    global _store
+    with _store_lock:
+        _store = store
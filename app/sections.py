@@ -0,0 +1,234 @@
+"""
+Parallel Section Generation
+
+Fans one agent request out into concurrent sub-requests, one per output
+section. Each sub-request reuses the agent's system prompt and full user
+prompt (so the shared prefix stays identical for provider-side prompt
+caching) plus a short instruction naming the section, and gets its own
+max_tokens budget. Output tokens are generated serially within a
+completion, so the stage takes as long as its longest section instead of
+the sum of all of them.
+
+Streamed deltas reach the caller's token listener in section order (see
+OrderedDeltas), so the stream reads like the merged output.
+"""
+
+import re
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.llm import active_token_listener, call_llm, call_llm_async, token_listener
+
+
+# Opening fence of a top-level block: ```lang (a word, as the agents emit)
+_OPENING_FENCE = re.compile(r"^```(\w+)\s*$")
+
+
+class SectionRequest(NamedTuple):
+    """One sub-request: the appended instruction and its output budget."""
+    instruction: str
+    max_tokens: int
+
+
+class OrderedDeltas:
+    """
+    Forwards concurrent sections' deltas to one listener in section order.
+
+    The first unfinished section streams live; later sections are buffered
+    until every section before them has finished, then flushed. Sections
+    are separated by a blank line (as the agents merge them), and the
+    listener is never called concurrently.
+    """
+
+    SEPARATOR = "\n\n"
+
+    def __init__(self, names: Iterable[str], listener: Callable[[str], None]):
+        self.listener = listener
+        self._names = list(names)
+        self._buffers: Dict[str, List[str]] = {name: [] for name in self._names}
+        self._finished = set()
+        self._streamed = set()
+        self._current = 0
+        self._lock = threading.Lock()
+
+    def feed(self, name: str, delta: str) -> None:
+        """Forward (or buffer) one delta of a section."""
+        with self._lock:
+            if self._current < len(self._names) and self._names[self._current] == name:
+                self._forward(name, delta)
+            else:
+                self._buffers[name].append(delta)
+
+    def finish(self, name: str) -> None:
+        """Mark a section finished; flush the sections now at the front."""
+        with self._lock:
+            self._finished.add(name)
+            while self._current < len(self._names) and self._names[self._current] in self._finished:
+                self._current += 1
+                if self._current < len(self._names):
+                    front = self._names[self._current]
+                    for delta in self._buffers[front]:
+                        self._forward(front, delta)
+                    self._buffers[front] = []
+
+    def listener_for(self, name: str) -> Callable[[str], None]:
+        """Token listener for one section's sub-request."""
+        return lambda delta: self.feed(name, delta)
+
+    def _forward(self, name: str, delta: str) -> None:
+        if not delta:
+            return
+        if name not in self._streamed:
+            if self._streamed:
+                self.listener(self.SEPARATOR)
+            self._streamed.add(name)
+        self.listener(delta)
+
+
+def generate_sections(
+    system_prompt: str,
+    user_prompt: str,
+    requests: Dict[str, SectionRequest],
+    temperature: float
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Generate all sections concurrently (one thread per section).
+
+    Each thread runs in a copy of the caller's context, so call logs, cache
+    bypass and the workflow deadline still apply; the caller's token
+    listener receives the sections' deltas in section order.
+
+    Args:
+        system_prompt: Agent system prompt (shared by every sub-request)
+        user_prompt: Agent user prompt; each instruction is appended to it
+        requests: Section name -> SectionRequest
+        temperature: Sampling temperature
+
+    Returns:
+        (responses, timings) - response text and seconds per section
+
+    Raises:
+        Exception: The first failed sub-request's error (after all finish)
+    """
+    stream = _ordered_deltas(requests)
+
+    def generate(name: str, request: SectionRequest) -> Tuple[str, float]:
+        started = time.perf_counter()
+        with _section_listener(stream, name):
+            response = call_llm(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt + request.instruction,
+                temperature=temperature,
+                max_tokens=request.max_tokens
+            )
+        return response, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        futures = {
+            name: pool.submit(contextvars.copy_context().run, generate, name, request)
+            for name, request in requests.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+    return _split(results)
+
+
+async def generate_sections_async(
+    system_prompt: str,
+    user_prompt: str,
+    requests: Dict[str, SectionRequest],
+    temperature: float
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Async version of generate_sections (one task per section)."""
+    stream = _ordered_deltas(requests)
+
+    async def generate(name: str, request: SectionRequest) -> Tuple[str, float]:
+        started = time.perf_counter()
+        with _section_listener(stream, name):
+            response = await call_llm_async(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt + request.instruction,
+                temperature=temperature,
+                max_tokens=request.max_tokens
+            )
+        return response, time.perf_counter() - started
+
+    results = await asyncio.gather(*(generate(name, request) for name, request in requests.items()))
+    return _split(dict(zip(requests, results)))
+
+
+def _ordered_deltas(requests: Dict[str, SectionRequest]) -> Optional[OrderedDeltas]:
+    """OrderedDeltas for the caller's token listener (None when not streaming)."""
+    listener = active_token_listener()
+    return OrderedDeltas(requests, listener) if listener is not None else None
+
+
+@contextmanager
+def _section_listener(stream: Optional[OrderedDeltas], name: str) -> Iterator[None]:
+    """Route one section's deltas through stream; the section finishes on exit."""
+    if stream is None:
+        yield
+        return
+    try:
+        with token_listener(stream.listener_for(name)):
+            yield
+    finally:
+        stream.finish(name)
+
+
+def _split(results: Dict[str, Tuple[str, float]]) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Separate responses from timings (rounded to ms)."""
+    responses = {name: response for name, (response, _) in results.items()}
+    timings = {name: round(elapsed, 3) for name, (_, elapsed) in results.items()}
+    return responses, timings
+
+
+def code_blocks(text: str, include_open: bool = True) -> List[Tuple[str, str]]:
+    """
+    Top-level fenced code blocks in text, with nested fences kept inside.
+    
+    A fence line with an info string (```{r setup}, ```bash) inside a block
+    opens a nested fence and the next bare ``` closes it, so an Rmd block
+    keeps its chunks instead of ending at the first one.
+    
+    Args:
+        text: Markdown text (an LLM response)
+        include_open: Also return a block still open at the end of the text
+            (False for partial, still-streaming text)
+        
+    Returns:
+        (language, content) pairs in order; an open block runs to the end
+    """
+    blocks = []
+    language = None
+    depth = 0
+    lines: List[str] = []
+    for line in text.split("\n"):
+        fence = line.strip()
+        if language is None:
+            match = _OPENING_FENCE.match(fence)
+            if match:
+                language, depth, lines = match.group(1), 0, []
+            continue
+        if fence == "```":
+            if depth == 0:
+                blocks.append((language, "\n".join(lines)))
+                language = None
+                continue
+            depth -= 1
+        elif fence.startswith("```"):
+            depth += 1
+        lines.append(line)
+    if language is not None and include_open:
+        blocks.append((language, "\n".join(lines)))
+    return blocks
+
+
+def outer_code_block(text: str) -> str:
+    """Content of the first top-level fenced code block in text (else the stripped text)."""
+    blocks = code_blocks(text)
+    return blocks[0][1].strip() if blocks else text.strip()
@@ -0,0 +1,193 @@
+"""
+In-Flight Request Coalescing (Singleflight)
+
+While a call for a key is running, identical calls do not start their own:
+they wait for the first caller (the leader) and share its result or
+exception. Nothing is kept once the leader finishes, so this complements the
+response cache (which only helps after a response has been stored) and also
+applies when the cache is bypassed.
+
+Followers wait no longer than their own workflow deadline. A leader error
+is only shared when share_error says it does not depend on the leader (its
+deadline or retry budget); otherwise a follower runs the call itself.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.retry import DeadlineExceeded, remaining_time
+
+
+def _share_all(error: BaseException) -> bool:
+    return True
+
+
+def _follower_deadline() -> DeadlineExceeded:
+    return DeadlineExceeded("Workflow deadline exceeded while waiting for an identical in-flight call")
+
+
+class _Call:
+    """A leader's call that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls made from different threads.
+
+    Followers block until the leader returns (at most until their own
+    workflow deadline, then raise DeadlineExceeded). A leader exception is
+    raised in every follower if share_error(exception) is true; otherwise
+    each follower runs the call again (one becomes the new leader).
+
+    Args:
+        share_error: Whether a leader exception is also the followers'
+            outcome (default: every exception is shared)
+    """
+
+    def __init__(self, share_error: Optional[Callable[[BaseException], bool]] = None):
+        self.share_error = share_error or _share_all
+        self.leaders = 0
+        self.followers = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Request identity (e.g. the response cache key)
+            fn: Zero-argument function doing the work
+
+        Returns:
+            (result, shared) - shared is True for followers
+
+        Raises:
+            DeadlineExceeded: If a follower's deadline passes while waiting
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            if not call.done.wait(timeout=_wait_timeout()):
+                raise _follower_deadline()
+            if call.error is None:
+                return call.result, True
+            if self.share_error(call.error):
+                raise call.error
+            # The leader's failure is its own: run the call ourselves
+            with self._lock:
+                self.followers -= 1
+            return self.do(key, fn)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return leader/follower counters and calls currently in flight."""
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical coroutine calls on an event loop.
+
+    Followers await a shielded future, so a cancelled follower does not
+    cancel the leader. If the leader itself is cancelled, or fails with an
+    exception share_error rejects, the first waiting follower takes over and
+    runs the call. Followers wait at most until their own workflow deadline.
+    """
+
+    def __init__(self, share_error: Optional[Callable[[BaseException], bool]] = None):
+        self.share_error = share_error or _share_all
+        self.leaders = 0
+        self.followers = 0
+        # Keyed per event loop: futures cannot be awaited from another loop
+        self._calls: Dict[Tuple[int, str], "asyncio.Future"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Request identity (e.g. the response cache key)
+            fn: Zero-argument coroutine function doing the work
+
+        Returns:
+            (result, shared) - shared is True for followers
+
+        Raises:
+            DeadlineExceeded: If a follower's deadline passes while waiting
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+
+        future = self._calls.get(slot)
+        if future is not None:
+            self.followers += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=_wait_timeout()), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            except BaseException as e:
+                if not future.done():
+                    # Our own wait ended, not the leader's call
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise _follower_deadline() from None
+                    raise
+                if self.share_error(e):
+                    raise
+            # Leader was cancelled or failed on its own budget: run the call ourselves
+            self.followers -= 1
+            return await self.do(key, fn)
+
+        future = loop.create_future()
+        # Mark the outcome as retrieved (the leader re-raises it itself)
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[slot] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._calls.pop(slot, None)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return leader/follower counters and calls currently in flight."""
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
+
+
+def _wait_timeout() -> Optional[float]:
+    """How long a follower may wait: its remaining deadline (None = unbounded, never negative)."""
+    remaining = remaining_time()
+    return None if remaining is None else max(remaining, 0.0)
@@ -0,0 +1,149 @@
+"""
+Speculative Downstream Start
+
+A downstream agent only reads its upstream handoff (see app/handoff.py), and
+that section is complete before the upstream completion ends (A1's
+handoff_to_wetlab, A3's data_handoff.yaml). In speculative mode the graph
+watches the upstream token stream, starts the downstream agent on the partial
+output as soon as the handoff section has closed, and once the upstream node
+has finished either confirms the result (same handoff payload) or discards it
+and runs the stage normally.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.llm import call_log, token_listener
+
+
+# Start downstream agents from streamed handoff sections (ARG_SPECULATIVE_HANDOFF=1)
+SPECULATIVE_HANDOFF = os.getenv("ARG_SPECULATIVE_HANDOFF", "0").lower() in ("1", "true", "yes", "on")
+
+# A handoff section can only close on a closing brace (JSON) or fence (code block)
+CLOSING_CHARS = "}`"
+
+# (output, call records, generated text) of a speculative run
+SpeculativeResult = Tuple[Dict[str, Any], List[Dict[str, Any]], str]
+
+
+class HandoffWatcher:
+    """
+    Watches an upstream token stream for its handoff section to close.
+
+    Deltas are accumulated; detect runs on the text so far whenever a delta
+    could close a section, and on_ready is called once with the first
+    partial structured output detect returns.
+    """
+
+    def __init__(
+        self,
+        detect: Callable[[str], Optional[Dict[str, Any]]],
+        on_ready: Callable[[Dict[str, Any]], None]
+    ):
+        self.detect = detect
+        self.on_ready = on_ready
+        self.fired = False
+        self._parts: List[str] = []
+
+    def feed(self, delta: str) -> None:
+        """Add a delta; fire on_ready when the handoff section has closed."""
+        if self.fired:
+            return
+        self._parts.append(delta)
+        if not any(char in delta for char in CLOSING_CHARS):
+            return
+        partial = self.detect("".join(self._parts))
+        if partial is not None:
+            self.fired = True
+            self.on_ready(partial)
+
+
+class Speculation:
+    """
+    A downstream stage run started on a partial upstream output.
+
+    The run gets its own call log and token buffer, so nothing reaches the
+    upstream stage's metrics or token stream; a confirmed run hands both to
+    the downstream stage. Sync runs use a daemon thread (a discarded thread
+    finishes in the background), async runs a task (cancelled on discard).
+    """
+
+    def __init__(self, agent: str, upstream_output: Dict[str, Any]):
+        self.agent = agent
+        self.upstream_output = upstream_output
+        self.started = time.perf_counter()
+        self.claimed: Optional[float] = None
+        self._future: Optional[Future] = None
+        self._task: Optional["asyncio.Future"] = None
+
+    def start(self, run: Callable[[Dict[str, Any]], Dict[str, Any]]) -> "Speculation":
+        """Run the stage in a background thread (in a copy of this context)."""
+        future: Future = Future()
+        context = contextvars.copy_context()
+
+        def target() -> None:
+            try:
+                future.set_result(context.run(_capture, run, self.upstream_output))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._future = future
+        threading.Thread(target=target, name=f"speculative-{self.agent}", daemon=True).start()
+        return self
+
+    def start_async(self, run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> "Speculation":
+        """Run the stage as a task on the running event loop."""
+        self._task = asyncio.ensure_future(_capture_async(run, self.upstream_output))
+        # Mark the outcome as retrieved (a discarded run's error is not reported)
+        self._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self
+
+    def result(self) -> SpeculativeResult:
+        """Wait for a thread run; raises its exception."""
+        return self._future.result()
+
+    async def result_async(self) -> SpeculativeResult:
+        """Await a task run; raises its exception."""
+        return await self._task
+
+    def discard(self) -> None:
+        """Drop the run (cancels a task; a thread run's result is ignored)."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def claim(self) -> "Speculation":
+        """Mark the downstream node as reached (ends the lead time)."""
+        self.claimed = time.perf_counter()
+        return self
+
+    def report(self, outcome: str) -> Dict[str, Any]:
+        """Outcome ("confirmed"/"discarded") and how far ahead of its node the run started."""
+        end = self.claimed if self.claimed is not None else time.perf_counter()
+        return {"outcome": outcome, "lead_s": round(end - self.started, 3)}
+
+
+def _capture(
+    run: Callable[[Dict[str, Any]], Dict[str, Any]],
+    upstream_output: Dict[str, Any]
+) -> SpeculativeResult:
+    """Run a stage with its own call log and token buffer."""
+    deltas: List[str] = []
+    with call_log() as calls, token_listener(deltas.append):
+        output = run(upstream_output)
+    return output, calls, "".join(deltas)
+
+
+async def _capture_async(
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    upstream_output: Dict[str, Any]
+) -> SpeculativeResult:
+    """Async version of _capture."""
+    deltas: List[str] = []
+    with call_log() as calls, token_listener(deltas.append):
+        output = await run(upstream_output)
+    return output, calls, "".join(deltas)
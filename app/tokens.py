@@ -0,0 +1,228 @@
+"""
+Token Counting
+
+Pluggable token counter for rate-limit reservations and pre-flight context
+checks:
+- TiktokenCounter: exact counts from the local BPE vocabulary (needs the
+  optional `tiktoken` package and a cached/downloadable encoding)
+- HeuristicCounter: regex approximation used when tiktoken is unavailable
+
+Counts for the static agent prompts (app/prompts/*) are memoized on first
+use. A user prompt built from a template (one ###PLACEHOLDER### replaced by
+handoff JSON) reuses the memoized counts of the text around the placeholder,
+so only the injected payload is tokenized per call.
+"""
+
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+# Counter selection: auto (tiktoken if usable, else heuristic), tiktoken, heuristic
+DEFAULT_COUNTER = os.getenv("ARG_TOKEN_COUNTER", "auto")
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+FALLBACK_ENCODING = "o200k_base"
+
+# Per-message framing tokens in the chat format (role, separators) and reply priming
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Prompt modules whose TEXT is memoized (user prompts are also templates)
+STATIC_PROMPT_MODULES = (
+    "a1_sampling_system_prompt",
+    "a1_sampling_user_prompt",
+    "a2_wetlab_system_prompt",
+    "a2_wetlab_user_prompt",
+    "a3_bioinfo_system_prompt",
+    "a3_bioinfo_user_prompt",
+    "a4_analysis_system_prompt",
+    "a4_analysis_user_prompt",
+)
+
+PLACEHOLDER_PATTERN = re.compile(r"###[A-Z_]+###")
+
+# Approximates BPE pre-tokenization: words (with a leading space), digit
+# groups, punctuation runs and whitespace runs
+_HEURISTIC_PATTERN = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+
+class TokenCounter(ABC):
+    """Base class for token counters."""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Return the number of tokens in text."""
+
+
+class HeuristicCounter(TokenCounter):
+    """
+    Tokenizer-free approximation.
+
+    Short words are one token and long (technical) words are split every ~5
+    characters; digits are grouped in threes; punctuation runs such as
+    markdown markers cost about one token per two characters.
+    """
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        tokens = 0
+        for match in _HEURISTIC_PATTERN.finditer(text):
+            piece = match.group().lstrip(" ") or match.group()
+            if piece[0].isalpha():
+                tokens += (len(piece) + 4) // 5
+            elif piece[0].isspace():
+                tokens += 1
+            elif piece[0].isdigit():
+                tokens += 1
+            else:
+                tokens += (len(piece) + 1) // 2
+        return tokens
+
+
+class TiktokenCounter(TokenCounter):
+    """Exact counts using tiktoken's BPE vocabulary for a model."""
+
+    name = "tiktoken"
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        import tiktoken
+
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+        self.name = f"tiktoken:{self.encoding.name}"
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+def create_token_counter(kind: str = DEFAULT_COUNTER, model: str = DEFAULT_MODEL) -> TokenCounter:
+    """
+    Create a token counter.
+
+    Args:
+        kind: "tiktoken", "heuristic" or "auto" (tiktoken, falling back to the
+            heuristic if the package or its encoding file is unavailable)
+        model: Model whose encoding tiktoken should use
+
+    Returns:
+        TokenCounter instance
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    kind = kind.lower()
+    if kind == "heuristic":
+        return HeuristicCounter()
+    if kind not in ("auto", "tiktoken"):
+        raise ValueError(f"Unknown token counter: {kind}")
+    try:
+        return TiktokenCounter(model)
+    except Exception as e:
+        # ImportError, or the encoding could not be loaded (e.g. offline)
+        if kind == "tiktoken":
+            print(f"⚠ tiktoken unavailable ({type(e).__name__}); using heuristic token counts")
+        return HeuristicCounter()
+
+
+# Process-wide counter and memoized prompt counts (created on first use)
+_counter: Optional[TokenCounter] = None
+_static_counts: Dict[str, int] = {}
+_templates: List[Tuple[str, str, int, int]] = []  # (prefix, suffix, prefix tokens, suffix tokens)
+_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide token counter (configured from ARG_TOKEN_COUNTER)."""
+    global _counter
+    if _counter is None:
+        with _lock:
+            if _counter is None:
+                _counter = create_token_counter()
+    return _counter
+
+
+def set_token_counter(counter: TokenCounter) -> None:
+    """Replace the process-wide token counter and drop memoized counts."""
+    global _counter
+    with _lock:
+        _counter = counter
+        _static_counts.clear()
+        _templates.clear()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text.
+
+    Static prompts are served from the memo; text built from a prompt
+    template only has its injected part tokenized.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Token count
+    """
+    static_counts = static_prompt_counts()
+    if text in static_counts:
+        return static_counts[text]
+    counter = get_token_counter()
+    for prefix, suffix, prefix_tokens, suffix_tokens in _templates:
+        if (len(text) >= len(prefix) + len(suffix)
+                and text.startswith(prefix) and text.endswith(suffix)):
+            middle = text[len(prefix):len(text) - len(suffix)]
+            return prefix_tokens + counter.count(middle) + suffix_tokens
+    return counter.count(text)
+
+
+def count_message_tokens(messages: list) -> int:
+    """
+    Count prompt tokens for a chat request, including message framing.
+
+    Args:
+        messages: List of dicts with 'role' and 'content' keys
+
+    Returns:
+        Token count of the request prompt
+    """
+    return sum(
+        TOKENS_PER_MESSAGE + count_tokens(message["content"]) for message in messages
+    ) + TOKENS_PER_REPLY
+
+
+def static_prompt_counts() -> Dict[str, int]:
+    """
+    Return memoized token counts for the static agent prompts.
+
+    Computed once on first use; templates (prompts with a ###PLACEHOLDER###)
+    are also split around the placeholder so filled prompts can reuse them.
+
+    Returns:
+        Dict of prompt text -> token count
+    """
+    if _static_counts:
+        return _static_counts
+    counter = get_token_counter()
+    with _lock:
+        if not _static_counts:
+            import importlib
+
+            counts = {}
+            templates = []
+            for module_name in STATIC_PROMPT_MODULES:
+                text = importlib.import_module(f"app.prompts.{module_name}").TEXT
+                counts[text] = counter.count(text)
+                placeholders = PLACEHOLDER_PATTERN.findall(text)
+                if len(placeholders) == 1:
+                    prefix, suffix = text.split(placeholders[0])
+                    templates.append((prefix, suffix, counter.count(prefix), counter.count(suffix)))
+            _templates[:] = templates
+            _static_counts.update(counts)
+    return _static_counts
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-run graph construction overhead.
+
+Compares building + compiling the StateGraph on every run (the old
+run_workflow behaviour) with fetching the cached compiled graph.
+
+Usage:
+    python -m benchmarks.bench_graph_compile [--runs 200]
+"""
+
+import argparse
+import statistics
+import time
+
+from app.graph import create_workflow_graph, get_workflow_graph
+
+
+def measure(fn, runs: int) -> list:
+    """Time fn() runs times, returning per-call durations in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    print(
+        f"{label:<32} mean {statistics.mean(timings):8.3f} ms   "
+        f"p50 {statistics.median(timings):8.3f} ms   "
+        f"max {max(timings):8.3f} ms"
+    )
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description="Graph compile overhead benchmark")
+    parser.add_argument("--runs", type=int, default=200, help="Iterations per variant")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Graph construction overhead ({args.runs} runs)")
+    print("=" * 60)
+
+    for use_async in (False, True):
+        mode = "async" if use_async else "sync"
+        before = measure(lambda: create_workflow_graph(use_async=use_async), args.runs)
+        get_workflow_graph(use_async=use_async)  # First call compiles
+        after = measure(lambda: get_workflow_graph(use_async=use_async), args.runs)
+
+        report(f"[{mode}] compile per run (before)", before)
+        report(f"[{mode}] cached graph (after)", after)
+        print(f"  → saves {statistics.mean(before) - statistics.mean(after):.3f} ms per run\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
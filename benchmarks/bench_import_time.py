@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: cold-start import time.
+
+Times fresh interpreters importing the main modules and running
+`arg-cli --help`, so regressions in import-time work (SDK imports, client
+construction, graph compilation) show up before they reach CLI users and
+API/batch worker cold starts.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+
+# (label, python -c snippet) pairs; each runs in a new interpreter
+TARGETS = [
+    ("python (baseline)", "pass"),
+    ("import app.llm", "import app.llm"),
+    ("import app.graph", "import app.graph"),
+    ("import app.cli", "import app.cli"),
+    ("import app.api", "import app.api"),
+    ("arg-cli --help", "import sys; sys.argv = ['arg-cli', '--help']; from app.cli import main; main()"),
+]
+
+
+def measure(snippet: str, runs: int) -> list:
+    """Time runs fresh interpreters executing snippet, in milliseconds."""
+    # No API key: imports must not need one
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", snippet],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    print(
+        f"{label:<24} mean {statistics.mean(timings):8.1f} ms   "
+        f"p50 {statistics.median(timings):8.1f} ms   "
+        f"max {max(timings):8.1f} ms"
+    )
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreters per target")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Cold-start import time ({args.runs} runs)")
+    print("=" * 60)
+
+    for label, snippet in TARGETS:
+        report(label, measure(snippet, args.runs))
+
+    print("\nDetail: python -X importtime -c 'import app.cli' 2> importtime.log")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
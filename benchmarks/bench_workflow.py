@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end workflow throughput on the fake LLM backend.
+
+Runs batches through run_workflows with simulated provider latency (no
+network, no API key), so framework overhead and concurrency scaling can be
+measured in CI. With --server the requests go through the real OpenAI client
+and HTTP stack to a local MockOpenAIServer instead.
+
+Usage:
+    python -m benchmarks.bench_workflow [--runs 8] [--concurrency 4]
+        [--latency 0.05] [--tokens-per-sec 0] [--server] [--pipeline]
+"""
+
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+# Isolate the run store, response cache and stage memo before app modules read their config
+_tmp = tempfile.mkdtemp(prefix="arg_bench_")
+os.environ.setdefault("ARG_RUN_STORE_PATH", os.path.join(_tmp, "runs.sqlite"))
+os.environ.setdefault("ARG_LLM_CACHE", "off")
+os.environ.setdefault("ARG_STAGE_MEMO", "off")
+
+from app import llm  # noqa: E402
+from app.fake_llm import FakeAsyncOpenAI, FakeOpenAI, MockOpenAIServer  # noqa: E402
+from app.graph import run_workflows  # noqa: E402
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description="Fake-backend workflow benchmark")
+    parser.add_argument("--runs", type=int, default=8, help="Workflows per batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workflows")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated time to first token (s)")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Simulated generation rate (0 = instant)")
+    parser.add_argument("--server", action="store_true", help="Go through HTTP to a local mock server")
+    parser.add_argument("--pipeline", action="store_true", help="Use the staged pipeline executor")
+    args = parser.parse_args()
+
+    server = None
+    if args.server:
+        server = MockOpenAIServer(port=0, latency_s=args.latency, tokens_per_s=args.tokens_per_sec).start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+        llm.set_client(None, None)
+    else:
+        llm.set_client(
+            FakeOpenAI(args.latency, args.tokens_per_sec),
+            FakeAsyncOpenAI(args.latency, args.tokens_per_sec)
+        )
+
+    queries = [f"Benchmark query {n}: monitor ARGs in hospital wastewater" for n in range(args.runs)]
+    results_path = os.path.join(_tmp, "results.jsonl")
+
+    print("=" * 60)
+    print(
+        f"Workflow benchmark: {args.runs} runs, concurrency {args.concurrency}, "
+        f"{'HTTP mock server' if server else 'in-process fake'}"
+    )
+    print("=" * 60)
+
+    start = time.perf_counter()
+    records = run_workflows(
+        queries,
+        concurrency=args.concurrency,
+        results_path=results_path,
+        use_cache=False,
+        pipelined=args.pipeline
+    )
+    elapsed = time.perf_counter() - start
+
+    durations = [r["duration_s"] for r in records if r.get("duration_s") is not None]
+    completed = sum(1 for r in records if r["status"] in ("complete", "warning"))
+    print("\n" + "=" * 60)
+    print(f"Completed:   {completed}/{len(records)}")
+    print(f"Wall time:   {elapsed:.2f} s ({len(records) / elapsed:.2f} runs/s)")
+    if durations:
+        print(f"Per run:     mean {statistics.mean(durations):.3f} s   max {max(durations):.3f} s")
+    # Four LLM calls per run; anything above that is framework overhead
+    print(f"Simulated LLM time per run: >= {4 * args.latency:.3f} s")
+
+    if server:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
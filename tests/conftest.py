@@ -0,0 +1,29 @@
+"""
+Shared test setup.
+
+Tests run on the fake LLM backend with the response cache and stage memo off
+and a throwaway run store; these are set before app modules read their
+configuration.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="arg_tests_")
+os.environ.setdefault("ARG_LLM_BACKEND", "fake")
+os.environ.setdefault("ARG_LLM_CACHE", "off")
+os.environ.setdefault("ARG_STAGE_MEMO", "off")
+os.environ.setdefault("ARG_RUN_STORE_PATH", os.path.join(_tmp, "runs.sqlite"))
+
+from app import llm  # noqa: E402
+from app.fake_llm import FakeAsyncOpenAI, FakeOpenAI  # noqa: E402
+
+
+@pytest.fixture
+def fake_llm():
+    """Instant fake clients for the duration of a test."""
+    llm.set_client(FakeOpenAI(0.0, 0.0), FakeAsyncOpenAI(0.0, 0.0))
+    yield
+    llm.set_client(None, None)
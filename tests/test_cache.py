@@ -0,0 +1,121 @@
+"""Tests for the LLM response cache (app/cache.py)."""
+
+import asyncio
+
+import pytest
+
+from app import cache as cache_module
+from app import llm
+from app.cache import (
+    MemoryResponseCache, ResponseCache, SQLiteResponseCache, bypass_cache, cache_bypassed,
+    make_cache_key, set_cache
+)
+
+
+@pytest.fixture
+def memory_cache():
+    cache = MemoryResponseCache()
+    set_cache(cache)
+    yield cache
+    set_cache(None)
+
+
+def test_response_cache_is_abstract():
+    with pytest.raises(TypeError):
+        ResponseCache()
+
+
+def test_cache_key_ignores_dict_order():
+    first = make_cache_key({"model": "m", "temperature": 0.3, "messages": [{"role": "user", "content": "x"}]})
+    second = make_cache_key({"messages": [{"content": "x", "role": "user"}], "temperature": 0.3, "model": "m"})
+    assert first == second
+    assert first != make_cache_key({"model": "m", "temperature": 0.4, "messages": [{"role": "user", "content": "x"}]})
+
+
+def test_request_key_covers_options():
+    messages = [{"role": "user", "content": "x"}]
+    plain = llm._request_key("m", messages, 0.3, 100, {})
+    assert plain == llm._request_key("m", messages, 0.3, 100, {})
+    assert plain != llm._request_key("m", messages, 0.3, 200, {})
+    assert plain != llm._request_key("m", messages, 0.3, 100, llm._request_options(llm.JSON_OBJECT_FORMAT, None))
+
+
+def test_bypass_cache_nests():
+    assert not cache_bypassed()
+    with bypass_cache():
+        with bypass_cache(False):
+            assert cache_bypassed()
+    assert not cache_bypassed()
+
+
+def test_cache_lookup_skips_bypassed_runs(memory_cache):
+    messages = [{"role": "user", "content": "x"}]
+    _, key, _ = llm._cache_lookup(True, "m", messages, 0.3, 100, {})
+    memory_cache.set(key, "cached")
+
+    assert llm._cache_lookup(True, "m", messages, 0.3, 100, {})[2] == "cached"
+    assert llm._cache_lookup(False, "m", messages, 0.3, 100, {}) == (None, None, None)
+    with bypass_cache():
+        assert llm._cache_lookup(True, "m", messages, 0.3, 100, {}) == (None, None, None)
+
+
+def test_async_calls_use_cache_and_honour_bypass(fake_llm, memory_cache):
+    async def call():
+        return await llm.call_llm_with_history_async("system", [{"role": "user", "content": "hello"}])
+
+    async def run():
+        with llm.call_log() as calls:
+            first = await call()
+            second = await call()
+            with bypass_cache():
+                third = await call()
+        return [first, second, third], calls
+
+    contents, calls = asyncio.run(run())
+    assert contents[0] == contents[1] == contents[2]
+    assert [record["cache_hit"] for record in calls] == [False, True, False]
+
+
+def test_sqlite_cache_round_trip(tmp_path):
+    cache = SQLiteResponseCache(path=str(tmp_path / "cache.sqlite"))
+    assert cache.get("a") is None
+    cache.set("a", "value")
+    cache.set("a", "other")
+    assert cache.get("a") == "other"
+    assert cache.stats()["bytes"] == len("other")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_sqlite_cache_hits_do_not_write(tmp_path):
+    cache = SQLiteResponseCache(path=str(tmp_path / "cache.sqlite"))
+    cache.set("a", "value")
+    changes = cache._conn.total_changes
+    for _ in range(cache_module.ACCESS_FLUSH_ENTRIES - 1):
+        assert cache.get("a") == "value"
+    assert cache._conn.total_changes == changes
+
+    cache.flush()
+    assert cache._conn.total_changes == changes + 1
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteResponseCache(path=str(tmp_path / "cache.sqlite"), max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.set("c", "cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_sqlite_cache_reopens_with_size_total(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteResponseCache(path=path).set("a", "value")
+    assert SQLiteResponseCache(path=path).stats()["bytes"] == len("value")
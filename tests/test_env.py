@@ -0,0 +1,33 @@
+"""Tests for .env loading (app/env.py)."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.env import find_env_file
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_find_env_file_searches_upward(tmp_path):
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    (tmp_path / ".env").write_text("ARG_EXAMPLE=1\n")
+    assert find_env_file(nested) == tmp_path / ".env"
+
+
+@pytest.mark.skipif(find_env_file(REPO_ROOT) is not None, reason="checkout has its own .env")
+def test_env_file_is_loaded_before_module_settings(tmp_path):
+    """Settings only present in .env reach module constants read at import."""
+    (tmp_path / ".env").write_text("ARG_LLM_COALESCE=0\nARG_HTTP_MAX_CONNECTIONS=7\n")
+    env = {key: value for key, value in os.environ.items() if not key.startswith("ARG_")}
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.llm, app.http_pool;"
+         "print(app.llm.COALESCE, app.http_pool.DEFAULT_MAX_CONNECTIONS)"],
+        cwd=str(tmp_path), env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["False", "7"]
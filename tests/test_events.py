@@ -0,0 +1,107 @@
+"""Tests for the run event broker and stage status tracking (app/events.py)."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api
+from app.events import RunEventBroker, apply_stage_event, initial_stage_statuses
+
+
+async def _collect(broker, run_id, **kwargs):
+    return [event async for event in broker.subscribe(run_id, **kwargs)]
+
+
+def test_subscribe_to_unknown_run_creates_no_channel():
+    broker = RunEventBroker()
+    assert asyncio.run(_collect(broker, "unknown", heartbeat=0.01)) == []
+    assert not broker.has_run("unknown")
+
+
+def test_subscriber_receives_history_then_terminal_event():
+    broker = RunEventBroker()
+
+    async def scenario():
+        broker.open("r1")
+        broker.publish("r1", {"event": "workflow_start"})
+        task = asyncio.ensure_future(_collect(broker, "r1"))
+        await asyncio.sleep(0)
+        broker.publish("r1", {"event": "node_start", "agent": "a1"})
+        broker.publish("r1", {"event": "workflow_end", "status": "complete"})
+        return await asyncio.wait_for(task, timeout=1)
+
+    events = asyncio.run(scenario())
+    assert [event["event"] for event in events] == ["workflow_start", "node_start", "workflow_end"]
+    # A finished run replays its history and ends
+    assert len(asyncio.run(_collect(broker, "r1"))) == 3
+
+
+def test_eviction_skips_runs_in_progress():
+    broker = RunEventBroker(max_runs=2)
+    broker.open("active")
+    for run_id in ("done1", "done2", "done3"):
+        broker.publish(run_id, {"event": "workflow_end"})
+    assert broker.has_run("active")
+    assert not broker.has_run("done1")
+    assert broker.has_run("done3")
+
+
+@pytest.mark.parametrize("event, expected", [
+    ({"event": "node_end", "agent": "a2", "valid": True, "workflow_status": "running"}, "complete"),
+    ({"event": "node_end", "agent": "a2", "valid": False, "workflow_status": "error"}, "error"),
+    ({"event": "node_end", "agent": "a4", "valid": False, "workflow_status": "warning"}, "invalid"),
+    ({"event": "node_skipped", "agent": "a3"}, "skipped"),
+])
+def test_apply_stage_event(event, expected):
+    stages = initial_stage_statuses()
+    apply_stage_event(stages, event)
+    assert stages[event["agent"]] == expected
+
+
+def test_event_recorder_writes_stages_on_the_store_thread(monkeypatch):
+    api.run_store.create_run("recorded", "query", status="running")
+    threads = []
+    update = api.run_store.update_run
+
+    def recording_update(run_id, **fields):
+        threads.append(threading.current_thread().name)
+        update(run_id, **fields)
+
+    monkeypatch.setattr(api.run_store, "update_run", recording_update)
+    stages = initial_stage_statuses()
+    on_event = api._event_recorder("recorded", stages, publish=False)
+    on_event({"event": "node_start", "agent": "a1"})
+    on_event({"event": "node_end", "agent": "a1", "valid": True, "workflow_status": "running"})
+    asyncio.run(api._store_write(lambda: None))
+
+    assert len(threads) == 2
+    assert all(name.startswith("arg-run-store") for name in threads)
+    assert api.run_store.get_run("recorded")["stages"]["a1"] == "complete"
+
+
+def _sse_events(client, run_id):
+    response = client.get(f"/workflow/events/{run_id}")
+    assert response.status_code == 200
+    return [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines() if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.parametrize("status", ["complete", "running"])
+def test_events_for_run_not_streamed_here_end_at_once(status):
+    api.run_store.create_run(f"stored-{status}", "query", status=status)
+    events = _sse_events(TestClient(api.app), f"stored-{status}")
+    assert [event["event"] for event in events] == ["workflow_end"]
+    assert events[0]["status"] == status
+    assert ("detail" in events[0]) == (status == "running")
+    assert not api.broker.has_run(f"stored-{status}")
+
+
+def test_websocket_for_finished_run_closes():
+    api.run_store.create_run("stored-ws", "query", status="error")
+    with TestClient(api.app).websocket_connect("/workflow/ws/stored-ws") as websocket:
+        assert websocket.receive_json()["event"] == "workflow_end"
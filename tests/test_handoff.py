@@ -0,0 +1,78 @@
+"""Tests for handoff projection against the agent prompt schemas (app/handoff.py)."""
+
+import json
+
+import pytest
+
+from app import fake_llm
+from app.agents.a1_sampling import validate_sampling_output
+from app.agents.a2_wetlab import validate_wetlab_output
+from app.agents.a3_bioinfo import SECTION_FILES
+from app.handoff import EDGE_FIELDS, build_handoff, schema_edge_fields, schema_fields
+from app.prompts import a1_sampling_user_prompt, a2_wetlab_user_prompt
+
+
+def fake_payload(response):
+    return json.loads(response.split("```json\n", 1)[1].split("\n```", 1)[0])
+
+
+def test_schema_fields_reads_the_output_schema():
+    fields = schema_fields(a1_sampling_user_prompt.TEXT)
+    assert fields[0] == "study_metadata" and fields[-1] == "handoff_to_wetlab"
+    assert {"hypothesis_framework", "study_design", "metadata_requirements"} <= set(fields)
+    assert "handoff_to_bioinformatics" in schema_fields(a2_wetlab_user_prompt.TEXT)
+
+
+@pytest.mark.parametrize("edge, prompt", [
+    ("a1_a2", a1_sampling_user_prompt.TEXT),
+    ("a2_a3", a2_wetlab_user_prompt.TEXT),
+])
+def test_edge_fields_are_in_upstream_schema(edge, prompt):
+    schema = schema_fields(prompt)
+    assert all(path.split(".")[0] in schema for path in EDGE_FIELDS[edge])
+
+
+def test_a3_edge_fields_are_a3_sections():
+    assert set(EDGE_FIELDS["a3_a4"]) <= set(SECTION_FILES)
+
+
+def test_unknown_edge_field_fails():
+    with pytest.raises(ValueError, match="sampling_design"):
+        schema_edge_fields(a1_sampling_user_prompt.TEXT, ("handoff_to_wetlab", "sampling_design"))
+
+
+@pytest.mark.parametrize("edge, response", [
+    ("a1_a2", fake_llm.A1_RESPONSE),
+    ("a2_a3", fake_llm.A2_RESPONSE),
+])
+def test_schema_shaped_output_projects_every_field(edge, response):
+    text, report = build_handoff(edge, fake_payload(response), mode="projected")
+    assert report["missing_fields"] == []
+    assert report["fields"] == sorted(EDGE_FIELDS[edge])
+    assert report["tokens"] < report["full_tokens"]
+    assert json.loads(text) == {key: fake_payload(response)[key] for key in EDGE_FIELDS[edge]}
+
+
+@pytest.mark.parametrize("validate, response", [
+    (validate_sampling_output, fake_llm.A1_RESPONSE),
+    (validate_wetlab_output, fake_llm.A2_RESPONSE),
+])
+def test_schema_shaped_output_validates_cleanly(validate, response):
+    validation = validate({"structured_output": fake_payload(response)})
+    assert validation == {"valid": True, "warnings": [], "errors": []}
+
+
+def test_wetlab_validator_warns_on_schema_keys_only():
+    payload = {key: {} for key in schema_fields(a2_wetlab_user_prompt.TEXT)}
+    assert validate_wetlab_output({"structured_output": payload})["warnings"] == []
+    del payload["library_prep"]
+    assert validate_wetlab_output({"structured_output": payload})["warnings"] == [
+        "Missing recommended key: library_prep"
+    ]
+
+
+def test_missing_fields_are_reported(capsys):
+    _, report = build_handoff("a1_a2", {"handoff_to_wetlab": {"total_samples_to_process": 80}}, mode="projected")
+    assert report["fields"] == ["handoff_to_wetlab"]
+    assert "study_design" in report["missing_fields"]
+    assert "missing" in capsys.readouterr().out
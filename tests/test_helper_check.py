@@ -0,0 +1,54 @@
+"""Tests for the A4 helper reference check (app/agents/a4_analysis.py)."""
+
+from app.agents import a4_analysis
+from app.agents.a4_analysis import (
+    check_helper_references, extract_analysis_sections, validate_analysis_output
+)
+from app.fake_llm import A4_RESPONSE
+
+
+def test_undefined_prefixed_call_is_missing():
+    check = check_helper_references("plot_arg(ab)", "load_x <- function(p) p")
+    assert check["missing"] == ["plot_arg"]
+    assert check["unused"] == ["load_x"]
+
+
+def test_manifest_names_are_checked():
+    rmd = "# helpers: load_x, `summarise_y()`\nload_x(1)"
+    check = check_helper_references(rmd, "load_x <- function(p) p")
+    assert check["referenced"] == ["load_x", "summarise_y"]
+    assert check["missing"] == ["summarise_y"]
+
+
+def test_local_and_package_functions_are_not_missing():
+    rmd = (
+        "plot_local <- function(x) x\n"
+        "plot_local(1)\n"
+        "phyloseq::plot_ordination(ps, ord)\n"
+        "plot_richness(ps)\n"
+        "ggplot(df)\n"
+    )
+    assert check_helper_references(rmd, "")["missing"] == []
+
+
+def test_canned_response_is_consistent():
+    sections = extract_analysis_sections(A4_RESPONSE)
+    check = check_helper_references(sections["rmd_script"], sections["helper_functions"])
+    assert check["missing"] == []
+    assert check["referenced"] == check["defined"]
+
+
+def test_prefix_rule_needs_the_section_contract():
+    assert check_helper_references("plot_arg(ab)", "", prefixes=())["missing"] == []
+
+
+def test_sequential_output_is_not_held_to_the_prefix_rule(monkeypatch):
+    response = (
+        "```r\n# analysis.Rmd\nlibrary(microViz)\nplot_comp_bar(ps)\nload_x(1)\n```\n\n"
+        "```r\n# helpers.R\nload_x <- function(p) p\n```\n\n"
+        "```markdown\n# workflow.md\n1. Load and plot\n```"
+    )
+    monkeypatch.setattr(a4_analysis, "call_llm", lambda **kwargs: response)
+    output = a4_analysis.run_analysis_agent({"structured_output": {}}, parallel=False)
+    assert output["helper_check"]["missing"] == []
+    assert validate_analysis_output(output)["warnings"] == []
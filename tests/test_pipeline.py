@@ -0,0 +1,17 @@
+"""Tests for the staged pipeline executor (app/pipeline.py)."""
+
+from app.pipeline import PipelineExecutor, default_stage_configs
+
+
+def test_items_run_to_completion(fake_llm):
+    executor = PipelineExecutor(default_stage_configs(4))
+    states = executor.run([{"query": "ARGs in hospital wastewater"}, {"query": "ARGs in river sediment"}])
+    assert [state["status"] for state in states] == ["complete", "complete"]
+    assert executor.stats()["stages"]["a4_analysis"]["processed"] == 2
+
+
+def test_each_item_is_bounded_by_the_deadline(fake_llm):
+    executor = PipelineExecutor(default_stage_configs(4), deadline_s=1e-9)
+    states = executor.run([{"query": "ARGs in hospital wastewater"}])
+    assert states[0]["status"] == "error"
+    assert "deadline" in states[0]["error"].lower()
@@ -0,0 +1,81 @@
+"""Tests for the LLM rate limiter (app/ratelimit.py)."""
+
+import asyncio
+
+import pytest
+
+from app.ratelimit import RateLimiter, TokenBucket
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_aimd_halves_once_per_window_and_grows_additively():
+    limiter = RateLimiter(max_concurrency=8, min_concurrency=2)
+    with limiter.slot(0) as stale:
+        pass
+    assert limiter.concurrency_limit == 8
+
+    limiter.on_rate_limited(retry_after=0)
+    assert limiter.concurrency_limit == 4
+    # A request admitted before that decrease only extends the pause
+    limiter.on_rate_limited(retry_after=0, admitted_at=stale.admitted_at)
+    assert limiter.concurrency_limit == 4
+
+    limiter.on_rate_limited(retry_after=0)
+    limiter.on_rate_limited(retry_after=0)
+    assert limiter.concurrency_limit == 2  # min_concurrency floor
+
+    for _ in range(3):
+        with limiter.slot(0):
+            pass
+    assert 2 < limiter._limit < 4
+    assert limiter.stats()["rate_limited"] == 4
+
+
+def test_429_from_a_call_halves_the_limit():
+    limiter = RateLimiter(max_concurrency=8)
+    with pytest.raises(RateLimitError):
+        with limiter.slot(0):
+            raise RateLimitError()
+    assert limiter.concurrency_limit == 4
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_bucket_wait_happens_before_taking_a_slot():
+    limiter = RateLimiter(max_concurrency=4)
+    limiter.rpm_bucket = TokenBucket(600, capacity=1)  # 10 requests/s, no burst
+    limiter.rpm_bucket.reserve(1)
+
+    async def run():
+        task = asyncio.ensure_future(_hold(limiter))
+        await asyncio.sleep(0.03)
+        waiting = limiter.stats()["in_flight"]
+        await task
+        return waiting
+
+    assert asyncio.run(run()) == 0
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_cancelled_wait_returns_its_reservation():
+    limiter = RateLimiter(tokens_per_minute=600)
+    limiter.tpm_bucket.reserve(600)
+    before = limiter.tpm_bucket.available()
+
+    async def run():
+        task = asyncio.ensure_future(_hold(limiter, tokens=300))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert limiter.tpm_bucket.available() == pytest.approx(before, abs=5)
+    assert limiter.stats()["in_flight"] == 0
+
+
+async def _hold(limiter, tokens=0):
+    async with limiter.slot_async(tokens):
+        pass
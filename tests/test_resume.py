@@ -0,0 +1,104 @@
+"""Tests for resume points of checkpointed runs (app/graph.py)."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app import graph
+from app.graph import STAGES, first_incomplete_stage, load_resume_point
+from app.run_store import SQLiteRunStore, get_run_store, set_run_store
+
+
+def _state(status="complete", a2_valid=True, stop_after=4):
+    state = {
+        "user_query": "ARGs in hospital wastewater",
+        "status": status,
+        "error": "",
+        "validation_reports": {},
+        "metrics": {},
+        "usage": {}
+    }
+    for n, agent in enumerate(("a1", "a2", "a3", "a4"), start=1):
+        produced = n <= stop_after
+        state[f"{agent}_output"] = {"agent": agent, "raw_output": f"{agent} text"} if produced else {}
+        if produced:
+            valid = a2_valid or agent != "a2"
+            state["validation_reports"][agent] = {"valid": valid, "warnings": [], "errors": []}
+            state["metrics"][agent] = {"duration_s": 1.0}
+    return state
+
+
+@pytest.fixture
+def store(tmp_path):
+    previous = get_run_store()
+    store = SQLiteRunStore(path=str(tmp_path / "runs.sqlite"))
+    set_run_store(store)
+    yield store
+    set_run_store(previous)
+
+
+def test_complete_run_has_no_incomplete_stage():
+    assert first_incomplete_stage(_state()) is None
+
+
+def test_missing_output_is_incomplete():
+    assert first_incomplete_stage(_state(stop_after=2)) == "a3_bioinfo"
+
+
+@pytest.mark.parametrize("status", ["error", "queued", "running"])
+def test_failed_validation_is_incomplete_regardless_of_run_status(status):
+    # The API marks a resumed run queued/running before the checkpoint is read
+    assert first_incomplete_stage(_state(status=status, a2_valid=False)) == "a2_wetlab"
+
+
+def test_load_resume_point_resets_remaining_stages(store):
+    store.create_run("r1", "ARGs in hospital wastewater", status="queued")
+    store.save_state("r1", _state(status="error", a2_valid=False, stop_after=2))
+    store.update_run("r1", status="running")
+    
+    state, stages = load_resume_point("r1")
+    assert stages == STAGES[1:]
+    assert state["a1_output"]["raw_output"] == "a1 text"
+    assert state["a2_output"] == {}
+    assert "a2" not in state["validation_reports"]
+    assert state["status"] == "running"
+
+
+def test_load_resume_point_nothing_left(store):
+    store.save_state("r2", _state())
+    state, stages = load_resume_point("r2")
+    assert stages is None
+    assert state["a4_output"]["raw_output"] == "a4 text"
+
+
+def test_load_resume_point_unknown_run(store):
+    with pytest.raises(KeyError):
+        load_resume_point("missing")
+
+
+def test_async_checkpoints_run_off_the_event_loop(fake_llm, store, monkeypatch):
+    threads = []
+    save = graph.save_checkpoint
+
+    def recording_save(run_id, state, final=False):
+        threads.append((final, threading.current_thread() is threading.main_thread()))
+        save(run_id, state, final)
+
+    monkeypatch.setattr(graph, "save_checkpoint", recording_save)
+    asyncio.run(graph.run_workflow_async("ARGs in hospital wastewater", run_id="r3"))
+
+    assert [final for final, _ in threads].count(True) == 1
+    assert threads and not any(on_loop for _, on_loop in threads)
+    assert store.get_state("r3")["a4_output"]["raw_output"]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_resume_applies_the_deadline(fake_llm, store, use_async):
+    store.save_state("r4", _state(status="error", a2_valid=False, stop_after=2))
+    if use_async:
+        state = asyncio.run(graph.resume_workflow_async("r4", deadline_s=1e-9))
+    else:
+        state = graph.resume_workflow("r4", deadline_s=1e-9)
+    assert state["status"] == "error"
+    assert "deadline" in state["error"].lower()
@@ -0,0 +1,87 @@
+"""Tests for the workflow run store (app/run_store.py)."""
+
+import pytest
+
+from app import run_store
+from app.run_store import RunStore, SQLiteRunStore
+
+
+def _output(agent, **extra):
+    output = {
+        "agent": agent,
+        "status": "success",
+        "raw_output": f"{agent} response",
+        "structured_output": {"key": agent},
+        "guardrail_report": {"violations": []}
+    }
+    output.update(extra)
+    return output
+
+
+def _state(**outputs):
+    state = {
+        "user_query": "query",
+        "status": "running",
+        "error": "",
+        "validation_reports": {agent: {"valid": True} for agent in outputs},
+        "metrics": {agent: {"duration_s": 1.0} for agent in outputs},
+        "usage": {}
+    }
+    state.update({f"{agent}_output": output for agent, output in outputs.items()})
+    return state
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteRunStore(path=str(tmp_path / "runs.sqlite"))
+
+
+@pytest.fixture
+def packed(monkeypatch):
+    """Agent output fields written to the store, in order."""
+    fields = []
+    pack = run_store._pack
+
+    def counting_pack(value):
+        fields.append(value)
+        return pack(value)
+
+    monkeypatch.setattr(run_store, "_pack", counting_pack)
+    return fields
+
+
+def test_run_store_is_abstract():
+    with pytest.raises(TypeError):
+        RunStore()
+
+
+def test_full_agent_output_survives_reload(store):
+    a3 = _output("A3", handoff={"edge": "a2_a3", "tokens": 10}, section_timings={"readme": 0.5})
+    a4 = _output("A4", helper_check={"missing": [], "defined": ["load_abundance"]})
+    store.save_state("r1", _state(a1=_output("A1"), a2=_output("A2"), a3=a3, a4=a4))
+
+    state = store.get_state("r1")
+    assert state["a3_output"] == a3
+    assert state["a4_output"] == a4
+    assert state["metrics"]["a4"] == {"duration_s": 1.0}
+
+
+def test_checkpoint_rewrites_only_changed_agents(store, packed):
+    a1 = _output("A1")
+    store.save_state("r1", _state(a1=a1))
+    first = len(packed)
+
+    store.save_state("r1", _state(a1=a1, a2=_output("A2", handoff={"edge": "a1_a2"})))
+    assert len(packed) - first == 4  # only A2's fields
+    assert store.get_agent_output("r1", "a1")["raw_output"] == "A1 response"
+
+    store.save_state("r1", _state(a1=a1, a2=_output("A2", handoff={"edge": "a1_a2"})))
+    assert len(packed) - first == 4
+
+
+def test_changed_and_rerun_stages_replace_stored_rows(store):
+    store.save_state("r1", _state(a1=_output("A1"), a2=_output("A2", stage_memo="hit")))
+    store.save_state("r1", _state(a1=_output("A1", raw_output="new")))
+
+    assert store.get_agent_output("r1", "a1")["raw_output"] == "new"
+    assert store.get_agent_output("r1", "a2") is None
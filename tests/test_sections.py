@@ -0,0 +1,147 @@
+"""Tests for fenced-block parsing and parallel section merging (app/sections.py)."""
+
+import asyncio
+
+from app.agents import a3_bioinfo, a4_analysis
+from app.fake_llm import A3_RESPONSE, A4_RESPONSE
+from app.llm import token_listener
+from app.sections import (
+    OrderedDeltas, SectionRequest, code_blocks, generate_sections, generate_sections_async, outer_code_block
+)
+
+
+RMD_RESPONSE = '''```rmarkdown
+# analysis.Rmd
+---
+title: "x"
+---
+
+```{r setup}
+source("helpers.R")
+abundance <- load_abundance("abundance.tsv")
+```
+
+```{r plot}
+plot_arg(abundance)
+```
+```'''
+
+
+def test_code_blocks_keep_rmd_chunks():
+    blocks = code_blocks(RMD_RESPONSE + "\n\n```r\n# helpers.R\nf <- function() 1\n```")
+    assert [language for language, _ in blocks] == ["rmarkdown", "r"]
+    assert blocks[0][1].count("```{r") == 2
+    assert blocks[0][1].endswith("plot_arg(abundance)\n```")
+
+
+def test_code_blocks_unclosed_block_runs_to_end():
+    assert code_blocks("```bash\necho hi") == [("bash", "echo hi")]
+
+
+def test_outer_code_block_falls_back_to_text():
+    assert outer_code_block("  no fences  ") == "no fences"
+
+
+def test_merge_analysis_sections_keeps_full_rmd():
+    raw, sections = a4_analysis.merge_analysis_sections({"rmd_script": RMD_RESPONSE})
+    assert 'plot_arg(abundance)' in sections["rmd_script"]
+    # Rebuilt raw output parses back to the same sections
+    assert a4_analysis.extract_analysis_sections(raw) == sections
+
+
+def test_extract_analysis_sections_with_chunks():
+    sections = a4_analysis.extract_analysis_sections(A4_RESPONSE)
+    assert set(sections) == {"rmd_script", "helper_functions", "workflow_doc"}
+    assert "test_location_effect(abundance, metadata)" in sections["rmd_script"]
+    assert sections["helper_functions"].startswith("# helpers.R")
+
+
+README_RESPONSE = """```markdown
+# README.md
+Run:
+
+```bash
+bash pipeline.sh config.yaml
+```
+
+Outputs land in results/.
+```"""
+
+SETUP_RESPONSE = """```bash
+# setup_databases.sh
+mkdir -p databases/card
+```"""
+
+
+def test_merge_bioinfo_sections_keeps_nested_fences():
+    raw, sections = a3_bioinfo.merge_bioinfo_sections({"readme": README_RESPONSE, "setup_script": SETUP_RESPONSE})
+    assert sections["readme"].endswith("Outputs land in results/.")
+    assert "bash pipeline.sh config.yaml" in sections["readme"]
+    assert sections["setup_script"].startswith("# setup_databases.sh")
+    assert a3_bioinfo.extract_bioinfo_sections(raw) == sections
+
+
+def test_extract_bioinfo_sections_sequential_nested_fences():
+    response = "Deliverables:\n\n" + SETUP_RESPONSE + "\n\n" + README_RESPONSE
+    sections = a3_bioinfo.extract_bioinfo_sections(response)
+    assert set(sections) == {"setup_script", "readme"}
+    assert sections["readme"].endswith("Outputs land in results/.")
+
+
+def test_partial_bioinfo_output_waits_for_closed_handoff():
+    handoff = "```yaml\n# data_handoff.yaml\ntables: {}\n"
+    assert a3_bioinfo.partial_bioinfo_output(handoff) is None
+    assert "handoff_yaml" in a3_bioinfo.partial_bioinfo_output(handoff + "```")
+
+
+def test_parallel_analysis_matches_sequential(fake_llm):
+    bioinfo = a3_bioinfo._build_output(A3_RESPONSE, {})
+    sequential = a4_analysis.run_analysis_agent(bioinfo, parallel=False)
+    parallel = a4_analysis.run_analysis_agent(bioinfo, parallel=True)
+    assert parallel["structured_output"] == sequential["structured_output"]
+    assert set(parallel["section_timings"]) == set(a4_analysis.SECTION_FILES)
+
+
+def test_parallel_bioinfo_async(fake_llm):
+    wetlab = {"structured_output": {"handoff_to_bioinformatics": {"data_types": ["shotgun"]}}}
+    output = asyncio.run(a3_bioinfo.run_bioinfo_agent_async(wetlab, parallel=True))
+    assert output["structured_output"] == a3_bioinfo.extract_bioinfo_sections(A3_RESPONSE)
+
+
+def test_ordered_deltas_buffers_later_sections():
+    received = []
+    stream = OrderedDeltas(["a", "b", "c"], received.append)
+    stream.feed("b", "B1")
+    stream.feed("a", "A1")
+    stream.feed("c", "C1")
+    stream.feed("b", "B2")
+    assert received == ["A1"]
+
+    stream.finish("c")
+    stream.feed("a", "A2")
+    stream.finish("a")
+    assert "".join(received) == "A1A2\n\nB1B2"
+
+    stream.feed("b", "B3")
+    stream.finish("b")
+    assert "".join(received) == "A1A2\n\nB1B2B3\n\nC1"
+
+
+def test_parallel_sections_stream_in_section_order(fake_llm):
+    requests = {
+        name: SectionRequest(f"\n\nGenerate ONLY the {name} section.", 200)
+        for name in ("first", "second", "third")
+    }
+    received = []
+    with token_listener(received.append):
+        responses, _ = generate_sections("system", "user", requests, 0.3)
+    assert "".join(received) == "\n\n".join(responses[name] for name in requests)
+
+    async def run():
+        deltas = []
+        with token_listener(deltas.append):
+            results, _ = await generate_sections_async("system", "user", requests, 0.3)
+        return deltas, results
+
+    received, responses = asyncio.run(run())
+    assert "".join(received) == "\n\n".join(responses[name] for name in requests)
@@ -0,0 +1,208 @@
+"""Tests for in-flight request coalescing (app/singleflight.py)."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import llm
+from app.retry import DeadlineExceeded, workflow_deadline
+from app.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def follow(flight, key, fn, results, deadline=None):
+    """Run flight.do in a thread (optionally under a workflow deadline)."""
+    def target():
+        try:
+            with workflow_deadline(deadline):
+                results.append(flight.do(key, fn))
+        except BaseException as e:
+            results.append(e)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def wait_for_follower(flight, followers=1):
+    while flight.stats()["followers"] < followers:
+        time.sleep(0.001)
+
+
+def test_followers_share_leader_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    leader_results, follower_results = [], []
+    leader = follow(flight, "k", fn, leader_results)
+    while flight.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    follower = follow(flight, "k", fn, follower_results)
+    wait_for_follower(flight)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert leader_results == [("result", False)]
+    assert follower_results == [("result", True)]
+    assert len(calls) == 1
+    assert flight.stats() == {"leaders": 1, "followers": 1, "in_flight": 0}
+
+
+def test_follower_stops_at_its_own_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader_results, follower_results = [], []
+    leader = follow(flight, "k", lambda: release.wait(5) and "result", leader_results)
+    while flight.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+
+    started = time.monotonic()
+    follow(flight, "k", lambda: "unused", follower_results, deadline=0.05).join(5)
+    assert time.monotonic() - started < 2
+    assert isinstance(follower_results[0], DeadlineExceeded)
+
+    release.set()
+    leader.join(5)
+    assert leader_results == [("result", False)]
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_leader_failure_shared_only_when_share_error_allows(shared):
+    flight = SingleFlight(share_error=lambda error: shared)
+    release = threading.Event()
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(5)
+            raise DeadlineExceeded("leader budget")
+        return "own result"
+
+    leader_results, follower_results = [], []
+    leader = follow(flight, "k", fn, leader_results)
+    while flight.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    follower = follow(flight, "k", fn, follower_results)
+    wait_for_follower(flight)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert isinstance(leader_results[0], DeadlineExceeded)
+    if shared:
+        assert follower_results[0] is leader_results[0]
+    else:
+        assert follower_results == [("own result", False)]
+        assert len(attempts) == 2
+
+
+def test_async_follower_shares_result_and_survives_cancellation():
+    async def run():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return "result"
+
+        leader = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(flight.do("k", fn))
+        follower = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await leader, await follower, cancelled.cancelled(), calls
+
+    leader, follower, cancelled, calls = asyncio.run(run())
+    assert leader == ("result", False)
+    assert follower == ("result", True)
+    assert cancelled and len(calls) == 1
+
+
+def test_async_follower_takes_over_from_cancelled_leader():
+    async def run():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01 if len(calls) > 1 else 5)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, len(calls)
+
+    assert asyncio.run(run()) == (("result", False), 2)
+
+
+def test_async_follower_deadline_and_leader_deadline():
+    async def run():
+        flight = AsyncSingleFlight(share_error=lambda error: not isinstance(error, DeadlineExceeded))
+        release = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                await release.wait()
+                raise DeadlineExceeded("leader budget")
+            return "own result"
+
+        leader = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+
+        async def follow(deadline):
+            with workflow_deadline(deadline):
+                return await flight.do("k", fn)
+
+        with pytest.raises(DeadlineExceeded):
+            await follow(0.01)
+
+        follower = asyncio.ensure_future(follow(None))
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(DeadlineExceeded):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("own result", False)
+
+
+def test_cache_bypassing_calls_are_not_coalesced(monkeypatch):
+    calls = []
+
+    async def slow_create(model, messages, temperature, max_tokens, options):
+        calls.append(model)
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="text"))])
+
+    monkeypatch.setattr(llm, "_create_async", slow_create)
+    monkeypatch.setattr(llm, "COALESCE", True)
+
+    async def scenario():
+        return await asyncio.gather(
+            llm.call_llm_async("system", "user"),
+            llm.call_llm_async("system", "user"),
+            llm.call_llm_async("system", "user", use_cache=False),
+        )
+
+    assert asyncio.run(scenario()) == ["text"] * 3
+    assert len(calls) == 2